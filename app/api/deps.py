@@ -1,15 +1,83 @@
 # app/api/deps.py
+import secrets
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 
-from fastapi import Depends
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.db.session import AsyncSessionLocal
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, product_shards
+from app.db.shards import ProductShards, Shard
+
+
+# Set while POST /batch runs an operation: the operation uses the batch's
+# session instead of opening its own (app/api/v1/endpoints/batch.py).
+batch_session: ContextVar[AsyncSession | None] = ContextVar("batch_session", default=None)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    shared = batch_session.get()
+    if shared is not None:
+        yield shared
+        return
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """Session factory for work that outlives the request (background jobs)."""
+    return AsyncSessionLocal
+
+
+def get_product_shards() -> ProductShards | None:
+    """Product shards, or None when products live in the main database."""
+    return product_shards
+
+
+async def get_product_shard(
+    product_id: int, shards: ProductShards | None = Depends(get_product_shards)
+) -> AsyncGenerator[Shard | None, None]:
+    """Session on the shard holding ``product_id`` (None when not sharded)."""
+    if shards is None:
+        yield None
+        return
+    async with shards.open(shards.for_product(product_id)) as shard:
+        yield shard
+
+
+async def get_shard_sessions(
+    shards: ProductShards | None = Depends(get_product_shards),
+) -> AsyncGenerator[list[AsyncSession] | None, None]:
+    """One session per product shard (None when not sharded)."""
+    if shards is None:
+        yield None
+        return
+    async with shards.open_all() as sessions:
+        yield sessions
+
+
+def require_unsharded(shards: ProductShards | None = Depends(get_product_shards)) -> None:
+    """For features that read or write products across the main database."""
+    if shards is not None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Not available with sharded products.",
+        )
+
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """Admin endpoints: 404 unless ADMIN_TOKEN is set, 403 without it."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(
+        x_admin_token.encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing X-Admin-Token.",
+        )
@@ -0,0 +1,156 @@
+# app/api/idempotency.py
+import asyncio
+import hashlib
+from typing import Any, Callable, Coroutine
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app import crud
+from app.api import deps
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# How often a duplicate of a request executing in another worker re-checks.
+POLL_INTERVAL_SECONDS = 0.05
+
+# Requests executing in this worker, so duplicates wait without polling.
+_in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
+
+def _session_factory(request: Request):
+    provider = request.app.dependency_overrides.get(
+        deps.get_session_factory, deps.get_session_factory
+    )
+    return provider()
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class for write endpoints honouring an ``Idempotency-Key`` header.
+
+    The first request for a (key, method + path) pair executes and its
+    response is stored for ``IDEMPOTENCY_KEY_TTL_SECONDS``; retries with the
+    same query string and body get the stored response without running the
+    endpoint, and duplicates arriving while it executes wait for it. Reusing
+    a key with a different query string or body is a 422. Failed requests
+    (exceptions, 5xx) store nothing, so they can be retried.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        if not self.methods & WRITE_METHODS:
+            return handler
+
+        async def route_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return await handler(request)
+            if not 0 < len(key) <= 255:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"{IDEMPOTENCY_HEADER} must be 1-255 characters.",
+                )
+            route = f"{request.method} {request.url.path}"
+            # The query string is part of the request (DELETE /products?category_id=);
+            # without one the hash is the body's, as stored before it was included.
+            digest = hashlib.sha256()
+            if request.url.query:
+                digest.update(request.url.query.encode() + b"\0")
+            digest.update(await request.body())
+            body_hash = digest.hexdigest()
+            session_factory = _session_factory(request)
+
+            # Duplicates within this worker queue up here, so only one of
+            # them at a time touches the key's row.
+            while (waiter := _in_flight.get((key, route))) is not None:
+                await asyncio.shield(waiter)
+            done = asyncio.get_running_loop().create_future()
+            _in_flight[(key, route)] = done
+            try:
+                replay = await _claim_or_replay(session_factory, key, route, body_hash)
+                if replay is not None:
+                    return replay
+                return await _execute(handler, request, session_factory, key, route)
+            finally:
+                del _in_flight[(key, route)]
+                done.set_result(None)
+
+        return route_handler
+
+
+async def _claim_or_replay(
+    session_factory, key: str, route: str, body_hash: str
+) -> Response | None:
+    """None once this request owns the key; otherwise the stored response."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_LOCK_SECONDS
+    while True:
+        async with session_factory() as db:
+            if await crud.idempotency.claim(
+                db,
+                key=key,
+                route=route,
+                body_hash=body_hash,
+                ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+                lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+            ):
+                return None
+            stored = await crud.idempotency.get(db, key=key, route=route)
+
+        if stored is None:
+            # Released or expired between the two statements; claim again.
+            continue
+        if stored.body_hash != body_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"{IDEMPOTENCY_HEADER} was already used with a different query string or body.",
+            )
+        if stored.status_code is not None:
+            return Response(
+                content=stored.response_body,
+                status_code=stored.status_code,
+                media_type=stored.media_type,
+                headers={**(stored.response_headers or {}), REPLAYED_HEADER: "true"},
+            )
+        # Executing in another worker.
+        if loop.time() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this idempotency key is still in progress.",
+            )
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def _execute(handler, request: Request, session_factory, key: str, route: str) -> Response:
+    try:
+        response = await handler(request)
+    except BaseException:
+        async with session_factory() as db:
+            await crud.idempotency.release(db, key=key, route=route)
+        raise
+
+    body = getattr(response, "body", None)
+    async with session_factory() as db:
+        if response.status_code >= 500 or body is None:
+            # Not replayable (server error or a streamed body).
+            await crud.idempotency.release(db, key=key, route=route)
+        else:
+            await crud.idempotency.complete(
+                db,
+                key=key,
+                route=route,
+                status_code=response.status_code,
+                media_type=response.media_type,
+                # Length and type are recomputed on replay.
+                response_headers={
+                    name: value
+                    for name, value in response.headers.items()
+                    if name not in ("content-length", "content-type")
+                },
+                response_body=body.decode(),
+            )
+    return response
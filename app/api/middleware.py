@@ -0,0 +1,161 @@
+# app/api/middleware.py
+import asyncio
+import math
+import re
+from collections.abc import Collection
+from typing import TYPE_CHECKING
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.limits import LoadShedder, Priority, RateLimiter
+
+if TYPE_CHECKING:
+    from app.core.profiling import Profiler
+
+API_KEY_HEADER = b"x-api-key"
+FORWARDED_FOR_HEADER = b"x-forwarded-for"
+
+# Checkout-critical single-item reads, e.g. GET /api/v1/products/42.
+_ITEM_PATH = re.compile(r"/(products|categories)/\d+$")
+
+# Long-polls and event streams sit idle without a connection most of the
+# time, and suggestions are served from memory; counting them as in flight
+# would shed real work.
+_UNMETERED_SUFFIXES = (
+    "/changes", "/changes/stream", "/products/suggest", "/admin/profile/cpu"
+)
+
+
+def request_priority(method: str, path: str) -> Priority:
+    if method == "GET":
+        return Priority.CRITICAL if _ITEM_PATH.search(path) else Priority.LOW
+    return Priority.NORMAL
+
+
+def _client_key(
+    scope: Scope, forwarded_hops: int = 0, api_keys: frozenset[str] = frozenset()
+) -> str:
+    """
+    The X-API-Key if it is one of ``api_keys``, else the client address:
+    unknown keys are ignored, so a client cannot get a fresh bucket by
+    sending a new key. With ``forwarded_hops`` trusted proxies in front, the
+    address is the X-Forwarded-For entry the outermost one appended; entries
+    left of it are client-supplied and ignored.
+    """
+    forwarded: list[str] = []
+    for name, value in scope["headers"]:
+        if name == API_KEY_HEADER and value.decode("latin-1") in api_keys:
+            return "key:" + value.decode("latin-1")
+        if name == FORWARDED_FOR_HEADER and forwarded_hops:
+            forwarded.extend(part.strip() for part in value.decode("latin-1").split(","))
+    if forwarded_hops and len(forwarded) >= forwarded_hops:
+        return "ip:" + forwarded[-forwarded_hops]
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionMiddleware:
+    """
+    Rate limits each client (429) and sheds load by priority (503) before a
+    request reaches the API; either may be None to disable it. Only paths
+    under ``prefix`` are limited. Clients are told apart by ``_client_key``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        prefix: str,
+        limiter: RateLimiter | None,
+        shedder: LoadShedder | None,
+        retry_after: float,
+        forwarded_hops: int = 0,
+        api_keys: Collection[str] = (),
+    ) -> None:
+        self.app = app
+        self.prefix = prefix
+        self.limiter = limiter
+        self.shedder = shedder
+        self.retry_after = retry_after
+        self.forwarded_hops = forwarded_hops
+        self.api_keys = frozenset(api_keys)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter:
+            wait = self.limiter.acquire(
+                _client_key(scope, self.forwarded_hops, self.api_keys)
+            )
+            if wait:
+                response = _reject(429, "Rate limit exceeded.", wait)
+                await response(scope, receive, send)
+                return
+
+        if not self.shedder or path.endswith(_UNMETERED_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.shedder.admit(request_priority(scope["method"], path)):
+            response = _reject(503, "Server is overloaded.", self.retry_after)
+            await response(scope, receive, send)
+            return
+
+        self.shedder.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.shedder.in_flight -= 1
+
+
+class ProfilingMiddleware:
+    """
+    Registers requests under ``prefix`` (except ``exclude``, the profiling
+    endpoints themselves) with the profiler's running CPU profile. Without
+    one it only checks ``profiler.cpu``. The worker's profiler is imported
+    when the middleware stack is built (at startup) unless one is given.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, prefix: str, exclude: str, profiler: "Profiler | None" = None
+    ) -> None:
+        if profiler is None:
+            from app.core.profiling import profiler
+        self.app = app
+        self.profiler = profiler
+        self.prefix = prefix
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile = self.profiler.cpu
+        if profile is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        if (
+            not path.startswith(self.prefix)
+            or path.startswith(self.exclude)
+            or not profile.wants(scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        profile.tasks.add(task)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.tasks.discard(task)
+            profile.request_done()
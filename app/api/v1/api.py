@@ -1,8 +1,27 @@
 # app/api/v1/api.py
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import category, product
+from app.api.v1.endpoints import (
+    batch,
+    category,
+    change,
+    job,
+    metrics,
+    product,
+    profile,
+    report,
+    stock,
+    warehouse,
+)
 
 api_router = APIRouter()
 api_router.include_router(category.router)
-api_router.include_router(product.router)
\ No newline at end of file
+api_router.include_router(product.router)
+api_router.include_router(warehouse.router)
+api_router.include_router(stock.router)
+api_router.include_router(report.router)
+api_router.include_router(job.router)
+api_router.include_router(change.router)
+api_router.include_router(metrics.router)
+api_router.include_router(batch.router)
+api_router.include_router(profile.router)
\ No newline at end of file
@@ -0,0 +1,210 @@
+# app/api/v1/endpoints/batch.py
+"""
+POST /batch: many product and category operations in one round trip.
+
+Each operation is dispatched in process to the product and category
+routers, so validation, status codes and bodies are exactly those of the
+single calls, without the HTTP round trip, middleware or a session per
+call: operations share the batch's session. Consecutive GETs of a
+non-atomic batch run concurrently, each on a session of its own (one
+session cannot run queries concurrently).
+"""
+import asyncio
+import json
+import logging
+from contextvars import ContextVar
+from itertools import groupby
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.deps import batch_session, get_db, get_product_shards, get_session_factory
+from app.api.idempotency import IdempotentRoute
+from app.api.v1.endpoints import category, product
+from app import schemas
+from app.core.singleflight import PRIVATE
+from app.db.shards import ProductShards
+from app.jobs import runner
+from app.jobs.runner import DEFERRED
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"], route_class=IdempotentRoute)
+
+# The app serving the current batch request.
+_serving_app: ContextVar[FastAPI] = ContextVar("serving_app")
+
+
+class _ServingAppOverrides:
+    """
+    Dependency overrides of the app serving the batch (read per
+    operation, so concurrent batches never see each other's), except for
+    get_db, which yields the batch's session (deps.batch_session).
+    """
+
+    def __bool__(self) -> bool:
+        return True
+
+    def get(self, call, default=None):
+        if call is get_db:
+            return default
+        return _serving_app.get().dependency_overrides.get(call, default)
+
+
+# What operations are dispatched to: the routers, without the API prefix.
+_operations = FastAPI()
+_operations.include_router(category.router)
+_operations.include_router(product.router)
+_operations.dependency_overrides = _ServingAppOverrides()
+
+
+class _AtomicSession(Session):
+    """Commits only flush: an atomic batch is one transaction, committed at the end."""
+
+    def commit(self) -> None:
+        self.flush()
+
+
+class _Result(NamedTuple):
+    status: int
+    # The operation's response body as JSON, spliced into the batch's as is.
+    body: bytes
+
+
+def _as_json(body: bytes, content_type: str) -> bytes:
+    if not body:
+        return b"null"
+    if content_type.startswith("application/json"):
+        return body
+    return json.dumps(body.decode()).encode()
+
+
+def _render(results: list[_Result], *, rolled_back: bool = False) -> Response:
+    """The BatchResult document, without decoding and re-encoding each body."""
+    items = b",".join(b'{"status":%d,"body":%s}' % result for result in results)
+    return Response(
+        b'{"results":[%s],"rolled_back":%s}' % (items, b"true" if rolled_back else b"false"),
+        media_type="application/json",
+    )
+
+
+async def _dispatch(operation: schemas.BatchOperation, db: AsyncSession) -> _Result:
+    url = urlsplit(operation.path)
+    payload = b"" if operation.body is None else json.dumps(operation.body).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": operation.method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+        "client": None,
+        "server": None,
+    }
+    response = {"status": 500, "content_type": "", "body": b""}
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            headers = dict(message.get("headers", []))
+            response["content_type"] = headers.get(b"content-type", b"").decode()
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    token = batch_session.set(db)
+    try:
+        await _operations(scope, receive, send)
+    except Exception:
+        # Already answered 500; leave the shared session usable.
+        logger.exception("Batch operation %s %s failed", operation.method, operation.path)
+        await db.rollback()
+    finally:
+        batch_session.reset(token)
+    return _Result(response["status"], _as_json(response["body"], response["content_type"]))
+
+
+async def _read_alone(operation: schemas.BatchOperation, session_factory: sessionmaker) -> _Result:
+    async with session_factory() as db:
+        return await _dispatch(operation, db)
+
+
+async def _run(
+    operations: list[schemas.BatchOperation], db: AsyncSession, session_factory: sessionmaker
+) -> Response:
+    results = []
+    for is_read, group in groupby(operations, key=lambda operation: operation.method == "GET"):
+        group = list(group)
+        if is_read and len(group) > 1:
+            results += await asyncio.gather(
+                *(_read_alone(operation, session_factory) for operation in group)
+            )
+        else:
+            for operation in group:
+                results.append(await _dispatch(operation, db))
+    return _render(results)
+
+
+async def _run_atomic(
+    operations: list[schemas.BatchOperation], session_factory: sessionmaker
+) -> Response:
+    results = []
+    # Reads see the batch's uncommitted writes, so they must not be shared
+    # with other requests. Background jobs start once their rows commit.
+    deferred_jobs: list[str] = []
+    async with session_factory(
+        sync_session_class=_AtomicSession,
+        info={PRIVATE: True, DEFERRED: deferred_jobs},
+    ) as db:
+        for index, operation in enumerate(operations):
+            result = await _dispatch(operation, db)
+            results.append(result)
+            if result.status >= 400:
+                await db.rollback()
+                skipped = _Result(
+                    status.HTTP_424_FAILED_DEPENDENCY,
+                    json.dumps({"detail": f"Not run: operation {index} failed."}).encode(),
+                )
+                results += [skipped] * (len(operations) - index - 1)
+                return _render(results, rolled_back=True)
+        await db.run_sync(Session.commit)
+    runner.schedule(deferred_jobs, session_factory)
+    return _render(results)
+
+
+@router.post("", response_model=schemas.BatchResult)
+async def run_batch(
+    batch: schemas.BatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    """
+    Run product and category operations in order; each result carries the
+    status code and body the single call would have returned.
+    """
+    if batch.atomic and shards is not None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Atomic batches are not available with sharded products.",
+        )
+    token = _serving_app.set(request.app)
+    try:
+        if batch.atomic:
+            return await _run_atomic(batch.operations, session_factory)
+        return await _run(batch.operations, db, session_factory)
+    finally:
+        _serving_app.reset(token)
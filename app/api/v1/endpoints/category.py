@@ -1,12 +1,22 @@
 # app/api/v1/endpoints/category.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from math import ceil
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_product_shards, get_session_factory
+from app.api.idempotency import IdempotentRoute
 from app import crud, schemas
+from app.core.config import settings
+from app.db.base import utcnow
+from app.db.shards import ProductShards
+from app.jobs import runner
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(prefix="/categories", tags=["categories"], route_class=IdempotentRoute)
 
 
 @router.post(
@@ -26,6 +36,11 @@ async def create_category(
         )
     try:
         return await crud.category.create(db, obj_in=category_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except IntegrityError:
         # Extra safety for race conditions
         raise HTTPException(
@@ -34,12 +49,78 @@ async def create_category(
         )
 
 
+@router.get(
+    "/archive",
+    response_model=schemas.ArchivedCategoryList,
+)
+async def list_archived_categories(
+    db: AsyncSession = Depends(get_db),
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+):
+    """Deleted categories, most recently deleted first."""
+    categories, total = await crud.category.get_archived(
+        db, skip=(page - 1) * page_size, limit=page_size
+    )
+    return schemas.ArchivedCategoryList(
+        items=categories,
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=ceil(total / page_size) if total > 0 else 0,
+    )
+
+
+@router.post(
+    "/archive/restore",
+    response_model=schemas.ArchiveRestoreResult,
+)
+async def restore_categories(
+    restore_in: schemas.ArchiveIds,
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    """
+    Undelete categories with the products their delete removed (without
+    stock). All or none are restored.
+    """
+    try:
+        restored = await crud.category.restore(db, category_ids=restore_in.ids, shards=shards)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A live category or product already has the name or SKU of a restored one.",
+        )
+    return schemas.ArchiveRestoreResult(restored=restored)
+
+
+@router.post(
+    "/archive/purge",
+    response_model=schemas.ArchivePurgeResult,
+)
+async def purge_categories(
+    purge_in: schemas.ArchiveIds,
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    """Delete archived categories, and their archived products, for good."""
+    purged, products_purged = await crud.category.purge(
+        db, category_ids=purge_in.ids, shards=shards
+    )
+    return schemas.ArchivePurgeResult(purged=purged, products_purged=products_purged)
+
+
 @router.get("/{category_id}", response_model=schemas.Category)
 async def read_category(
     category_id: int,
     db: AsyncSession = Depends(get_db),
 ):
-    category = await crud.category.get(db, category_id=category_id)
+    category = await crud.category.get_shared(db, category_id=category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -51,8 +132,26 @@ async def read_category(
 @router.get("", response_model=list[schemas.Category])
 async def list_categories(
     db: AsyncSession = Depends(get_db),
+    parent_id: int | None = Query(None, gt=0, description="Only direct children of this category"),
+    fields: str | None = Query(
+        None, description="Comma-separated fields to return, e.g. id,name,parent_id"
+    ),
 ):
-    return await crud.category.get_multi(db)
+    try:
+        field_set = schemas.parse_fields(fields, schemas.Category)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    categories = await crud.category.get_multi_shared(db, parent_id=parent_id, fields=field_set)
+    if field_set is not None:
+        adapter = schemas.sparse_list_adapter(schemas.Category, field_set)
+        return Response(
+            adapter.dump_json(adapter.validate_python(categories, from_attributes=True)),
+            media_type="application/json",
+        )
+    return categories
 
 
 @router.put("/{category_id}", response_model=schemas.Category)
@@ -78,6 +177,11 @@ async def update_category(
 
     try:
         return await crud.category.update(db, db_obj=db_obj, obj_in=category_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -85,13 +189,53 @@ async def update_category(
         )
 
 
+@router.post(
+    "/{category_id}/merge",
+    response_model=schemas.CategoryMergeResult,
+)
+async def merge_category(
+    category_id: int,
+    merge_in: schemas.CategoryMerge,
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    if merge_in.target_category_id == category_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot merge a category into itself.",
+        )
+    source = await crud.category.get(db, category_id=category_id)
+    if not source:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found.",
+        )
+    target = await crud.category.get(db, category_id=merge_in.target_category_id)
+    if not target:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Category with id {merge_in.target_category_id} does not exist",
+        )
+    if await crud.category.has_children(db, category_id=category_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Category has subcategories; move them first.",
+        )
+
+    moved = await crud.category.merge(db, source=source, target=target, shards=shards)
+    return schemas.CategoryMergeResult(category=target, moved=moved)
+
+
 @router.delete(
     "/{category_id}",
     status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.Job}},
 )
 async def delete_category(
     category_id: int,
     db: AsyncSession = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    shards: ProductShards | None = Depends(get_product_shards),
 ):
     db_obj = await crud.category.get(db, category_id=category_id)
     if not db_obj:
@@ -99,4 +243,39 @@ async def delete_category(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found.",
         )
-    await crud.category.remove(db, db_obj=db_obj)
\ No newline at end of file
+    if await crud.category.has_children(db, category_id=category_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Category has subcategories; move them first.",
+        )
+
+    # Sharded: only registry rows are written here (the shards archive
+    # their products in batches when applying), so any size is done inline.
+    if shards is not None:
+        await crud.category.remove(db, db_obj=db_obj, shards=shards)
+        return
+
+    total = await crud.product.count(db, category_id=category_id)
+    if total <= settings.BULK_DELETE_SYNC_LIMIT:
+        await crud.category.remove(db, db_obj=db_obj)
+        return
+
+    # Too many products for one request: empty the category in chunks in the
+    # background, then drop it.
+    job = await runner.submit(
+        db,
+        "delete_products",
+        {
+            "category_id": category_id,
+            "chunk_size": settings.JOB_CHUNK_SIZE,
+            "delete_category": True,
+            "deleted_at": utcnow().isoformat(),
+        },
+        session_factory=session_factory,
+        total=total,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(schemas.Job.model_validate(job)),
+        headers={"Location": f"{settings.API_V1_STR}/jobs/{job.id}"},
+    )
\ No newline at end of file
@@ -0,0 +1,89 @@
+# app/api/v1/endpoints/change.py
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app import crud, schemas
+from app.core.broadcast import Subscription, hub
+from app.core.config import settings
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+# Long-pollers are woken immediately by commits in this worker and re-check
+# at least this often for commits made by other workers.
+POLL_INTERVAL_SECONDS = 1.0
+
+
+@router.get("", response_model=schemas.ChangeList)
+async def list_changes(
+    db: AsyncSession = Depends(get_db),
+    since: int = Query(0, ge=0, description="Cursor: return changes after this id"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum changes to return"),
+    wait: float = Query(
+        0, ge=0, le=30, description="Seconds to hold the request open until a change arrives"
+    ),
+):
+    changes = await crud.change.get_since(db, since=since, limit=limit)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while not changes and (remaining := deadline - loop.time()) > 0:
+        # End the read transaction so the pooled connection is not held
+        # while idle.
+        await db.rollback()
+        await crud.change.notifier.wait(min(remaining, POLL_INTERVAL_SECONDS))
+        changes = await crud.change.get_since(db, since=since, limit=limit)
+
+    return schemas.ChangeList(
+        changes=list(changes),
+        next_cursor=changes[-1].id if changes else since,
+    )
+
+
+def format_event(event: dict) -> str:
+    change = schemas.Change.model_validate(event)
+    return f"id: {change.id}\nevent: change\ndata: {change.model_dump_json()}\n\n"
+
+
+async def event_stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        while not subscription.dropped:
+            event = await subscription.get(settings.EVENT_STREAM_KEEPALIVE_SECONDS)
+            if event is None:
+                if await request.is_disconnected():
+                    break
+                # Comment line: keeps proxies from closing an idle connection.
+                yield ": keep-alive\n\n"
+            else:
+                yield format_event(event)
+        else:
+            # Too far behind; the client reconnects and resyncs from
+            # GET /changes?since=<last event id>.
+            yield "event: dropped\ndata: {}\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    category_id: Optional[int] = Query(None, description="Only changes in this category"),
+):
+    """Server-Sent Events stream of changes committed from now on."""
+    def in_category(event: dict) -> bool:
+        return event["category_id"] == category_id
+
+    subscription = hub.subscribe(
+        maxsize=settings.EVENT_STREAM_QUEUE_SIZE,
+        predicate=in_category if category_id is not None else None,
+    )
+    return StreamingResponse(
+        event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
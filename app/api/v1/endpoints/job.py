@@ -0,0 +1,45 @@
+# app/api/v1/endpoints/job.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app import crud, schemas
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=schemas.Job)
+async def read_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    job = await crud.job.get(db, job_id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found.",
+        )
+    return job
+
+
+@router.post(
+    "/{job_id}/cancel",
+    response_model=schemas.Job,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def cancel_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    job = await crud.job.get(db, job_id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found.",
+        )
+    if job.status in crud.job.FINISHED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status}.",
+        )
+    return await crud.job.request_cancel(db, db_obj=job)
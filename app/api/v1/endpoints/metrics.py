@@ -0,0 +1,16 @@
+# app/api/v1/endpoints/metrics.py
+from fastapi import APIRouter
+
+from app import schemas
+from app.core.singleflight import reads
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/coalescing", response_model=list[schemas.CoalescingStats])
+async def read_coalescing_stats():
+    """Per crud read: calls since startup and how many shared another's query."""
+    return [
+        schemas.CoalescingStats(name=name, calls=calls, coalesced=coalesced)
+        for name, calls, coalesced in reads.stats()
+    ]
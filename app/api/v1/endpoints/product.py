@@ -1,14 +1,46 @@
 # app/api/v1/endpoints/product.py
+import functools
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.api.deps import get_db
+from app.api.deps import (
+    get_db,
+    get_product_shard,
+    get_product_shards,
+    get_session_factory,
+    get_shard_sessions,
+    require_unsharded,
+)
+from app.api.idempotency import IdempotentRoute
 from app import crud, schemas
+from app.core.config import settings
+from app.db.base import utcnow
+from app.db.shards import ProductShards, Shard
+from app.jobs import runner
 
+from decimal import Decimal
 from math import ceil
 
-router = APIRouter(prefix="/products", tags=["products"])
+router = APIRouter(prefix="/products", tags=["products"], route_class=IdempotentRoute)
+
+
+def product_fields(
+    fields: str | None = Query(
+        None, description="Comma-separated fields to return, e.g. id,name,category_id"
+    ),
+) -> frozenset[str] | None:
+    try:
+        return schemas.parse_fields(fields, schemas.Product)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
 
 @router.post(
@@ -19,9 +51,13 @@ router = APIRouter(prefix="/products", tags=["products"])
 async def create_product(
     product_in: schemas.ProductCreate,
     db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
 ):
     try:
-        return await crud.product.create(db, obj_in=product_in)
+        if shards is None:
+            return await crud.product.create(db, obj_in=product_in)
+        async with shards.open(shards.for_category(product_in.category_id)) as shard:
+            return await crud.product.create(db, obj_in=product_in, shard=shard)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,49 +66,330 @@ async def create_product(
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Product with this name already exists.",
+            detail="Product with this name or SKU already exists.",
+        )
+
+
+@router.post(
+    "/move",
+    response_model=schemas.ProductMoveResult,
+)
+async def move_products(
+    move_in: schemas.ProductMove,
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    try:
+        moved = await crud.product.move(
+            db,
+            target_category_id=move_in.target_category_id,
+            product_ids=move_in.product_ids,
+            source_category_id=move_in.source_category_id,
+            search=move_in.search,
+            shards=shards,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return schemas.ProductMoveResult(moved=moved)
+
+
+@router.get(
+    "/archive",
+    response_model=schemas.ArchivedProductList,
+)
+async def list_archived_products(
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+):
+    """Deleted products, most recently deleted first."""
+    products, total = await crud.product.get_archived(
+        db, skip=(page - 1) * page_size, limit=page_size, shards=shards
+    )
+    return schemas.ArchivedProductList(
+        items=products,
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=ceil(total / page_size) if total > 0 else 0,
+    )
+
+
+@router.post(
+    "/archive/restore",
+    response_model=schemas.ArchiveRestoreResult,
+)
+async def restore_products(
+    restore_in: schemas.ArchiveIds,
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    """Undelete products (without stock). All or none are restored."""
+    try:
+        restored = await crud.product.restore(db, product_ids=restore_in.ids, shards=shards)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A live product already has the name or SKU of a restored one.",
         )
+    return schemas.ArchiveRestoreResult(restored=restored)
+
+
+@router.post(
+    "/archive/purge",
+    response_model=schemas.ArchivePurgeResult,
+)
+async def purge_products(
+    purge_in: schemas.ArchiveIds,
+    db: AsyncSession = Depends(get_db),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    """Delete archived products for good."""
+    purged = await crud.product.purge(db, product_ids=purge_in.ids, shards=shards)
+    return schemas.ArchivePurgeResult(purged=purged)
+
+
+@router.get("/suggest", response_model=list[schemas.Suggestion])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Name prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions"),
+):
+    """Product and category names starting with ``q``, from the in-memory index."""
+    from app.search import suggestions
+
+    return [suggestion._asdict() for suggestion in suggestions.search(q, limit)]
 
 
 @router.get("/{product_id}", response_model=schemas.Product)
 async def read_product(
     product_id: int,
     db: AsyncSession = Depends(get_db),
+    shard: Shard | None = Depends(get_product_shard),
+    fields: frozenset[str] | None = Depends(product_fields),
 ):
-    product = await crud.product.get(db, product_id=product_id)
+    if shard:
+        # The shard session belongs to this request; sharded reads are not coalesced.
+        product = await crud.product.get(db, product_id=product_id, fields=fields, shard=shard)
+    else:
+        product = await crud.product.get_shared(db, product_id=product_id, fields=fields)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found.",
         )
+    if fields is not None:
+        item_model = schemas.sparse_model(schemas.Product, fields)
+        return Response(
+            item_model.model_validate(product).model_dump_json(), media_type="application/json"
+        )
     return product
 
 
+@router.get(
+    "/{product_id}/stock",
+    response_model=list[schemas.StockLevel],
+    dependencies=[Depends(require_unsharded)],
+)
+async def read_product_stock(
+    product_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Per-warehouse stock; the total is the product's ``available_quantity``."""
+    if not await crud.product.get(db, product_id=product_id, fields=frozenset({"id"})):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found.",
+        )
+    return await crud.stock.get_levels(db, product_id=product_id)
+
+
 @router.get("", response_model=schemas.ProductListResponse)
 async def list_products(
     db: AsyncSession = Depends(get_db),
+    shard_sessions: list[AsyncSession] | None = Depends(get_shard_sessions),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     search: str | None = Query(None, description="Search by product name"),
+    fuzzy: bool = Query(
+        False, description="Typo-tolerant search, best match first (requires search; ignores sort)"
+    ),
     category_id: int | None = Query(None, gt=0, description="Filter by category ID"),
+    include_subcategories: bool = Query(
+        False, description="With category_id, include products of every descendant category"
+    ),
+    facets: bool = Query(
+        False, description="Include per-category counts for the search (ignores category_id)"
+    ),
+    min_price: Decimal | None = Query(None, ge=0, description="Minimum price (inclusive)"),
+    max_price: Decimal | None = Query(None, ge=0, description="Maximum price (inclusive)"),
+    sku: str | None = Query(None, min_length=1, description="Exact SKU"),
+    in_stock: bool | None = Query(
+        None, description="Only products available (true) or unavailable (false) in any warehouse"
+    ),
+    sort: schemas.ProductSort = Query(
+        "name", description="Sort key, prefixed with '-' for descending (ties broken by id)"
+    ),
+    fields: frozenset[str] | None = Depends(product_fields),
 ):
     skip = (page - 1) * page_size
-    products, total = await crud.product.get_multi(
-        db,
-        skip=skip,
-        limit=page_size,
-        search=search,
-        category_id=category_id,
-    )
+    if fuzzy and not search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Fuzzy search requires a search term.",
+        )
+    total_is_estimate = False
+    try:
+        if fuzzy:
+            # Shard sessions belong to this request; sharded reads are not coalesced.
+            search_products = (
+                crud.product.fuzzy_search_shared
+                if shard_sessions is None
+                else functools.partial(crud.product.fuzzy_search, shards=shard_sessions)
+            )
+            products, total, total_is_estimate = await search_products(
+                db,
+                search=search,
+                skip=skip,
+                limit=page_size,
+                category_id=category_id,
+                include_subcategories=include_subcategories,
+                min_price=min_price,
+                max_price=max_price,
+                sku=sku,
+                in_stock=in_stock,
+                fields=fields,
+                min_similarity=settings.FUZZY_MIN_SIMILARITY,
+                max_candidates=settings.FUZZY_MAX_CANDIDATES,
+                max_trigram_products=settings.FUZZY_MAX_TRIGRAM_PRODUCTS,
+            )
+        elif shard_sessions is not None:
+            products, total = await crud.product.get_multi_sharded(
+                db,
+                shard_sessions,
+                skip=skip,
+                limit=page_size,
+                search=search,
+                category_id=category_id,
+                include_subcategories=include_subcategories,
+                min_price=min_price,
+                max_price=max_price,
+                sku=sku,
+                in_stock=in_stock,
+                sort=sort,
+                fields=fields,
+            )
+        else:
+            products, total = await crud.product.get_multi_shared(
+                db,
+                skip=skip,
+                limit=page_size,
+                search=search,
+                category_id=category_id,
+                include_subcategories=include_subcategories,
+                min_price=min_price,
+                max_price=max_price,
+                sku=sku,
+                in_stock=in_stock,
+                sort=sort,
+                fields=fields,
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
     total_pages = ceil(total / page_size) if total > 0 else 0
 
+    facet_list = None
+    if facets:
+        rows = await crud.product.facet_counts_shared(
+            db, search=search, sharded=shard_sessions is not None
+        )
+        facet_list = [
+            schemas.CategoryFacet(category_id=category_id, name=name, count=count)
+            for category_id, name, count in rows
+        ]
+
+    if fields is not None:
+        # Same envelope, but each item carries only the requested fields.
+        item_model = schemas.sparse_model(schemas.Product, fields)
+        listing = schemas.ProductListResponse.model_construct(
+            items=[item_model.model_validate(product) for product in products],
+            total=total,
+            total_is_estimate=total_is_estimate,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            facets=facet_list,
+        )
+        return Response(
+            listing.model_dump_json(serialize_as_any=True), media_type="application/json"
+        )
+
     return schemas.ProductListResponse(
         items=list(products),
         total=total,
+        total_is_estimate=total_is_estimate,
         page=page,
         page_size=page_size,
         total_pages=total_pages,
+        facets=facet_list,
+    )
+
+
+@router.delete(
+    "",
+    response_model=schemas.ProductBulkDeleteResult,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.Job}},
+)
+async def delete_products(
+    category_id: int = Query(..., gt=0, description="Delete every product in this category"),
+    db: AsyncSession = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    shards: ProductShards | None = Depends(get_product_shards),
+):
+    if not await crud.category.get(db, category_id=category_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found.",
+        )
+
+    # Sharded: only registry rows are written here (the shards archive
+    # their products in batches when applying), so any size is done inline.
+    if shards is not None:
+        deleted = await crud.product.remove_multi(db, category_id=category_id, shards=shards)
+        return schemas.ProductBulkDeleteResult(deleted=deleted)
+
+    total = await crud.product.count(db, category_id=category_id)
+    if total <= settings.BULK_DELETE_SYNC_LIMIT:
+        deleted = await crud.product.remove_multi(db, category_id=category_id)
+        return schemas.ProductBulkDeleteResult(deleted=deleted)
+
+    job = await runner.submit(
+        db,
+        "delete_products",
+        {
+            "category_id": category_id,
+            "chunk_size": settings.JOB_CHUNK_SIZE,
+            "deleted_at": utcnow().isoformat(),
+        },
+        session_factory=session_factory,
+        total=total,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(schemas.Job.model_validate(job)),
+        headers={"Location": f"{settings.API_V1_STR}/jobs/{job.id}"},
     )
 
 
@@ -81,8 +398,9 @@ async def update_product(
     product_id: int,
     product_in: schemas.ProductUpdate,
     db: AsyncSession = Depends(get_db),
+    shard: Shard | None = Depends(get_product_shard),
 ):
-    db_obj = await crud.product.get(db, product_id=product_id)
+    db_obj = await crud.product.get(db, product_id=product_id, shard=shard)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,7 +408,7 @@ async def update_product(
         )
 
     try:
-        return await crud.product.update(db, db_obj=db_obj, obj_in=product_in)
+        return await crud.product.update(db, db_obj=db_obj, obj_in=product_in, shard=shard)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -110,11 +428,12 @@ async def update_product(
 async def delete_product(
     product_id: int,
     db: AsyncSession = Depends(get_db),
+    shard: Shard | None = Depends(get_product_shard),
 ):
-    db_obj = await crud.product.get(db, product_id=product_id)
+    db_obj = await crud.product.get(db, product_id=product_id, shard=shard)
     if not db_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found.",
         )
-    await crud.product.remove(db, db_obj=db_obj)
\ No newline at end of file
+    await crud.product.remove(db, db_obj=db_obj, shard=shard)
\ No newline at end of file
@@ -0,0 +1,96 @@
+# app/api/v1/endpoints/profile.py
+import os
+import tracemalloc
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+
+from app import schemas
+from app.api.deps import require_admin
+from app.core.config import settings
+from app.core.profiling import GroupBy, ProfilerBusy, profiler
+
+router = APIRouter(
+    prefix="/admin/profile", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.post("/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(
+        30.0, gt=0, le=settings.PROFILE_MAX_SECONDS, description="Sample for this long at most"
+    ),
+    requests: int | None = Query(
+        None, ge=1, description="Stop once this many profiled requests have finished"
+    ),
+    header: str | None = Query(
+        None, description="Only profile requests sending this header, e.g. X-Profile"
+    ),
+    interval_ms: float = Query(
+        settings.PROFILE_SAMPLE_INTERVAL_SECONDS * 1e3, ge=1, le=1_000,
+        description="Sampling interval",
+    ),
+):
+    """
+    Sample this worker's requests and return collapsed stacks
+    (``frame;frame count`` lines) for flamegraph.pl or speedscope.
+    Responds when the profile ends.
+    """
+    try:
+        profile = await profiler.profile_cpu(
+            seconds=seconds, max_requests=requests, header=header, interval=interval_ms / 1e3
+        )
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={
+            "X-Profile-Pid": str(os.getpid()),
+            "X-Profile-Requests": str(profile.requests),
+            "X-Profile-Samples": str(profile.samples),
+        },
+    )
+
+
+@router.post("/memory", status_code=status.HTTP_204_NO_CONTENT)
+async def start_memory_tracing(
+    frames: int = Query(10, ge=1, le=100, description="Frames kept per allocation"),
+):
+    """Start tracing allocations in this worker (slows it down until stopped)."""
+    profiler.start_memory(frames)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/memory", response_model=schemas.MemorySnapshot)
+async def read_memory_snapshot(
+    group_by: GroupBy = Query("lineno", description="lineno, filename or traceback"),
+    limit: int = Query(25, ge=1, le=1_000),
+):
+    """Largest allocation sites, and growth since the previous snapshot after the first."""
+    try:
+        stats, compared = await profiler.memory_snapshot(group_by=group_by, limit=limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    traced, peak = tracemalloc.get_traced_memory()
+    return schemas.MemorySnapshot(
+        traced_bytes=traced,
+        peak_bytes=peak,
+        compared_to_previous=compared,
+        stats=[
+            schemas.MemoryStat(
+                traceback=[f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                size_bytes=stat.size,
+                count=stat.count,
+                size_diff_bytes=stat.size_diff if compared else None,
+                count_diff=stat.count_diff if compared else None,
+            )
+            for stat in stats
+        ],
+    )
+
+
+@router.delete("/memory", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_memory_tracing():
+    """Stop tracing allocations and drop the previous snapshot."""
+    profiler.stop_memory()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,46 @@
+# app/api/v1/endpoints/report.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_session_factory, require_unsharded
+from app.core.config import settings
+from app.reports import replenishment
+
+router = APIRouter(
+    prefix="/reports", tags=["reports"], dependencies=[Depends(require_unsharded)]
+)
+
+
+@router.get("/replenishment")
+async def replenishment_report(
+    session_factory: sessionmaker = Depends(get_session_factory),
+    level: replenishment.Level = Query("product", description="One row per product or per category"),
+    format: replenishment.Format = Query("csv", description="csv or ndjson"),
+    only_reorder: bool = Query(False, description="Only rows with something to reorder"),
+):
+    """Days of cover and reorder quantities, streamed as it is computed."""
+    if not replenishment.available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Reports need NumPy; install the 'reports' extra.",
+        )
+
+    chunks = replenishment.stream_report(
+        session_factory,
+        policy=replenishment.Policy(
+            default_lead_time_days=settings.REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS,
+            target_cover_days=settings.REPLENISHMENT_TARGET_COVER_DAYS,
+        ),
+        level=level,
+        fmt=format,
+        only_reorder=only_reorder,
+        chunk_size=settings.REPORT_CHUNK_SIZE,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=replenishment.MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="replenishment-{level}.{format}"'
+        },
+    )
@@ -0,0 +1,72 @@
+# app/api/v1/endpoints/stock.py
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, require_unsharded
+from app.api.idempotency import IdempotentRoute
+from app import crud, schemas
+
+router = APIRouter(
+    prefix="/stock",
+    tags=["stock"],
+    route_class=IdempotentRoute,
+    dependencies=[Depends(require_unsharded)],
+)
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """The stored form of timestamps (see app.db.base.utcnow)."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.post(
+    "/movements",
+    response_model=schemas.StockMovementBatchResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def record_movements(
+    batch: schemas.StockMovementBatch,
+    db: AsyncSession = Depends(get_db),
+):
+    """Journal receipts, sales and adjustments and apply them, all or nothing."""
+    try:
+        recorded = await crud.stock.record_movements(db, movements=batch.movements)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return schemas.StockMovementBatchResult(recorded=recorded)
+
+
+@router.get("/movements", response_model=list[schemas.StockMovement])
+async def list_movements(
+    db: AsyncSession = Depends(get_db),
+    product_id: int | None = Query(None, gt=0, description="Only this product's movements"),
+    since: datetime | None = Query(None, description="Inclusive lower bound (UTC if naive)"),
+    until: datetime | None = Query(None, description="Exclusive upper bound (UTC if naive)"),
+    limit: int = Query(100, ge=1, le=1_000),
+):
+    return await crud.stock.get_movements(
+        db,
+        product_id=product_id,
+        since=_naive_utc(since),
+        until=_naive_utc(until),
+        limit=limit,
+    )
+
+
+@router.get("/as-of", response_model=schemas.StockAsOf)
+async def stock_as_of(
+    product_id: int = Query(..., gt=0),
+    at: datetime = Query(..., description="Point in time (UTC if naive)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """A product's total quantity across warehouses at a past point in time."""
+    at = _naive_utc(at)
+    quantity = await crud.stock.quantity_as_of(db, product_id=product_id, at=at)
+    return schemas.StockAsOf(product_id=product_id, at=at, quantity=quantity)
@@ -0,0 +1,61 @@
+# app/api/v1/endpoints/warehouse.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, require_unsharded
+from app.api.idempotency import IdempotentRoute
+from app import crud, schemas
+
+router = APIRouter(
+    prefix="/warehouses",
+    tags=["warehouses"],
+    route_class=IdempotentRoute,
+    dependencies=[Depends(require_unsharded)],
+)
+
+
+@router.post(
+    "",
+    response_model=schemas.Warehouse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_warehouse(
+    warehouse_in: schemas.WarehouseCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        return await crud.stock.create_warehouse(db, obj_in=warehouse_in)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Warehouse with this code already exists.",
+        )
+
+
+@router.get("", response_model=list[schemas.Warehouse])
+async def list_warehouses(db: AsyncSession = Depends(get_db)):
+    return await crud.stock.get_warehouses(db)
+
+
+@router.put("/{warehouse_id}/stock", response_model=schemas.StockSnapshotResult)
+async def apply_stock_snapshot(
+    warehouse_id: int,
+    snapshot: schemas.StockSnapshot,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Replace the warehouse's stock with a full snapshot (products left out
+    drop to zero there). Unknown SKUs are skipped and reported.
+    """
+    if not await crud.stock.get_warehouse(db, warehouse_id=warehouse_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Warehouse not found.",
+        )
+    result = await crud.stock.apply_snapshot(
+        db,
+        warehouse_id=warehouse_id,
+        levels=((item.sku, item.quantity) for item in snapshot.levels),
+    )
+    return schemas.StockSnapshotResult(**result._asdict())
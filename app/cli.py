@@ -0,0 +1,173 @@
+# app/cli.py
+"""
+Operational commands: ``python -m app.cli <command>``.
+
+Each command imports what it needs when it runs, so ``check`` in a
+pre-deploy hook does not load the app, uvicorn or NumPy.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+
+async def _migrate(args: argparse.Namespace) -> int:
+    from app.db import migrate
+    from app.db.session import engine, product_shards
+
+    await migrate.upgrade(engine, args.revision)
+    print(f"Database at revision {await migrate.current_revision(engine)}")
+    for index, shard_engine in enumerate(product_shards.engines if product_shards else []):
+        await migrate.upgrade(shard_engine, args.revision)
+        print(f"Product shard {index} at revision {await migrate.current_revision(shard_engine)}")
+    return 0
+
+
+async def _check(args: argparse.Namespace) -> int:
+    from app.db import migrate
+    from app.db.session import engine, product_shards
+
+    try:
+        await migrate.verify(engine)
+        if product_shards:
+            await product_shards.verify()
+    except migrate.SchemaVersionError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"Database at revision {migrate.HEAD_REVISION}")
+    return 0
+
+
+async def _compact_stock(args: argparse.Namespace) -> int:
+    from app import crud
+    from app.core.config import settings
+    from app.db.base import utcnow
+    from app.db.session import AsyncSessionLocal
+
+    until = args.until or utcnow().date()
+    async with AsyncSessionLocal() as db:
+        days = await crud.stock.compact(db, until=until)
+        selling = await crud.stock.refresh_sales_velocity(
+            db, until=until, window_days=settings.SALES_VELOCITY_WINDOW_DAYS
+        )
+    print(f"Compacted {days} day(s) of stock movements before {until}")
+    print(f"Refreshed sales velocity ({selling} product(s) selling)")
+    return 0
+
+
+async def _replenishment_report(args: argparse.Namespace) -> int:
+    from app.core.config import settings
+    from app.db.session import AsyncSessionLocal
+    from app.reports import replenishment
+
+    if not replenishment.available():
+        print("Reports need NumPy; install the 'reports' extra.", file=sys.stderr)
+        return 1
+    chunks = replenishment.stream_report(
+        AsyncSessionLocal,
+        policy=replenishment.Policy(
+            default_lead_time_days=settings.REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS,
+            target_cover_days=settings.REPLENISHMENT_TARGET_COVER_DAYS,
+        ),
+        level=args.level,
+        fmt=args.format,
+        only_reorder=args.only_reorder,
+        chunk_size=settings.REPORT_CHUNK_SIZE,
+    )
+    with open(args.output, "w", newline="") if args.output else sys.stdout as out:
+        async for text in chunks:
+            out.write(text)
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from app import server
+    from app.core.config import settings
+
+    try:
+        config = server.build_config(
+            settings, host=args.host, port=args.port, workers=args.workers
+        )
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    if settings.DB_MIGRATE_ON_STARTUP:
+        # Migrate once here instead of in every worker and every recycled
+        # worker; they inherit the environment and only verify the revision.
+        asyncio.run(_run(argparse.Namespace(handler=_migrate, revision="head")))
+        os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+        settings.DB_MIGRATE_ON_STARTUP = False
+    return server.run(config)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_cmd = commands.add_parser(
+        "migrate", help="apply schema migrations (run once per deploy)"
+    )
+    migrate_cmd.add_argument("--revision", default="head")
+    migrate_cmd.set_defaults(handler=_migrate)
+
+    check_cmd = commands.add_parser(
+        "check", help="exit non-zero unless the schema is at the expected revision"
+    )
+    check_cmd.set_defaults(handler=_check)
+
+    compact_cmd = commands.add_parser(
+        "compact-stock",
+        help="write daily stock snapshots for finished days and refresh sales velocity "
+        "(run daily, e.g. from cron)",
+    )
+    compact_cmd.add_argument(
+        "--until", type=date.fromisoformat, help="first day to leave out (default: today, UTC)"
+    )
+    compact_cmd.set_defaults(handler=_compact_stock)
+
+    report_cmd = commands.add_parser(
+        "replenishment-report", help="write days of cover and reorder quantities"
+    )
+    report_cmd.add_argument("--level", choices=("product", "category"), default="product")
+    report_cmd.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    report_cmd.add_argument(
+        "--only-reorder", action="store_true", help="only rows with something to reorder"
+    )
+    report_cmd.add_argument("--output", help="file to write (default: stdout)")
+    report_cmd.set_defaults(handler=_replenishment_report)
+
+    serve_cmd = commands.add_parser(
+        "serve", help="run the API with worker processes tuned from settings (SERVER_*)"
+    )
+    serve_cmd.add_argument("--host", help="default: SERVER_HOST")
+    serve_cmd.add_argument("--port", type=int, help="default: SERVER_PORT")
+    serve_cmd.add_argument(
+        "--workers", type=int, help="default: SERVER_WORKERS (0: one per usable CPU)"
+    )
+    serve_cmd.set_defaults(handler=_serve)
+
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> int:
+    from app.db.session import engine, product_shards
+
+    try:
+        return await args.handler(args)
+    finally:
+        await engine.dispose()
+        if product_shards:
+            await product_shards.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.handler is _serve:
+        # uvicorn runs its own event loop (one per worker).
+        return _serve(args)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
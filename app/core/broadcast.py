@@ -0,0 +1,66 @@
+# app/core/broadcast.py
+import asyncio
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+Event = dict[str, Any]
+
+
+class Subscription:
+    """
+    One subscriber's bounded queue. ``dropped`` is set when the hub gives up
+    on a subscriber that fell ``maxsize`` events behind; the consumer should
+    then end its stream (clients resync from the change feed).
+    """
+
+    def __init__(self, maxsize: int, predicate: Callable[[Event], bool] | None = None) -> None:
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+        self.predicate = predicate
+        self.dropped = False
+
+    async def get(self, timeout: float) -> Event | None:
+        """Next event, or None if none arrives within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """In-process fan-out of events to every live subscriber."""
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(
+        self, *, maxsize: int, predicate: Callable[[Event], bool] | None = None
+    ) -> Subscription:
+        subscription = Subscription(maxsize, predicate)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, events: list[Event]) -> None:
+        """Queue ``events`` for each interested subscriber without blocking."""
+        for subscription in list(self._subscribers):
+            for event in events:
+                if subscription.predicate and not subscription.predicate(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # A stuck client must not make the hub buffer without bound.
+                    logger.warning("Dropping slow event subscriber")
+                    subscription.dropped = True
+                    self.unsubscribe(subscription)
+                    break
+
+
+hub = Broadcaster()
@@ -1,4 +1,6 @@
 # app/core/config.py
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +9,116 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SQLALCHEMY_DATABASE_URI: str = "sqlite+aiosqlite:///./inventory.db"
 
+    # Run Alembic upgrades in every worker on startup. Disable in multi-worker
+    # deployments and run `python -m app.cli migrate` once before rollout;
+    # workers then only verify the schema revision.
+    DB_MIGRATE_ON_STARTUP: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Connections opened at startup so first requests skip connect latency.
+    DB_POOL_PREWARM: int = 0
+    # Product shards (app/db/shards.py): one database URI per shard, e.g.
+    # '["sqlite+aiosqlite:///./products-0.db", "sqlite+aiosqlite:///./products-1.db"]'.
+    # Empty keeps products in the main database. The list is fixed once
+    # products exist (ids route by position). Stock, warehouses, reports
+    # and atomic batches need it empty.
+    PRODUCT_SHARD_URIS: list[str] = []
+
+    # Bulk deletes touching more rows than this run as a chunked background
+    # job (one commit per chunk) instead of inside the request.
+    BULK_DELETE_SYNC_LIMIT: int = 10_000
+
+    # Background jobs (app/jobs): concurrent jobs per worker, rows per
+    # committed chunk, and how long a running job may go without a
+    # checkpoint before another worker takes it over.
+    JOB_MAX_CONCURRENCY: int = 2
+    JOB_CHUNK_SIZE: int = 1_000
+    JOB_LEASE_SECONDS: int = 60
+
+    # Live change stream (GET /changes/stream): events buffered per subscriber
+    # before a slow client is disconnected, and the keep-alive interval.
+    EVENT_STREAM_QUEUE_SIZE: int = 1_000
+    EVENT_STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # Idempotency-Key on product/category writes: how long a stored response
+    # is replayed, and how long a claimed key may stay in flight before a
+    # retry takes it over (duplicates wait at most this long).
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+
+    # Per-client token bucket, off by default (rate 0); e.g. 50/s with a
+    # burst of 100. Keyed on X-API-Key when it is one of RATE_LIMIT_API_KEYS,
+    # else on the client IP (other keys are ignored). Behind reverse
+    # proxies every request comes from a proxy address: set
+    # RATE_LIMIT_FORWARDED_HOPS to the number of proxies in front of the
+    # server to key on the X-Forwarded-For address they appended instead.
+    # Only do so if the proxies overwrite or append to that header, or
+    # clients can pick their own bucket.
+    RATE_LIMIT_PER_SECOND: float = 0.0
+    RATE_LIMIT_BURST: int = 100
+    RATE_LIMIT_MAX_CLIENTS: int = 10_000
+    RATE_LIMIT_FORWARDED_HOPS: int = 0
+    RATE_LIMIT_API_KEYS: list[str] = []
+    # Load shedding: 503 once in-flight API requests or recent pool wait
+    # cross these limits. List/search reads are shed first, writes next and
+    # single-item reads only at SHED_MAX_IN_FLIGHT (e.g. 64). Off by default (0).
+    SHED_MAX_IN_FLIGHT: int = 0
+    SHED_MAX_POOL_WAIT_SECONDS: float = 0.25
+    SHED_POOL_WAIT_HALF_LIFE_SECONDS: float = 2.0
+    SHED_RETRY_AFTER_SECONDS: int = 1
+
+    # Type-ahead index (app/search): names held in memory per worker (about
+    # 65 MB per million, in every worker process), and how often it polls the
+    # change log for other workers' writes.
+    SUGGEST_MAX_NAMES: int = 1_000_000
+    SUGGEST_SYNC_INTERVAL_SECONDS: float = 1.0
+
+    # Fuzzy product search (app/crud/trigram.py): share of the query's
+    # trigrams a name must contain, how many best-matching candidates are
+    # ranked and filtered per query, and how many products a trigram may
+    # appear in before its posting list is no longer read.
+    FUZZY_MIN_SIMILARITY: float = 0.4
+    FUZZY_MAX_CANDIDATES: int = 500
+    FUZZY_MAX_TRIGRAM_PRODUCTS: int = 50_000
+
+    # Replenishment (app/reports): trailing window for Product.sales_velocity,
+    # lead time for products without their own, days of sales a reorder
+    # should cover once it arrives, and rows per report chunk.
+    SALES_VELOCITY_WINDOW_DAYS: int = 28
+    REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS: int = 14
+    REPLENISHMENT_TARGET_COVER_DAYS: int = 30
+    REPORT_CHUNK_SIZE: int = 50_000
+
+    # `python -m app.cli serve` (app/server.py). 0 workers means one per
+    # usable CPU; each worker has its own connection pool and suggestion
+    # index. "auto" picks uvloop/httptools when the 'server' extra is
+    # installed. Keep-alive should outlast the proxy's idle timeout, and
+    # the graceful shutdown bounds how long open event streams hold up a
+    # stop. Workers are replaced after SERVER_MAX_REQUESTS requests (plus
+    # up to the jitter, so they don't all restart at once) to bound memory
+    # growth; 0 keeps them running. Per-request access log lines cost about
+    # a fifth of throughput (scripts/bench_serve.py), so they are off unless
+    # the proxy in front doesn't log requests.
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_LOOP: Literal["auto", "asyncio", "uvloop"] = "auto"
+    SERVER_HTTP: Literal["auto", "h11", "httptools"] = "auto"
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_MAX_REQUESTS: int = 50_000
+    SERVER_MAX_REQUESTS_JITTER: int = 5_000
+    SERVER_ACCESS_LOG: bool = False
+
+    # Admin API (/admin): requests must send this token in X-Admin-Token.
+    # Empty disables it (404).
+    ADMIN_TOKEN: str = ""
+    # On-demand profiling (app/core/profiling.py): default CPU sampling
+    # interval and the longest a single CPU profile may run.
+    PROFILE_SAMPLE_INTERVAL_SECONDS: float = 0.01
+    PROFILE_MAX_SECONDS: float = 300.0
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -0,0 +1,87 @@
+# app/core/limits.py
+import math
+import time
+from collections import OrderedDict
+from enum import IntEnum
+
+
+class RateLimiter:
+    """
+    Token bucket per client: ``rate`` requests per second on average with
+    bursts of up to ``burst``. Only the ``max_clients`` most recently seen
+    clients are tracked, so memory stays bounded under spoofed-IP floods.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # client -> (tokens, last refill time)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, client: str, now: float | None = None) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        tokens, last = self._buckets.pop(client, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class Priority(IntEnum):
+    """Shedding order: LOW goes first, CRITICAL only at the hard limit."""
+
+    LOW = 0
+    NORMAL = 1
+    CRITICAL = 2
+
+
+class DecayingMax:
+    """
+    Recent peak of a measurement that decays with half-life ``half_life``
+    seconds, so it falls back once the pressure (and the samples) stop.
+    """
+
+    def __init__(self, half_life: float) -> None:
+        self.half_life = half_life
+        self._value = 0.0
+        self._at = 0.0
+
+    def observe(self, value: float, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._value = max(value, self.value(now))
+        self._at = now
+
+    def value(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        return self._value * 0.5 ** (max(0.0, now - self._at) / self.half_life)
+
+
+class LoadShedder:
+    """
+    Admission control on in-flight requests and recent connection-pool wait.
+    A request of priority ``p`` is rejected once in-flight requests reach
+    ``max_in_flight * IN_FLIGHT_SHARE[p]`` or pool wait exceeds
+    ``max_pool_wait * POOL_WAIT_FACTOR[p]``.
+    """
+
+    IN_FLIGHT_SHARE = {Priority.LOW: 0.5, Priority.NORMAL: 0.75, Priority.CRITICAL: 1.0}
+    POOL_WAIT_FACTOR = {Priority.LOW: 1.0, Priority.NORMAL: 2.0, Priority.CRITICAL: math.inf}
+
+    def __init__(self, max_in_flight: int, max_pool_wait: float, pool_wait: DecayingMax) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait = max_pool_wait
+        self.pool_wait = pool_wait
+        self.in_flight = 0
+
+    def admit(self, priority: Priority) -> bool:
+        if self.in_flight >= self.max_in_flight * self.IN_FLIGHT_SHARE[priority]:
+            return False
+        return self.pool_wait.value() <= self.max_pool_wait * self.POOL_WAIT_FACTOR[priority]
@@ -0,0 +1,210 @@
+# app/core/profiling.py
+"""
+On-demand profiling of a live worker (/admin/profile). Profiles are per
+worker process: with several workers, each sees only the requests routed
+to it.
+
+The CPU profiler samples the requests it profiles from a background
+thread: the running stack when a request is on the event loop, else the
+chain of awaits it is suspended in (e.g. on the database thread), ending in
+a ``[waiting]`` frame. Results are collapsed stacks, ``frame;frame count``
+per line (counts in sampling intervals), as read by flamegraph.pl and
+speedscope. Tasks a request spawns
+(asyncio.gather) are not followed. Outside a profile nothing runs; the
+middleware checks one attribute per request.
+
+Memory tracing is tracemalloc, off until started; each snapshot is
+compared with the previous one.
+"""
+import asyncio
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import CodeType
+from typing import Literal
+
+WAITING = "[waiting]"
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+_labels: dict[CodeType, str] = {}
+
+
+def _label(code: CodeType) -> str:
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename
+        # Paths relative to the longest sys.path entry (the repo or site-packages).
+        for root in sorted(sys.path, key=len, reverse=True):
+            if root and path.startswith(root + "/"):
+                path = path[len(root) + 1 :]
+                break
+        label = _labels[code] = f"{path}:{code.co_qualname}".replace(";", ":")
+    return label
+
+
+def _await_chain(awaitable: object) -> list[str]:
+    """Frames of a suspended coroutine and everything it awaits, outermost first."""
+    labels = []
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame.f_code))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    labels.append(WAITING)
+    return labels
+
+
+def task_stack(task: asyncio.Task, running: object) -> str | None:
+    """
+    Collapsed stack of ``task``: from ``running`` (the loop thread's current
+    frame) up to the task's coroutine if the task is on the loop, else its
+    await chain. None once the task is done.
+    """
+    root = getattr(task.get_coro(), "cr_frame", None)
+    if root is None:
+        return None
+    codes = []
+    frame = running
+    while frame is not None and frame is not root:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    if frame is root:
+        codes.append(root.f_code)
+        return ";".join(_label(code) for code in reversed(codes))
+    return ";".join(_await_chain(task.get_coro()))
+
+
+class CpuProfile:
+    """
+    One sampling session: requests register their task while in flight,
+    the sampler thread counts their stacks. ``finished`` is set after
+    ``max_requests`` profiled requests (if given).
+    """
+
+    def __init__(self, *, max_requests: int | None, header: str | None) -> None:
+        self.max_requests = max_requests
+        self.header = header.lower().encode("latin-1") if header else None
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.requests = 0
+        self.tasks: set[asyncio.Task] = set()
+        self.finished = asyncio.Event()
+
+    def wants(self, headers: list[tuple[bytes, bytes]]) -> bool:
+        return self.header is None or any(name == self.header for name, _ in headers)
+
+    def request_done(self) -> None:
+        self.requests += 1
+        if self.max_requests and self.requests >= self.max_requests:
+            self.finished.set()
+
+    def sample(self, loop_thread: int, weight: int) -> None:
+        running = sys._current_frames().get(loop_thread)
+        for task in list(self.tasks):
+            stack = task_stack(task, running)
+            if stack:
+                self.stacks[stack] += weight
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+class Profiler:
+    def __init__(self) -> None:
+        # The running CPU profile, read by ProfilingMiddleware on every request.
+        self.cpu: CpuProfile | None = None
+        self._previous: tracemalloc.Snapshot | None = None
+
+    async def profile_cpu(
+        self,
+        *,
+        seconds: float,
+        max_requests: int | None = None,
+        header: str | None = None,
+        interval: float,
+    ) -> CpuProfile:
+        """
+        Sample requests (only those sending ``header``, if given) for
+        ``seconds``, or until ``max_requests`` of them have finished.
+        """
+        if self.cpu is not None:
+            raise ProfilerBusy("A CPU profile is already running in this worker.")
+        profile = CpuProfile(max_requests=max_requests, header=header)
+        stop = threading.Event()
+        loop_thread = threading.get_ident()
+
+        def sample() -> None:
+            last = time.perf_counter()
+            while not stop.wait(interval):
+                # A busy loop thread hands over the GIL late; weigh each
+                # sample by the intervals it stands for.
+                now = time.perf_counter()
+                profile.sample(loop_thread, max(1, round((now - last) / interval)))
+                last = now
+
+        sampler = threading.Thread(target=sample, name="cpu-profiler", daemon=True)
+        # The loop thread offers the GIL every switch interval (5 ms by
+        # default); match the sampling interval while profiling.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, interval))
+        self.cpu = profile
+        sampler.start()
+        try:
+            await asyncio.wait_for(profile.finished.wait(), seconds)
+        except TimeoutError:
+            pass
+        finally:
+            self.cpu = None
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+            sys.setswitchinterval(switch_interval)
+        return profile
+
+    def start_memory(self, frames: int) -> None:
+        """Start tracemalloc, keeping ``frames`` frames per allocation."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._previous = None
+
+    def stop_memory(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    async def memory_snapshot(
+        self, *, group_by: GroupBy, limit: int
+    ) -> tuple[list[tracemalloc.Statistic | tracemalloc.StatisticDiff], bool]:
+        """
+        Top ``limit`` allocation sites by size, as differences from the
+        previous snapshot when there is one (second item True). Computed in
+        a thread; it takes seconds with many live objects.
+        """
+        if not tracemalloc.is_tracing():
+            raise ValueError("Memory tracing is not started.")
+
+        def compute() -> tuple[tracemalloc.Snapshot, list]:
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                    tracemalloc.Filter(False, "<unknown>"),
+                ]
+            )
+            if self._previous is None:
+                return snapshot, snapshot.statistics(group_by)
+            return snapshot, snapshot.compare_to(self._previous, group_by)
+
+        compared = self._previous is not None
+        self._previous, stats = await asyncio.to_thread(compute)
+        return stats[:limit], compared
+
+
+profiler = Profiler()
@@ -0,0 +1,84 @@
+# app/core/singleflight.py
+import asyncio
+import functools
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+# Session.info flag for sessions reading their own uncommitted writes
+# (atomic POST /batch): their reads neither join nor are joined by others.
+PRIVATE = "singleflight_private"
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: while a call for a key is in
+    flight, further callers with the same key await its result instead of
+    starting their own. Nothing is cached once the call completes.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.calls: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    async def do(self, name: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls[name] += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._discard(key, done))
+        else:
+            self.coalesced[name] += 1
+        # Shielded so one caller disconnecting does not cancel the others.
+        return await asyncio.shield(task)
+
+    def _discard(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def forget(self) -> None:
+        """Make later callers start a fresh call (e.g. after a write commits)."""
+        self._in_flight.clear()
+
+    def coalesce(self, fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """
+        Wrap a crud read ``fn(db, *args, **kwargs)``. Calls are keyed on the
+        arguments other than the session, so concurrent identical reads share
+        one query. The shared call runs on a session of its own, bound like
+        ``db`` and closed before the result is returned: results are
+        detached instances to be treated read-only, and no caller's session
+        is used by another request or after its teardown. Calls with
+        unhashable arguments run alone on ``db``.
+        """
+        name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        async def wrapper(db: AsyncSession, *args: Any, **kwargs: Any) -> T:
+            if db.info.get(PRIVATE):
+                return await fn(db, *args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return await fn(db, *args, **kwargs)
+            bind = db.bind
+
+            async def call() -> T:
+                async with AsyncSession(bind, autoflush=False, expire_on_commit=False) as own:
+                    return await fn(own, *args, **kwargs)
+
+            return await self.do(name, key, call)
+
+        return wrapper
+
+    def stats(self) -> list[tuple[str, int, int]]:
+        """(name, calls, coalesced) per wrapped function."""
+        return [(name, self.calls[name], self.coalesced[name]) for name in sorted(self.calls)]
+
+
+reads = SingleFlight()
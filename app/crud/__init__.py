@@ -1,2 +1,2 @@
 # app/crud/__init__.py
-from app.crud import category, product
\ No newline at end of file
+from app.crud import category, change, idempotency, job, product, shard, stock, trigram
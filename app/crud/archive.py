@@ -0,0 +1,69 @@
+# app/crud/archive.py
+"""
+Soft delete. Deleting a product or category moves its row into the
+matching archive table (app/models/archive.py) in the deleting
+transaction, so live tables and all their indexes hold live rows only and
+no query filters out dead ones. Restores move rows back; purges drop them
+for good. Every function works on a set of rows in one statement and does
+not commit.
+"""
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import ColumnElement, DateTime, Select, delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base
+
+
+def _column_names(live: type[Base]) -> list[str]:
+    return [column.name for column in live.__table__.columns]
+
+
+async def archive(
+    db: AsyncSession,
+    live: type[Base],
+    archived: type[Base],
+    condition: ColumnElement[bool],
+    *,
+    deleted_at: datetime,
+) -> None:
+    """Copy the ``live`` rows matching ``condition`` into ``archived``; the caller deletes them."""
+    names = _column_names(live)
+    await db.execute(
+        insert(archived).from_select(
+            [*names, "deleted_at"],
+            select(*live.__table__.columns, literal(deleted_at, DateTime)).where(condition),
+        )
+    )
+
+
+async def restore(
+    db: AsyncSession,
+    live: type[Base],
+    archived: type[Base],
+    condition: ColumnElement[bool],
+    **values: Any,
+) -> None:
+    """
+    Move the ``archived`` rows matching ``condition`` back into ``live``,
+    with ``values`` (column -> value) replacing archived ones.
+    Raises IntegrityError if a live row took a unique value meanwhile.
+    """
+    names = _column_names(live)
+    columns = archived.__table__.c
+    await db.execute(
+        insert(live).from_select(
+            names,
+            select(
+                *(literal(values[name]) if name in values else columns[name] for name in names)
+            ).where(condition),
+        )
+    )
+    await db.execute(delete(archived).where(condition))
+
+
+async def purge(db: AsyncSession, archived: type[Base], ids: Sequence[int] | Select) -> int:
+    """Drop archived rows for good. Returns how many there were."""
+    result = await db.execute(delete(archived).where(archived.id.in_(ids)))
+    return result.rowcount
@@ -1,13 +1,36 @@
 # app/crud/category.py
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import String, delete, exists, literal, select, func, update as sql_update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from app.models.category import Category
+from app.core.singleflight import reads
+from app.crud import archive as crud_archive
+from app.crud import change as crud_change
+from app.crud import shard as crud_shard
+from app.crud import stock as crud_stock
+from app.crud import trigram as crud_trigram
+from app.db.base import utcnow
+from app.db.shards import ProductShards
+from app.models.archive import CategoryArchive, ProductArchive
+from app.models.category import PATH_SEPARATOR, Category, ancestor_ids, subtree_bounds
+from app.models.product import Product
+from app.models.shard import ProductRegistry
 from app.schemas.category import CategoryCreate, CategoryUpdate
 
+ENTITY = "category"
+NAME_BATCH_SIZE = 10_000
+
+
+def subtree_condition(path: str):
+    """Categories in the subtree rooted at ``path`` (an index range scan)."""
+    low, high = subtree_bounds(path)
+    return (Category.path >= low) & (Category.path < high)
+
 
 async def get(db: AsyncSession, category_id: int) -> Category | None:
     result = await db.execute(select(Category).where(Category.id == category_id))
@@ -19,15 +42,99 @@ async def get_by_name(db: AsyncSession, name: str) -> Category | None:
     return result.scalar_one_or_none()
 
 
-async def get_multi(db: AsyncSession) -> Sequence[Category]:
-    result = await db.execute(select(Category).order_by(Category.name))
+async def get_path(db: AsyncSession, category_id: int) -> str | None:
+    result = await db.execute(select(Category.path).where(Category.id == category_id))
+    return result.scalar_one_or_none()
+
+
+async def get_multi(
+    db: AsyncSession,
+    *,
+    parent_id: int | None = None,
+    fields: frozenset[str] | None = None,
+) -> Sequence[Category]:
+    """Categories ordered by name; ``fields`` limits the columns read."""
+    query = select(Category)
+    if fields is not None:
+        query = query.options(load_only(*(getattr(Category, name) for name in fields)))
+    if parent_id is not None:
+        query = query.where(Category.parent_id == parent_id)
+    result = await db.execute(query.order_by(Category.name))
     return result.scalars().all()
 
 
+async def has_children(db: AsyncSession, category_id: int) -> bool:
+    result = await db.execute(select(exists().where(Category.parent_id == category_id)))
+    return result.scalar_one()
+
+
+async def stream_names(
+    db: AsyncSession, *, ids: Sequence[int] | None = None
+) -> AsyncIterator[tuple[int, str]]:
+    """(id, name) of every category (or of ``ids``), streamed in batches."""
+    query = select(Category.id, Category.name)
+    if ids is not None:
+        query = query.where(Category.id.in_(ids))
+    result = await db.stream(query.execution_options(yield_per=NAME_BATCH_SIZE))
+    async for id_, name in result:
+        yield id_, name
+
+
+# Coalesced variants for read-only endpoints (see app.core.singleflight).
+get_shared = reads.coalesce(get)
+get_multi_shared = reads.coalesce(get_multi)
+
+
+async def _get_parent(db: AsyncSession, parent_id: int | None) -> Category | None:
+    if parent_id is None:
+        return None
+    parent = await db.get(Category, parent_id)
+    if not parent:
+        raise ValueError(f"Category with id {parent_id} does not exist")
+    return parent
+
+
+async def _add_to_subtree_counts(db: AsyncSession, category_ids: list[int], delta: int) -> None:
+    if not category_ids or not delta:
+        return
+    await db.execute(
+        sql_update(Category)
+        .where(Category.id.in_(category_ids))
+        .values(subtree_product_count=Category.subtree_product_count + delta)
+    )
+
+
+async def adjust_product_counts(db: AsyncSession, category_id: int, delta: int) -> None:
+    """
+    Account for ``delta`` products added to (or removed from, if negative)
+    ``category_id``: its direct count and the subtree count of every
+    category from the root down to it. Does not commit.
+    """
+    if not delta:
+        return
+    path = await get_path(db, category_id)
+    if path is None:
+        return
+    await db.execute(
+        sql_update(Category)
+        .where(Category.id == category_id)
+        .values(product_count=Category.product_count + delta)
+    )
+    await _add_to_subtree_counts(db, ancestor_ids(path), delta)
+
+
 async def create(db: AsyncSession, obj_in: CategoryCreate) -> Category:
-    db_obj = Category(**obj_in.model_dump())
+    parent = await _get_parent(db, obj_in.parent_id)
+
+    db_obj = Category(**obj_in.model_dump(), path="", depth=parent.depth + 1 if parent else 0)
     db.add(db_obj)
     try:
+        # The path ends with the row's own id, so it is known after the INSERT.
+        await db.flush()
+        db_obj.path = f"{parent.path if parent else PATH_SEPARATOR}{db_obj.id}{PATH_SEPARATOR}"
+        crud_change.record(
+            db, entity=ENTITY, entity_id=db_obj.id, op=crud_change.CREATE, category_id=db_obj.id
+        )
         await db.commit()
     except IntegrityError:
         await db.rollback()
@@ -36,10 +143,54 @@ async def create(db: AsyncSession, obj_in: CategoryCreate) -> Category:
     return db_obj
 
 
+async def _move_subtree(db: AsyncSession, db_obj: Category, parent_id: int | None) -> None:
+    parent = await _get_parent(db, parent_id)
+    if parent and parent.path.startswith(db_obj.path):
+        raise ValueError("Cannot move a category into its own subtree")
+
+    old_path = db_obj.path
+    new_path = f"{parent.path if parent else PATH_SEPARATOR}{db_obj.id}{PATH_SEPARATOR}"
+    depth_delta = (parent.depth + 1 if parent else 0) - db_obj.depth
+
+    # The subtree's products leave the old ancestors and join the new ones
+    # (shared ancestors net out to zero).
+    moved = db_obj.subtree_product_count
+    await _add_to_subtree_counts(db, ancestor_ids(old_path)[:-1], -moved)
+    await _add_to_subtree_counts(db, ancestor_ids(parent.path) if parent else [], moved)
+
+    await crud_change.record_many(
+        db,
+        entity=ENTITY,
+        op=crud_change.UPDATE,
+        rows=select(Category.id, Category.id.label("category_id")).where(
+            subtree_condition(old_path), Category.id != db_obj.id
+        ),
+    )
+    # Re-root every descendant path in one statement.
+    await db.execute(
+        sql_update(Category)
+        .where(subtree_condition(old_path))
+        .values(
+            path=literal(new_path, String) + func.substr(Category.path, len(old_path) + 1),
+            depth=Category.depth + depth_delta,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db_obj.parent_id = parent_id
+
+
 async def update(db: AsyncSession, db_obj: Category, obj_in: CategoryUpdate) -> Category:
     update_data = obj_in.model_dump(exclude_unset=True)
+    if "parent_id" in update_data:
+        parent_id = update_data.pop("parent_id")
+        if parent_id != db_obj.parent_id:
+            await _move_subtree(db, db_obj, parent_id)
+
     for field, value in update_data.items():
         setattr(db_obj, field, value)
+    crud_change.record(
+        db, entity=ENTITY, entity_id=db_obj.id, op=crud_change.UPDATE, category_id=db_obj.id
+    )
     try:
         await db.commit()
     except IntegrityError:
@@ -49,6 +200,219 @@ async def update(db: AsyncSession, db_obj: Category, obj_in: CategoryUpdate) ->
     return db_obj
 
 
-async def remove(db: AsyncSession, db_obj: Category) -> None:
+async def remove(
+    db: AsyncSession,
+    db_obj: Category,
+    *,
+    deleted_at: datetime | None = None,
+    shards: ProductShards | None = None,
+) -> None:
+    """
+    Archive a leaf category and its products (see app/crud/archive.py),
+    all stamped ``deleted_at`` (now by default) so a restore brings back
+    the products this delete took. With product ``shards`` the products'
+    archiving is queued on their shards (see app/crud/shard.py).
+    """
+    deleted_at = deleted_at or utcnow()
+    if shards:
+        archived = await crud_shard.archive_products(
+            db, shards, ProductRegistry.category_id == db_obj.id, deleted_at=deleted_at
+        )
+        removed = archived.total()
+    else:
+        removed = await _remove_products(db, db_obj, deleted_at)
+    await _add_to_subtree_counts(db, ancestor_ids(db_obj.path)[:-1], -removed)
+    await crud_archive.archive(
+        db, Category, CategoryArchive, Category.id == db_obj.id, deleted_at=deleted_at
+    )
     await db.delete(db_obj)
-    await db.commit()
\ No newline at end of file
+    crud_change.record(
+        db, entity=ENTITY, entity_id=db_obj.id, op=crud_change.DELETE, category_id=db_obj.id
+    )
+    await _commit(db, shards)
+
+
+async def _remove_products(db: AsyncSession, db_obj: Category, deleted_at: datetime) -> int:
+    # One set-based DELETE for the children (SQLite only honours ON DELETE
+    # CASCADE with PRAGMA foreign_keys); the caller archives the category.
+    await crud_change.record_many(
+        db,
+        entity="product",
+        op=crud_change.DELETE,
+        rows=select(Product.id, Product.category_id).where(Product.category_id == db_obj.id),
+    )
+    await crud_archive.archive(
+        db, Product, ProductArchive, Product.category_id == db_obj.id, deleted_at=deleted_at
+    )
+    in_category = select(Product.id).where(Product.category_id == db_obj.id)
+    await crud_trigram.unindex(db, in_category)
+    await crud_stock.remove_products(db, in_category)
+    result = await db.execute(delete(Product).where(Product.category_id == db_obj.id))
+    return result.rowcount
+
+
+async def _commit(db: AsyncSession, shards: ProductShards | None) -> None:
+    """Commit, then apply the product writes queued for ``shards``, if any."""
+    if shards:
+        await crud_shard.commit(db, shards)
+    else:
+        await db.commit()
+
+
+async def merge(
+    db: AsyncSession, source: Category, target: Category, *, shards: ProductShards | None = None
+) -> int:
+    """
+    Move every product of the leaf category ``source`` into ``target`` and
+    archive ``source`` (restoring it brings back an empty category) in one
+    transaction. With product ``shards`` the move is queued on the products'
+    shards. Returns the number of products moved.
+    """
+    if shards:
+        moved = (
+            await crud_shard.move_products(
+                db, shards, ProductRegistry.category_id == source.id, category_id=target.id
+            )
+        ).total()
+    else:
+        await crud_change.record_many(
+            db,
+            entity="product",
+            op=crud_change.UPDATE,
+            rows=select(Product.id, literal(target.id)).where(Product.category_id == source.id),
+        )
+        result = await db.execute(
+            sql_update(Product)
+            .where(Product.category_id == source.id)
+            .values(category_id=target.id)
+            .execution_options(synchronize_session=False)
+        )
+        moved = result.rowcount
+    await _add_to_subtree_counts(db, ancestor_ids(source.path)[:-1], -moved)
+    await adjust_product_counts(db, target.id, moved)
+    await crud_archive.archive(
+        db, Category, CategoryArchive, Category.id == source.id, deleted_at=utcnow()
+    )
+    await db.delete(source)
+    crud_change.record(
+        db, entity=ENTITY, entity_id=source.id, op=crud_change.DELETE, category_id=source.id
+    )
+    await _commit(db, shards)
+    await db.refresh(target)
+    return moved
+
+
+async def get_archived(
+    db: AsyncSession, *, skip: int = 0, limit: int = 100
+) -> tuple[Sequence[CategoryArchive], int]:
+    """Archived categories, most recently deleted first, and their total."""
+    total = (await db.execute(select(func.count()).select_from(CategoryArchive))).scalar_one()
+    result = await db.execute(
+        select(CategoryArchive)
+        .order_by(CategoryArchive.deleted_at.desc(), CategoryArchive.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all(), total
+
+
+async def restore(
+    db: AsyncSession, *, category_ids: list[int], shards: ProductShards | None = None
+) -> list[int]:
+    """
+    Move archived categories back under their parent, each with the
+    products its delete archived (without stock; queued on their shards
+    with product ``shards``), and commit. Ancestors restore before
+    descendants; ids not in the archive are skipped.
+    Returns the restored ids. Raises ValueError if a parent is gone and
+    IntegrityError if a live row has taken a name or SKU; nothing is
+    restored then.
+    """
+    rows = (
+        await db.execute(
+            select(CategoryArchive.id, CategoryArchive.parent_id, CategoryArchive.deleted_at)
+            .where(CategoryArchive.id.in_(category_ids))
+            .order_by(CategoryArchive.depth, CategoryArchive.id)
+        )
+    ).all()
+    try:
+        for category_id, parent_id, deleted_at in rows:
+            parent = await _get_parent(db, parent_id)
+            await crud_archive.restore(
+                db,
+                Category,
+                CategoryArchive,
+                CategoryArchive.id == category_id,
+                path=f"{parent.path if parent else PATH_SEPARATOR}{category_id}{PATH_SEPARATOR}",
+                depth=parent.depth + 1 if parent else 0,
+                product_count=0,
+                subtree_product_count=0,
+            )
+            crud_change.record(
+                db,
+                entity=ENTITY,
+                entity_id=category_id,
+                op=crud_change.CREATE,
+                category_id=category_id,
+            )
+
+            if shards:
+                restored = await crud_shard.restore_products(
+                    db,
+                    shards,
+                    ProductRegistry.category_id == category_id,
+                    ProductRegistry.deleted_at == deleted_at,
+                )
+                await adjust_product_counts(db, category_id, restored.total())
+                continue
+            archived_with = (ProductArchive.category_id == category_id) & (
+                ProductArchive.deleted_at == deleted_at
+            )
+            names = (
+                await db.execute(select(ProductArchive.id, ProductArchive.name).where(archived_with))
+            ).all()
+            if not names:
+                continue
+            await crud_archive.restore(
+                db, Product, ProductArchive, archived_with, available_quantity=0
+            )
+            await crud_trigram.index_many(db, names)
+            await adjust_product_counts(db, category_id, len(names))
+            # The category's products are exactly the ones just restored.
+            await crud_change.record_many(
+                db,
+                entity="product",
+                op=crud_change.CREATE,
+                rows=select(Product.id, Product.category_id).where(
+                    Product.category_id == category_id
+                ),
+            )
+        await _commit(db, shards)
+    except (ValueError, IntegrityError):
+        await db.rollback()
+        raise
+    return [category_id for category_id, _, _ in rows]
+
+
+async def purge(
+    db: AsyncSession, *, category_ids: list[int], shards: ProductShards | None = None
+) -> tuple[int, int]:
+    """
+    Delete archived categories for good, with every archived product still
+    pointing at them (they could no longer be restored), and commit.
+    Returns how many categories and products were purged.
+    """
+    archived = select(CategoryArchive.id).where(CategoryArchive.id.in_(category_ids))
+    if shards:
+        products = await crud_shard.purge_products(
+            db, shards, ProductRegistry.category_id.in_(archived)
+        )
+    else:
+        products = await crud_archive.purge(
+            db,
+            ProductArchive,
+            select(ProductArchive.id).where(ProductArchive.category_id.in_(archived)),
+        )
+    categories = await crud_archive.purge(db, CategoryArchive, category_ids)
+    await _commit(db, shards)
+    return categories, products
@@ -0,0 +1,127 @@
+# app/crud/change.py
+import asyncio
+from typing import Sequence
+
+from sqlalchemy import DateTime, Select, String, event, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.broadcast import hub
+from app.core.singleflight import reads
+from app.db.base import utcnow
+from app.models.change import Change
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+_RECORDED = "change_log_recorded"
+# Change rows written by the open transaction, published to the hub on commit.
+_PENDING = "change_log_pending"
+
+_COLUMNS = (
+    Change.id, Change.entity, Change.entity_id, Change.op, Change.category_id, Change.created_at
+)
+
+
+class _Notifier:
+    """Wakes long-polling readers in this worker when a change is committed."""
+
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+        self._event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+notifier = _Notifier()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_RECORDED, False):
+        notifier.notify()
+        # Reads starting after this commit must not join one begun before it.
+        reads.forget()
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        hub.publish(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_RECORDED, None)
+    session.info.pop(_PENDING, None)
+
+
+def _as_event(row) -> dict:
+    return {column.key: getattr(row, column.key) for column in _COLUMNS}
+
+
+def _add_pending(session: Session, rows) -> None:
+    session.info.setdefault(_PENDING, []).extend(_as_event(row) for row in rows)
+
+
+@event.listens_for(Change, "after_insert")
+def _after_insert(mapper, connection, target: Change) -> None:
+    # Cheap when nobody is listening: only the hub needs the inserted ids.
+    if len(hub):
+        _add_pending(object_session(target), [target])
+
+
+def record(
+    db: AsyncSession,
+    *,
+    entity: str,
+    entity_id: int,
+    op: str,
+    category_id: int | None = None,
+) -> None:
+    """Add a change row to the caller's transaction; it is written on commit."""
+    db.add(Change(entity=entity, entity_id=entity_id, op=op, category_id=category_id))
+    db.info[_RECORDED] = True
+
+
+async def record_many(db: AsyncSession, *, entity: str, op: str, rows: Select) -> None:
+    """
+    Add one change row per row of ``rows`` (selecting entity id and
+    category id) with a single INSERT ... SELECT in the caller's transaction.
+    """
+    entity_id, category_id = rows.subquery().c
+    statement = insert(Change).from_select(
+        ["entity", "entity_id", "op", "category_id", "created_at"],
+        select(
+            literal(entity, String),
+            entity_id,
+            literal(op, String),
+            category_id,
+            literal(utcnow(), DateTime),
+        ),
+    )
+    if len(hub):
+        # Live subscribers need the new rows; fetch them in the same round trip.
+        result = await db.execute(statement.returning(*_COLUMNS))
+        _add_pending(db.sync_session, result)
+    else:
+        await db.execute(statement)
+    db.info[_RECORDED] = True
+
+
+async def get_last_id(db: AsyncSession) -> int:
+    """Cursor of the newest change (0 if none)."""
+    result = await db.execute(select(func.max(Change.id)))
+    return result.scalar_one() or 0
+
+
+async def get_since(db: AsyncSession, *, since: int, limit: int) -> Sequence[Change]:
+    result = await db.execute(
+        select(Change).where(Change.id > since).order_by(Change.id).limit(limit)
+    )
+    return result.scalars().all()
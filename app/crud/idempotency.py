@@ -0,0 +1,91 @@
+# app/crud/idempotency.py
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import utcnow
+from app.models.idempotency import IdempotencyKey
+
+
+async def get(db: AsyncSession, *, key: str, route: str) -> IdempotencyKey | None:
+    return await db.get(IdempotencyKey, (key, route), populate_existing=True)
+
+
+async def claim(
+    db: AsyncSession,
+    *,
+    key: str,
+    route: str,
+    body_hash: str,
+    ttl_seconds: int,
+    lock_seconds: int,
+) -> bool:
+    """
+    Insert an in-flight row for ``(key, route)``.
+    Returns False if one already exists: a stored response, or a request
+    still executing (possibly in another worker).
+    """
+    now = utcnow()
+    # Expired keys go first (an index range on expires_at), along with this
+    # key's row if the request that claimed it died before completing.
+    await db.execute(
+        delete(IdempotencyKey).where(
+            or_(
+                IdempotencyKey.expires_at < now,
+                and_(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.route == route,
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.created_at < now - timedelta(seconds=lock_seconds),
+                ),
+            )
+        )
+    )
+    db.add(
+        IdempotencyKey(
+            key=key,
+            route=route,
+            body_hash=body_hash,
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl_seconds),
+        )
+    )
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    return True
+
+
+async def complete(
+    db: AsyncSession,
+    *,
+    key: str,
+    route: str,
+    status_code: int,
+    media_type: str | None,
+    response_headers: dict[str, str],
+    response_body: str,
+) -> None:
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.route == route)
+        .values(
+            status_code=status_code,
+            media_type=media_type,
+            response_headers=response_headers,
+            response_body=response_body,
+        )
+    )
+    await db.commit()
+
+
+async def release(db: AsyncSession, *, key: str, route: str) -> None:
+    """Drop an in-flight row so a retry executes again (the request failed)."""
+    await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.route == route)
+    )
+    await db.commit()
@@ -0,0 +1,117 @@
+# app/crud/job.py
+import uuid
+from datetime import timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import utcnow
+from app.models.job import Job
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+async def get(db: AsyncSession, job_id: str) -> Job | None:
+    return await db.get(Job, job_id, populate_existing=True)
+
+
+async def create(
+    db: AsyncSession, *, kind: str, params: dict[str, Any], total: int | None = None
+) -> Job:
+    db_obj = Job(id=uuid.uuid4().hex, kind=kind, status=PENDING, params=params, total=total)
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+
+def _claimable(lease_seconds: int):
+    cutoff = utcnow() - timedelta(seconds=lease_seconds)
+    return or_(
+        Job.status == PENDING,
+        and_(Job.status == RUNNING, Job.updated_at < cutoff),
+    )
+
+
+async def get_claimable_ids(db: AsyncSession, *, lease_seconds: int) -> Sequence[str]:
+    """Jobs nobody is working on: still pending, or running with an expired lease."""
+    result = await db.execute(
+        select(Job.id)
+        .where(_claimable(lease_seconds))
+        .order_by(Job.created_at)
+    )
+    return result.scalars().all()
+
+
+async def claim(db: AsyncSession, job_id: str, *, lease_seconds: int) -> bool:
+    """
+    Atomically mark a job as running for this worker.
+    Returns False if another worker got there first.
+    """
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .where(_claimable(lease_seconds))
+        .values(status=RUNNING, updated_at=utcnow())
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def checkpoint(db: AsyncSession, job_id: str, *, progress: int) -> bool:
+    """
+    Record progress and renew the lease.
+    Returns True if cancellation has been requested.
+    """
+    await db.execute(
+        update(Job).where(Job.id == job_id).values(progress=progress, updated_at=utcnow())
+    )
+    await db.commit()
+    result = await db.execute(select(Job.cancel_requested).where(Job.id == job_id))
+    return bool(result.scalar_one())
+
+
+async def finish(
+    db: AsyncSession,
+    job_id: str,
+    *,
+    status: str,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=status, result=result, error=error, updated_at=utcnow())
+    )
+    await db.commit()
+
+
+async def request_cancel(db: AsyncSession, db_obj: Job) -> Job:
+    """
+    Cancel a job nobody has claimed yet outright; otherwise flag it, and a
+    running job stops at its next checkpoint. Both are conditional UPDATEs,
+    so a job a worker claims meanwhile is flagged rather than marked
+    cancelled while it runs.
+    """
+    cancelled = await db.execute(
+        update(Job)
+        .where(Job.id == db_obj.id, Job.status == PENDING)
+        .values(status=CANCELLED, cancel_requested=True, updated_at=utcnow())
+    )
+    if cancelled.rowcount == 0:
+        await db.execute(
+            update(Job)
+            .where(Job.id == db_obj.id, Job.status.not_in(FINISHED))
+            .values(cancel_requested=True)
+        )
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
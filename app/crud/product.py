@@ -1,23 +1,175 @@
 # app/crud/product.py
+import asyncio
+import heapq
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from collections.abc import AsyncIterator, Callable, Iterable
+from itertools import islice
 from typing import Sequence
 from math import ceil
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import and_, delete, literal, literal_column, select, func, update as sql_update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload, load_only, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
 
+from app.core.singleflight import reads
+from app.crud import archive as crud_archive
+from app.crud import category as crud_category
+from app.crud import change as crud_change
+from app.crud import shard as crud_shard
+from app.crud import stock as crud_stock
+from app.crud import trigram as crud_trigram
+from app.db.base import utcnow
+from app.db.shards import ProductShards, Shard
+from app.models.archive import ProductArchive
 from app.models.product import Product
 from app.models.category import Category
+from app.models.shard import ProductRegistry
 from app.schemas.product import ProductCreate, ProductUpdate
 
 
-async def get(db: AsyncSession, product_id: int) -> Product | None:
-    result = await db.execute(
+ENTITY = "product"
+NAME_BATCH_SIZE = 10_000
+
+# Whitelisted sort keys ("-" prefix for descending). Each is ordered by an
+# index ending in id, so pages are stable and nothing is sorted in memory:
+# (key, id) globally and (category_id, key, id) for category listings; see
+# Product.__table_args__. id itself only has the primary key.
+_SORT_KEYS = {
+    "name": Product.name,
+    "price": Product.price,
+    "created_at": Product.created_at,
+    "id": None,
+}
+_CATEGORY_SORT_KEYS = {"name", "price", "created_at"}
+
+
+def sort_order(sort: str, *, category_filtered: bool = False) -> tuple:
+    """
+    ORDER BY clauses for ``sort``. Raises ValueError for unknown sorts and
+    for combinations no index can serve in order.
+    """
+    key = sort.removeprefix("-")
+    if key not in _SORT_KEYS:
+        raise ValueError(f"Unknown sort {sort!r}")
+    if category_filtered and key not in _CATEGORY_SORT_KEYS:
+        raise ValueError(f"Sort {sort!r} cannot be combined with a category filter")
+    columns = [column for column in (_SORT_KEYS[key], Product.id) if column is not None]
+    if sort.startswith("-"):
+        columns = [column.desc() for column in columns]
+    return tuple(columns)
+
+
+def _field_options(fields: frozenset[str] | None, *, sharded: bool = False) -> list:
+    """
+    Loader options reading only ``fields`` (a sparse fieldset); the category
+    is only loaded when requested. Other attributes are left unloaded.
+    ``sharded`` queries never load the category (see ``_attach_categories``).
+    """
+    options = []
+    if fields is not None:
+        columns = [getattr(Product, name) for name in fields if name != "category"]
+        options.append(load_only(*columns or [Product.id]))
+    if fields is not None and "category" not in fields:
+        options.append(raiseload(Product.category))
+    elif sharded:
+        options.append(lazyload(Product.category))
+    return options
+
+
+async def _attach_categories(
+    db: AsyncSession, products: Sequence[Product], fields: frozenset[str] | None = None
+) -> None:
+    """
+    Set the category of products read from a shard, which holds no
+    categories, from ``db`` in one query (skipped unless ``fields`` asks).
+    """
+    if not products or (fields is not None and "category" not in fields):
+        return
+    ids = {product.category_id for product in products}
+    result = await db.execute(select(Category).where(Category.id.in_(ids)))
+    categories = {category.id: category for category in result.scalars()}
+    for product in products:
+        set_committed_value(product, "category", categories.get(product.category_id))
+
+
+async def get(
+    db: AsyncSession,
+    product_id: int,
+    *,
+    fields: frozenset[str] | None = None,
+    shard: Shard | None = None,
+) -> Product | None:
+    """The product, read from ``shard`` (its category from ``db``) when sharded."""
+    result = await (shard.session if shard else db).execute(
         select(Product)
         .where(Product.id == product_id)
-        .options()
+        .options(*_field_options(fields, sharded=shard is not None))
     )
-    return result.scalar_one_or_none()
+    product = result.scalar_one_or_none()
+    if shard and product:
+        await _attach_categories(db, [product], fields)
+    return product
+
+
+def _filters(
+    *,
+    search: str | None = None,
+    category_id: int | None = None,
+    category_path: str | None = None,
+    category_ids: Sequence[int] | None = None,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    sku: str | None = None,
+    in_stock: bool | None = None,
+    sort_index: bool = False,
+) -> list:
+    """
+    WHERE clauses of a product listing. With ``sort_index`` a subtree
+    (``category_path`` or ``category_ids``) is matched through ``+category_id``,
+    which SQLite will not look up in an index: each (category_id, key, id)
+    index orders one category only, so a subtree page read from them needs
+    a temp sort, while the whole-catalog (key, id) index yields it in order,
+    filtered by the subtree (see ``get_multi``).
+    """
+    conditions = []
+    if in_stock:
+        # Literal 0 so SQLite matches the partial ix_product_in_stock_name_id.
+        conditions.append(Product.available_quantity > literal_column("0"))
+    elif in_stock is False:
+        conditions.append(Product.available_quantity == 0)
+    if sku:
+        conditions.append(Product.sku == sku)
+    if min_price is not None:
+        conditions.append(Product.price >= min_price)
+    if max_price is not None:
+        conditions.append(Product.price <= max_price)
+    if search:
+        search_pattern = f"%{search.lower()}%"
+        conditions.append(func.lower(Product.name).like(search_pattern))
+
+    subtree_column = (
+        UnaryExpression(Product.category_id, operator=custom_op("+"))
+        if sort_index
+        else Product.category_id
+    )
+    if category_ids is not None:
+        conditions.append(subtree_column.in_(category_ids))
+    elif category_path:
+        # Whole subtree: category ids come from a range scan on the path index.
+        conditions.append(
+            subtree_column.in_(
+                select(Category.id).where(crud_category.subtree_condition(category_path))
+            )
+        )
+    elif category_id:
+        conditions.append(Product.category_id == category_id)
+    return conditions
 
 
 async def get_multi(
@@ -27,50 +179,371 @@ async def get_multi(
     limit: int = 100,
     search: str | None = None,
     category_id: int | None = None,
+    include_subcategories: bool = False,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    sku: str | None = None,
+    in_stock: bool | None = None,
+    sort: str = "name",
+    fields: frozenset[str] | None = None,
 ) -> tuple[Sequence[Product], int]:
     """
-    Get products with pagination, search, and category filter.
+    Get products with pagination, search, category, price range, SKU and
+    availability filters, ordered by a whitelisted ``sort`` (see ``sort_order``).
+    With ``include_subcategories`` the filter covers the category's whole subtree.
+    ``fields`` limits the columns read (see ``_field_options``).
     Returns tuple of (products, total_count).
     """
+    order = sort_order(sort, category_filtered=bool(category_id))
     query = select(Product)
     count_query = select(func.count()).select_from(Product)
 
-    # Apply filters
-    conditions = []
-    if search:
-        search_pattern = f"%{search.lower()}%"
-        conditions.append(func.lower(Product.name).like(search_pattern))
-    
-    if category_id:
-        conditions.append(Product.category_id == category_id)
+    category_path = None
+    if category_id and include_subcategories:
+        category_path = await crud_category.get_path(db, category_id)
+        if category_path is None:
+            return [], 0
 
+    # Apply filters; a subtree page is read in order from the sort index
+    # and only counted through the category indexes (see ``_filters``).
+    filters = dict(
+        search=search,
+        category_id=category_id,
+        category_path=category_path,
+        min_price=min_price,
+        max_price=max_price,
+        sku=sku,
+        in_stock=in_stock,
+    )
+    conditions = _filters(**filters)
     if conditions:
-        combined_condition = and_(*conditions) if len(conditions) > 1 else conditions[0]
-        query = query.where(combined_condition)
-        count_query = count_query.where(combined_condition)
+        query = query.where(*_filters(**filters, sort_index=True))
+        count_query = count_query.where(*conditions)
 
     # Get total count
     total_result = await db.execute(count_query)
     total = total_result.scalar_one()
 
     # Apply pagination and ordering
-    query = query.order_by(Product.name).offset(skip).limit(limit)
-    
+    query = query.order_by(*order).offset(skip).limit(limit).options(*_field_options(fields))
+
     result = await db.execute(query)
     products = result.scalars().all()
-    
+
     return products, total
 
 
-async def create(db: AsyncSession, obj_in: ProductCreate) -> Product:
+def _merge_key(sort: str) -> Callable[[tuple], tuple]:
+    """
+    Python key for ``(sort value, id)`` rows (``(id,)`` when sorting by id)
+    matching ``sort_order(sort)`` ascending, NULLs first as in SQLite.
+    """
+    if sort.removeprefix("-") == "id":
+        return lambda row: row
+    return lambda row: (row[0] is not None, *row)
+
+
+async def get_multi_sharded(
+    db: AsyncSession,
+    shards: Sequence[AsyncSession],
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    search: str | None = None,
+    category_id: int | None = None,
+    include_subcategories: bool = False,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    sku: str | None = None,
+    in_stock: bool | None = None,
+    sort: str = "name",
+    fields: frozenset[str] | None = None,
+) -> tuple[list[Product], int]:
+    """
+    ``get_multi`` over product shards (one session each, in shard order).
+    Every shard counts its matches and reads the sort keys and ids of its
+    first ``skip + limit`` rows from the sort index, all concurrently; the
+    ordered key lists are merged (k-way) into the page, whose products are
+    then loaded from their shards, again concurrently. Deep pages cost
+    ``skip + limit`` keys per shard. Categories are read from ``db``.
+    """
+    order = sort_order(sort, category_filtered=bool(category_id))
+
+    category_ids = None
+    if category_id and include_subcategories:
+        category_path = await crud_category.get_path(db, category_id)
+        if category_path is None:
+            return [], 0
+        # Shards hold no categories: resolve the subtree here.
+        category_ids = (
+            await db.execute(
+                select(Category.id).where(crud_category.subtree_condition(category_path))
+            )
+        ).scalars().all()
+
+    filters = dict(
+        search=search,
+        category_id=category_id,
+        category_ids=category_ids,
+        min_price=min_price,
+        max_price=max_price,
+        sku=sku,
+        in_stock=in_stock,
+    )
+    conditions = _filters(**filters)
+    key_columns = [
+        column for column in (_SORT_KEYS[sort.removeprefix("-")], Product.id) if column is not None
+    ]
+    count_query = select(func.count()).select_from(Product).where(*conditions)
+    keys_query = (
+        select(*key_columns)
+        .where(*_filters(**filters, sort_index=True))
+        .order_by(*order)
+        .limit(skip + limit)
+    )
+
+    async def read_keys(index: int) -> tuple[int, list[tuple]]:
+        session = shards[index]
+        total = (await session.execute(count_query)).scalar_one()
+        rows = (await session.execute(keys_query)).all()
+        return total, [(tuple(row), index) for row in rows]
+
+    results = await asyncio.gather(*(read_keys(index) for index in range(len(shards))))
+    row_key = _merge_key(sort)
+    merged = heapq.merge(
+        *(rows for _, rows in results),
+        key=lambda item: row_key(item[0]),
+        reverse=sort.startswith("-"),
+    )
+    page = list(islice(merged, skip, skip + limit))
+
+    ids_by_shard: dict[int, list[int]] = {}
+    for row, index in page:
+        ids_by_shard.setdefault(index, []).append(row[-1])
+
+    async def load(index: int, ids: list[int]) -> Sequence[Product]:
+        result = await shards[index].execute(
+            select(Product)
+            .where(Product.id.in_(ids))
+            .options(*_field_options(fields, sharded=True))
+        )
+        return result.scalars().all()
+
+    loaded = await asyncio.gather(*(load(index, ids) for index, ids in ids_by_shard.items()))
+    by_id = {product.id: product for products in loaded for product in products}
+    products = [by_id[row[-1]] for row, _ in page if row[-1] in by_id]
+    await _attach_categories(db, products, fields)
+    return products, sum(total for total, _ in results)
+
+
+async def fuzzy_search(
+    db: AsyncSession,
+    *,
+    search: str,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: int | None = None,
+    include_subcategories: bool = False,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
+    sku: str | None = None,
+    in_stock: bool | None = None,
+    fields: frozenset[str] | None = None,
+    min_similarity: float = 0.4,
+    max_candidates: int = 500,
+    max_trigram_products: int = 50_000,
+    shards: Sequence[AsyncSession] | None = None,
+) -> tuple[Sequence[Product], int, bool]:
+    """
+    Typo-tolerant name search: products containing at least
+    ``min_similarity`` of the trigrams of ``search``, best match first (see
+    ``crud.trigram.similarity``), with the same filters as ``get_multi``.
+    Only the ``max_candidates`` products sharing the most trigrams are
+    ranked, and posting lists longer than ``max_trigram_products`` are not
+    read (see ``crud.trigram.common``), so the cost does not grow with the
+    table. Once the candidates run out, matches past them are not counted:
+    the total is then a lower bound, flagged by ``total_is_estimate``.
+    With product ``shards`` (one session each) every shard picks its own
+    candidates, concurrently, and they are ranked together.
+    Returns tuple of (products, total_count, total_is_estimate).
+    """
+    query_trigrams = crud_trigram.trigrams(search)
+    if not query_trigrams:
+        return [], 0, False
+
+    category_path = category_ids = None
+    if category_id and include_subcategories:
+        category_path = await crud_category.get_path(db, category_id)
+        if category_path is None:
+            return [], 0, False
+        if shards is not None:
+            # Shards hold no categories: resolve the subtree here.
+            category_ids = (
+                await db.execute(
+                    select(Category.id).where(crud_category.subtree_condition(category_path))
+                )
+            ).scalars().all()
+
+    conditions = _filters(
+        category_id=category_id,
+        category_path=category_path,
+        category_ids=category_ids,
+        min_price=min_price,
+        max_price=max_price,
+        sku=sku,
+        in_stock=in_stock,
+    )
+
+    async def read_candidates(session: AsyncSession) -> Sequence:
+        common = await crud_trigram.common(
+            session, query_trigrams, max_products=max_trigram_products
+        )
+        # Joined (not ``IN``) so the candidates drive the plan: each is fetched
+        # by primary key, instead of scanning a large category or price range
+        # and probing the candidate list. Outer, with the filters in the join,
+        # so filtered-out candidates still show whether the limit was reached.
+        candidates = crud_trigram.candidates(
+            query_trigrams, min_similarity=min_similarity, limit=max_candidates, unread=common
+        ).subquery()
+        result = await session.execute(
+            select(candidates.c.product_id, Product.name)
+            .select_from(candidates)
+            .outerjoin(Product, and_(Product.id == candidates.c.product_id, *conditions))
+        )
+        return result.all()
+
+    sessions = [db] if shards is None else shards
+    results = await asyncio.gather(*(read_candidates(session) for session in sessions))
+
+    def rank(row) -> tuple:
+        containment, jaccard = crud_trigram.similarity(
+            query_trigrams, crud_trigram.trigrams(row.name)
+        )
+        return -containment, -jaccard, row.name, row.product_id
+
+    # Candidates are only assumed to contain the ``common`` trigrams, and
+    # the filters left the names of the others out.
+    ranked = sorted(
+        key
+        for key in map(rank, (row for rows in results for row in rows if row.name is not None))
+        if -key[0] >= min_similarity
+    )
+    estimate = any(len(rows) == max_candidates for rows in results)
+    page_ids = [key[-1] for key in ranked[skip : skip + limit]]
+    if not page_ids:
+        return [], len(ranked), estimate
+
+    if shards is None:
+        result = await db.execute(
+            select(Product).where(Product.id.in_(page_ids)).options(*_field_options(fields))
+        )
+        by_id = {product.id: product for product in result.scalars()}
+        return [by_id[id_] for id_ in page_ids], len(ranked), estimate
+
+    ids_by_shard: dict[int, list[int]] = {}
+    for id_ in page_ids:
+        # Ids are allocated in their shard's residue class (app/db/shards.py).
+        ids_by_shard.setdefault((id_ - 1) % len(shards), []).append(id_)
+
+    async def load(index: int, ids: list[int]) -> Sequence[Product]:
+        result = await shards[index].execute(
+            select(Product)
+            .where(Product.id.in_(ids))
+            .options(*_field_options(fields, sharded=True))
+        )
+        return result.scalars().all()
+
+    loaded = await asyncio.gather(*(load(index, ids) for index, ids in ids_by_shard.items()))
+    by_id = {product.id: product for products in loaded for product in products}
+    products = [by_id[id_] for id_ in page_ids]
+    await _attach_categories(db, products, fields)
+    return products, len(ranked), estimate
+
+
+async def facet_counts(
+    db: AsyncSession, *, search: str | None = None, sharded: bool = False
+) -> Sequence:
+    """
+    Per-category product counts for a search, as (category_id, name, count)
+    rows ordered by count. Without a search term the precomputed
+    ``Category.product_count`` is read instead of counting products;
+    ``sharded`` searches count the registry's live products.
+    """
+    if not search:
+        query = select(Category.id, Category.name, Category.product_count).where(
+            Category.product_count > 0
+        )
+        order = Category.product_count
+    elif sharded:
+        # Products are on the shards; their names and categories are in the registry.
+        order = func.count()
+        query = (
+            select(ProductRegistry.category_id, Category.name, order)
+            .join(Category, Category.id == ProductRegistry.category_id)
+            .where(
+                ProductRegistry.deleted_at.is_(None),
+                func.lower(ProductRegistry.name).like(f"%{search.lower()}%"),
+            )
+            .group_by(ProductRegistry.category_id, Category.name)
+        )
+    else:
+        # One aggregate over the covering (category_id, name, id) index.
+        order = func.count()
+        query = (
+            select(Product.category_id, Category.name, order)
+            .join(Category, Category.id == Product.category_id)
+            .where(*_filters(search=search))
+            .group_by(Product.category_id, Category.name)
+        )
+    result = await db.execute(query.order_by(order.desc(), Category.name))
+    return result.all()
+
+
+async def stream_names(
+    db: AsyncSession, *, ids: Sequence[int] | None = None
+) -> AsyncIterator[tuple[int, str]]:
+    """(id, name) of every product (or of ``ids``), streamed in batches."""
+    query = select(Product.id, Product.name)
+    if ids is not None:
+        query = query.where(Product.id.in_(ids))
+    result = await db.stream(query.execution_options(yield_per=NAME_BATCH_SIZE))
+    async for id_, name in result:
+        yield id_, name
+
+
+# Coalesced variants for read-only endpoints: concurrent identical calls in
+# this worker share one query and its result objects (see app.core.singleflight).
+get_shared = reads.coalesce(get)
+get_multi_shared = reads.coalesce(get_multi)
+fuzzy_search_shared = reads.coalesce(fuzzy_search)
+facet_counts_shared = reads.coalesce(facet_counts)
+
+
+async def create(db: AsyncSession, obj_in: ProductCreate, *, shard: Shard | None = None) -> Product:
+    """
+    With ``shard`` (app/db/shards.py) the product is registered, counted and
+    logged in ``db`` first, then written to the shard (see app/crud/shard.py).
+    """
     # Verify category exists
     category = await db.get(Category, obj_in.category_id)
     if not category:
         raise ValueError(f"Category with id {obj_in.category_id} does not exist")
+    if shard:
+        return await _create_sharded(db, obj_in, shard)
 
     db_obj = Product(**obj_in.model_dump())
     db.add(db_obj)
     try:
+        await db.flush()
+        await crud_trigram.index(db, db_obj.id, db_obj.name)
+        await crud_category.adjust_product_counts(db, obj_in.category_id, 1)
+        crud_change.record(
+            db,
+            entity=ENTITY,
+            entity_id=db_obj.id,
+            op=crud_change.CREATE,
+            category_id=db_obj.category_id,
+        )
         await db.commit()
     except IntegrityError:
         await db.rollback()
@@ -79,7 +552,44 @@ async def create(db: AsyncSession, obj_in: ProductCreate) -> Product:
     return db_obj
 
 
-async def update(db: AsyncSession, db_obj: Product, obj_in: ProductUpdate) -> Product:
+async def _create_sharded(db: AsyncSession, obj_in: ProductCreate, shard: Shard) -> Product:
+    try:
+        (product_id,) = await crud_shard.allocate_ids(db, shard)
+        # Raises IntegrityError if a product on any shard has the name or SKU.
+        db.add(
+            ProductRegistry(
+                id=product_id,
+                shard=shard.index,
+                category_id=obj_in.category_id,
+                name=obj_in.name,
+                sku=obj_in.sku,
+            )
+        )
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise
+    await crud_category.adjust_product_counts(db, obj_in.category_id, 1)
+    crud_change.record(
+        db,
+        entity=ENTITY,
+        entity_id=product_id,
+        op=crud_change.CREATE,
+        category_id=obj_in.category_id,
+    )
+    await crud_shard.insert_product(
+        db, shard, {**obj_in.model_dump(), "id": product_id, "created_at": utcnow()}
+    )
+    await db.commit()
+    await crud_shard.apply(db, shard)
+    return await get(db, product_id, shard=shard)
+
+
+async def update(
+    db: AsyncSession, db_obj: Product, obj_in: ProductUpdate, *, shard: Shard | None = None
+) -> Product:
+    """Apply ``obj_in``; ``shard`` is where ``db_obj`` was read from, if sharded."""
+    old_category_id = db_obj.category_id
     # If category_id is being updated, verify it exists
     if obj_in.category_id is not None and obj_in.category_id != db_obj.category_id:
         category = await db.get(Category, obj_in.category_id)
@@ -87,9 +597,25 @@ async def update(db: AsyncSession, db_obj: Product, obj_in: ProductUpdate) -> Pr
             raise ValueError(f"Category with id {obj_in.category_id} does not exist")
 
     update_data = obj_in.model_dump(exclude_unset=True)
+    if shard:
+        return await _update_sharded(db, db_obj, update_data, shard)
+
+    if update_data.get("name", db_obj.name) != db_obj.name:
+        await crud_trigram.unindex(db, [db_obj.id])
+        await crud_trigram.index(db, db_obj.id, update_data["name"])
     for field, value in update_data.items():
         setattr(db_obj, field, value)
     try:
+        if db_obj.category_id != old_category_id:
+            await crud_category.adjust_product_counts(db, old_category_id, -1)
+            await crud_category.adjust_product_counts(db, db_obj.category_id, 1)
+        crud_change.record(
+            db,
+            entity=ENTITY,
+            entity_id=db_obj.id,
+            op=crud_change.UPDATE,
+            category_id=db_obj.category_id,
+        )
         await db.commit()
     except IntegrityError:
         await db.rollback()
@@ -98,6 +624,379 @@ async def update(db: AsyncSession, db_obj: Product, obj_in: ProductUpdate) -> Pr
     return db_obj
 
 
-async def remove(db: AsyncSession, db_obj: Product) -> None:
+async def _update_sharded(
+    db: AsyncSession, db_obj: Product, update_data: dict, shard: Shard
+) -> Product:
+    registered = {
+        name: update_data[name] for name in ("name", "sku", "category_id") if name in update_data
+    }
+    category_id = update_data.get("category_id", db_obj.category_id)
+    try:
+        if registered:
+            await db.execute(
+                sql_update(ProductRegistry)
+                .where(ProductRegistry.id == db_obj.id)
+                .values(**registered)
+            )
+    except IntegrityError:
+        await db.rollback()
+        raise
+    if category_id != db_obj.category_id:
+        await crud_category.adjust_product_counts(db, db_obj.category_id, -1)
+        await crud_category.adjust_product_counts(db, category_id, 1)
+    crud_change.record(
+        db,
+        entity=ENTITY,
+        entity_id=db_obj.id,
+        op=crud_change.UPDATE,
+        category_id=category_id,
+    )
+    if update_data:
+        await crud_shard.update_product(db, shard, db_obj.id, update_data)
+    await db.commit()
+    await crud_shard.apply(db, shard)
+    await shard.session.refresh(db_obj)
+    await _attach_categories(db, [db_obj])
+    return db_obj
+
+
+async def move(
+    db: AsyncSession,
+    *,
+    target_category_id: int,
+    product_ids: list[int] | None = None,
+    source_category_id: int | None = None,
+    search: str | None = None,
+    shards: ProductShards | None = None,
+) -> int:
+    """
+    Re-categorize every product matching the selectors (ANDed together)
+    with a single UPDATE (selected in the registry and queued per shard
+    with ``shards``). Returns the number of products moved.
+    """
+    category = await db.get(Category, target_category_id)
+    if not category:
+        raise ValueError(f"Category with id {target_category_id} does not exist")
+    if shards:
+        return await _move_sharded(
+            db,
+            shards,
+            target_category_id=target_category_id,
+            product_ids=product_ids,
+            source_category_id=source_category_id,
+            search=search,
+        )
+
+    conditions = _filters(search=search, category_id=source_category_id)
+    if product_ids is not None:
+        conditions.append(Product.id.in_(product_ids))
+    if not conditions:
+        raise ValueError("Select products by id, source category or search")
+
+    conditions.append(Product.category_id != target_category_id)
+
+    # Per-source tallies for the precomputed category counts.
+    sources = await db.execute(
+        select(Product.category_id, func.count()).where(*conditions).group_by(Product.category_id)
+    )
+    await crud_change.record_many(
+        db,
+        entity=ENTITY,
+        op=crud_change.UPDATE,
+        rows=select(Product.id, literal(target_category_id)).where(*conditions),
+    )
+    result = await db.execute(
+        sql_update(Product)
+        .where(*conditions)
+        .values(category_id=target_category_id)
+        .execution_options(synchronize_session=False)
+    )
+    for source_id, moved in sources.all():
+        await crud_category.adjust_product_counts(db, source_id, -moved)
+    await crud_category.adjust_product_counts(db, target_category_id, result.rowcount)
+    await db.commit()
+    return result.rowcount
+
+
+async def _move_sharded(
+    db: AsyncSession,
+    shards: ProductShards,
+    *,
+    target_category_id: int,
+    product_ids: list[int] | None,
+    source_category_id: int | None,
+    search: str | None,
+) -> int:
+    conditions = []
+    if search:
+        conditions.append(func.lower(ProductRegistry.name).like(f"%{search.lower()}%"))
+    if source_category_id:
+        conditions.append(ProductRegistry.category_id == source_category_id)
+    if product_ids is not None:
+        conditions.append(ProductRegistry.id.in_(product_ids))
+    if not conditions:
+        raise ValueError("Select products by id, source category or search")
+
+    sources = await crud_shard.move_products(
+        db, shards, *conditions, category_id=target_category_id
+    )
+    for source_id, moved in sources.items():
+        await crud_category.adjust_product_counts(db, source_id, -moved)
+    moved = sum(sources.values())
+    await crud_category.adjust_product_counts(db, target_category_id, moved)
+    await crud_shard.commit(db, shards)
+    return moved
+
+
+async def remove(db: AsyncSession, db_obj: Product, *, shard: Shard | None = None) -> None:
+    """
+    Archive a product (see app/crud/archive.py); ``shard`` is where
+    ``db_obj`` was read from, if sharded (its archive is there too).
+    """
+    deleted_at = utcnow()
+    if shard:
+        await crud_shard.archive_products(
+            db, shard.shards, ProductRegistry.id == db_obj.id, deleted_at=deleted_at
+        )
+        await crud_category.adjust_product_counts(db, db_obj.category_id, -1)
+        await db.commit()
+        await crud_shard.apply(db, shard)
+        return
+
+    await crud_archive.archive(
+        db, Product, ProductArchive, Product.id == db_obj.id, deleted_at=deleted_at
+    )
+    await crud_trigram.unindex(db, [db_obj.id])
     await db.delete(db_obj)
-    await db.commit()
\ No newline at end of file
+    await crud_stock.remove_products(db, [db_obj.id])
+    await crud_category.adjust_product_counts(db, db_obj.category_id, -1)
+    crud_change.record(
+        db,
+        entity=ENTITY,
+        entity_id=db_obj.id,
+        op=crud_change.DELETE,
+        category_id=db_obj.category_id,
+    )
+    await db.commit()
+
+
+async def count(db: AsyncSession, *, category_id: int) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(Product).where(Product.category_id == category_id)
+    )
+    return result.scalar_one()
+
+
+async def remove_multi(
+    db: AsyncSession, *, category_id: int, shards: ProductShards | None = None
+) -> int:
+    """
+    Archive every product in a category with a single statement; with
+    ``shards``, one registry update whose archiving is queued per shard
+    (see app/crud/shard.py).
+    """
+    if shards:
+        archived = await crud_shard.archive_products(
+            db, shards, ProductRegistry.category_id == category_id, deleted_at=utcnow()
+        )
+        await crud_category.adjust_product_counts(db, category_id, -archived.total())
+        await crud_shard.commit(db, shards)
+        return archived.total()
+
+    await crud_change.record_many(
+        db,
+        entity=ENTITY,
+        op=crud_change.DELETE,
+        rows=select(Product.id, Product.category_id).where(Product.category_id == category_id),
+    )
+    await crud_archive.archive(
+        db, Product, ProductArchive, Product.category_id == category_id, deleted_at=utcnow()
+    )
+    in_category = select(Product.id).where(Product.category_id == category_id)
+    await crud_trigram.unindex(db, in_category)
+    await crud_stock.remove_products(db, in_category)
+    result = await db.execute(delete(Product).where(Product.category_id == category_id))
+    await crud_category.adjust_product_counts(db, category_id, -result.rowcount)
+    await db.commit()
+    return result.rowcount
+
+
+async def remove_chunk(
+    db: AsyncSession, *, category_id: int, limit: int, deleted_at: datetime
+) -> int:
+    """
+    Archive up to ``limit`` products of a category and commit. Every chunk
+    of one delete shares ``deleted_at``. Returns the number of rows deleted
+    (0 once the category is empty).
+    """
+    ids = (
+        await db.execute(select(Product.id).where(Product.category_id == category_id).limit(limit))
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    await crud_change.record_many(
+        db,
+        entity=ENTITY,
+        op=crud_change.DELETE,
+        rows=select(Product.id, Product.category_id).where(Product.id.in_(ids)),
+    )
+    await crud_archive.archive(
+        db, Product, ProductArchive, Product.id.in_(ids), deleted_at=deleted_at
+    )
+    await crud_trigram.unindex(db, ids)
+    await crud_stock.remove_products(db, ids)
+    result = await db.execute(delete(Product).where(Product.id.in_(ids)))
+    await crud_category.adjust_product_counts(db, category_id, -result.rowcount)
+    await db.commit()
+    return result.rowcount
+
+
+async def get_archived(
+    db: AsyncSession,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    shards: ProductShards | None = None,
+) -> tuple[Sequence[ProductArchive], int]:
+    """
+    Archived products, most recently deleted first, and their total. With
+    ``shards`` the page is read from the registry and its rows from the
+    shards' archives (a product whose archiving is still queued is left out).
+    """
+    if shards:
+        return await _get_archived_sharded(db, shards, skip=skip, limit=limit)
+    total = (await db.execute(select(func.count()).select_from(ProductArchive))).scalar_one()
+    result = await db.execute(
+        select(ProductArchive)
+        .order_by(ProductArchive.deleted_at.desc(), ProductArchive.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all(), total
+
+
+async def _get_archived_sharded(
+    db: AsyncSession, shards: ProductShards, *, skip: int, limit: int
+) -> tuple[list[ProductArchive], int]:
+    archived = ProductRegistry.deleted_at.is_not(None)
+    total = (await db.execute(select(func.count()).where(archived))).scalar_one()
+    page = (
+        await db.execute(
+            select(ProductRegistry.shard, ProductRegistry.id)
+            .where(archived)
+            .order_by(ProductRegistry.deleted_at.desc(), ProductRegistry.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+    ).all()
+    ids_by_shard: dict[int, list[int]] = {}
+    for index, id_ in page:
+        ids_by_shard.setdefault(index, []).append(id_)
+
+    async def load(index: int, ids: list[int]) -> Sequence[ProductArchive]:
+        async with shards.open(index) as shard:
+            result = await shard.session.execute(
+                select(ProductArchive).where(ProductArchive.id.in_(ids))
+            )
+            return result.scalars().all()
+
+    loaded = await asyncio.gather(*(load(index, ids) for index, ids in ids_by_shard.items()))
+    by_id = {product.id: product for products in loaded for product in products}
+    return [by_id[id_] for _, id_ in page if id_ in by_id], total
+
+
+async def _check_categories(db: AsyncSession, category_ids: Iterable[int]) -> None:
+    """Raise ValueError unless every one of ``category_ids`` exists."""
+    category_ids = set(category_ids)
+    found = set(
+        (await db.execute(select(Category.id).where(Category.id.in_(category_ids)))).scalars()
+    )
+    if missing := sorted(category_ids - found):
+        raise ValueError(f"Category with id {missing[0]} does not exist; restore it first")
+
+
+async def restore(
+    db: AsyncSession, *, product_ids: list[int], shards: ProductShards | None = None
+) -> list[int]:
+    """
+    Move archived products back with no stock (their stock rows were
+    dropped) and commit. Ids not in the archive are skipped. Returns the
+    restored ids. Raises ValueError if a product's category is gone
+    (restore it first) and IntegrityError if a live product has taken a
+    name or SKU.
+    """
+    if shards:
+        return await _restore_sharded(db, shards, product_ids=product_ids)
+    rows = (
+        await db.execute(
+            select(ProductArchive.id, ProductArchive.name, ProductArchive.category_id)
+            .where(ProductArchive.id.in_(product_ids))
+            .order_by(ProductArchive.id)
+        )
+    ).all()
+    if not rows:
+        return []
+    per_category = Counter(category_id for _, _, category_id in rows)
+    await _check_categories(db, per_category)
+
+    ids = [id_ for id_, _, _ in rows]
+    try:
+        await crud_archive.restore(
+            db, Product, ProductArchive, ProductArchive.id.in_(ids), available_quantity=0
+        )
+        await crud_trigram.index_many(db, ((id_, name) for id_, name, _ in rows))
+        for category_id, restored in per_category.items():
+            await crud_category.adjust_product_counts(db, category_id, restored)
+        await crud_change.record_many(
+            db,
+            entity=ENTITY,
+            op=crud_change.CREATE,
+            rows=select(Product.id, Product.category_id).where(Product.id.in_(ids)),
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
+    return ids
+
+
+async def _restore_sharded(
+    db: AsyncSession, shards: ProductShards, *, product_ids: list[int]
+) -> list[int]:
+    rows = (
+        await db.execute(
+            select(ProductRegistry.id, ProductRegistry.category_id)
+            .where(ProductRegistry.id.in_(product_ids), ProductRegistry.deleted_at.is_not(None))
+            .order_by(ProductRegistry.id)
+        )
+    ).all()
+    if not rows:
+        return []
+    await _check_categories(db, {category_id for _, category_id in rows})
+
+    ids = [id_ for id_, _ in rows]
+    try:
+        per_category = await crud_shard.restore_products(
+            db, shards, ProductRegistry.id.in_(ids)
+        )
+        for category_id, restored in per_category.items():
+            await crud_category.adjust_product_counts(db, category_id, restored)
+        await crud_shard.commit(db, shards)
+    except IntegrityError:
+        await db.rollback()
+        raise
+    return ids
+
+
+async def purge(
+    db: AsyncSession, *, product_ids: list[int], shards: ProductShards | None = None
+) -> int:
+    """Delete archived products for good and commit. Returns how many were archived."""
+    if shards:
+        purged = await crud_shard.purge_products(db, shards, ProductRegistry.id.in_(product_ids))
+        await crud_shard.commit(db, shards)
+        return purged
+    purged = await crud_archive.purge(db, ProductArchive, product_ids)
+    await db.commit()
+    return purged
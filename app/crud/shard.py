@@ -0,0 +1,436 @@
+# app/crud/shard.py
+"""
+Product writes on shards (app/db/shards.py). A sharded write commits to the
+main database first: the products' ``product_registry`` rows (whose unique
+indexes keep names and SKUs unique across shards), the category counts,
+the change log, and ``shard_write`` rows describing what each shard has to
+do. Writes of many products (a category delete or merge, a bulk move)
+select them in the registry and queue them per shard. Then ``apply``
+(``commit`` for every shard written) replays the shard's pending writes, in id order, in one
+shard transaction that also advances the shard's ``shard_cursor``, so every
+write is applied exactly once, by whichever request or worker gets there
+first. A write whose shard could not be reached stays queued until the
+next write to that shard, or ``replay`` at startup; until then the shard
+lags behind the main database.
+"""
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, delete, insert, literal, null, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import archive as crud_archive
+from app.crud import change as crud_change
+from app.crud import stock as crud_stock
+from app.crud import trigram as crud_trigram
+from app.db.shards import ProductShards, Shard
+from app.models.archive import ProductArchive
+from app.models.product import Product
+from app.models.shard import ProductRegistry, ShardCursor, ShardSequence, ShardWrite
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+RESTORE = "restore"
+PURGE = "purge"
+
+# Pending writes read from the main database per round trip while applying.
+APPLY_BATCH = 100
+
+# Registry rows written per statement when adopting a shard's products.
+ADOPT_BATCH = 1_000
+
+# Product ids per queued write, so a category-wide write is applied in
+# statements of bounded size.
+QUEUE_BATCH = 1_000
+
+# db.info key: shards with writes queued in the session's transaction.
+_QUEUED = "shard_writes_queued"
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _dump(values: dict[str, Any]) -> dict[str, Any]:
+    """Product column values as JSON: decimals as strings, datetimes in ISO format."""
+    return {name: _dump_value(value) for name, value in values.items()}
+
+
+def _load(values: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of ``_dump``, by the type of each product column."""
+    columns = Product.__table__.c
+    loaded = {}
+    for name, value in values.items():
+        python_type = columns[name].type.python_type
+        if value is not None and python_type is Decimal:
+            value = Decimal(value)
+        elif value is not None and python_type is datetime:
+            value = datetime.fromisoformat(value)
+        loaded[name] = value
+    return loaded
+
+
+async def _adopt(db: AsyncSession, shard: Shard) -> None:
+    """Register the products already on ``shard`` and start its id sequence after them."""
+    live = select(Product.id, Product.category_id, Product.name, Product.sku, null())
+    archived = select(
+        ProductArchive.id,
+        ProductArchive.category_id,
+        ProductArchive.name,
+        ProductArchive.sku,
+        ProductArchive.deleted_at,
+    )
+    columns = ("id", "category_id", "name", "sku", "deleted_at")
+    last_id = shard.index + 1 - len(shard.shards)
+    for query in (live, archived):
+        result = await shard.session.stream(query.execution_options(yield_per=ADOPT_BATCH))
+        async for rows in result.partitions():
+            await db.execute(
+                sqlite_insert(ProductRegistry).on_conflict_do_nothing(),
+                [{"shard": shard.index, **dict(zip(columns, row))} for row in rows],
+            )
+            last_id = max(last_id, *(row[0] for row in rows))
+    await db.execute(
+        sqlite_insert(ShardSequence)
+        .values(shard=shard.index, last_id=last_id)
+        .on_conflict_do_nothing()
+    )
+
+
+async def _adopt_missing(db: AsyncSession, shards: ProductShards) -> None:
+    """
+    ``_adopt`` every shard without an id sequence yet, i.e. written before
+    the registry was introduced (or never). Does not commit.
+    """
+    adopted = set((await db.execute(select(ShardSequence.shard))).scalars())
+    for index in range(len(shards)):
+        if index not in adopted:
+            async with shards.open(index) as shard:
+                await _adopt(db, shard)
+
+
+async def allocate_ids(db: AsyncSession, shard: Shard, count: int = 1) -> list[int]:
+    """
+    ``count`` new ids in the shard's residue class, ``(id - 1) % N == index``,
+    from ``shard_sequence`` in the caller's transaction.
+    """
+    step = len(shard.shards)
+    bump = (
+        update(ShardSequence)
+        .where(ShardSequence.shard == shard.index)
+        .values(last_id=ShardSequence.last_id + step * count)
+        .returning(ShardSequence.last_id)
+        .execution_options(synchronize_session=False)
+    )
+    last_id = (await db.execute(bump)).scalar_one_or_none()
+    if last_id is None:
+        # Normally done by ``replay`` at startup.
+        await _adopt_missing(db, shard.shards)
+        last_id = (await db.execute(bump)).scalar_one()
+    return list(range(last_id - step * (count - 1), last_id + 1, step))
+
+
+async def _queue(
+    db: AsyncSession,
+    shards: ProductShards,
+    rows: Iterable[tuple[int, int]],
+    op: str,
+    **payload: Any,
+) -> None:
+    """
+    Queue ``op`` on the products of ``(shard, id)`` rows in the caller's
+    transaction, ``QUEUE_BATCH`` ids per write, pruning the writes shards
+    are known to have applied. ``commit`` (or ``apply``) applies them.
+    """
+    ids: dict[int, list[int]] = {}
+    for index, product_id in rows:
+        ids.setdefault(index, []).append(product_id)
+    for index, shard_ids in ids.items():
+        if shards.applied[index]:
+            await db.execute(
+                delete(ShardWrite).where(
+                    ShardWrite.shard == index, ShardWrite.id <= shards.applied[index]
+                )
+            )
+        for start in range(0, len(shard_ids), QUEUE_BATCH):
+            batch = shard_ids[start : start + QUEUE_BATCH]
+            db.add(ShardWrite(shard=index, op=op, payload={"ids": batch, **payload}))
+        db.info.setdefault(_QUEUED, set()).add(index)
+
+
+async def insert_product(db: AsyncSession, shard: Shard, values: dict[str, Any]) -> None:
+    """Queue a new product (column values, id included) for ``shard``."""
+    await _queue(db, shard.shards, [(shard.index, values["id"])], INSERT, values=_dump(values))
+
+
+async def update_product(
+    db: AsyncSession, shard: Shard, product_id: int, values: dict[str, Any]
+) -> None:
+    """Queue setting ``values`` on a product of ``shard``."""
+    await _queue(db, shard.shards, [(shard.index, product_id)], UPDATE, values=_dump(values))
+
+
+def _registered(conditions: Iterable[ColumnElement[bool]]) -> Select:
+    return (
+        select(ProductRegistry.shard, ProductRegistry.id, ProductRegistry.category_id)
+        .where(*conditions)
+        .order_by(ProductRegistry.id)
+    )
+
+
+async def archive_products(
+    db: AsyncSession,
+    shards: ProductShards,
+    *conditions: ColumnElement[bool],
+    deleted_at: datetime,
+    limit: int | None = None,
+) -> Counter[int]:
+    """
+    Archive the live products matching ``conditions`` on registry columns
+    (only the first ``limit`` by id, if given): log the deletes, drop their
+    stock, mark them deleted and queue archiving them on their shards.
+    Returns how many were archived per category. Does not commit.
+    """
+    selected = [ProductRegistry.deleted_at.is_(None), *conditions]
+    if limit is not None:
+        first = select(ProductRegistry.id).where(*selected).order_by(ProductRegistry.id)
+        selected = [ProductRegistry.id.in_(first.limit(limit))]
+    # The change rows first: their INSERT takes the write lock, so the rows
+    # read next cannot change before they are updated.
+    await crud_change.record_many(
+        db,
+        entity="product",
+        op=crud_change.DELETE,
+        rows=select(ProductRegistry.id, ProductRegistry.category_id).where(*selected),
+    )
+    rows = (await db.execute(_registered(selected))).all()
+    await crud_stock.remove_products(db, select(ProductRegistry.id).where(*selected))
+    await db.execute(
+        update(ProductRegistry)
+        .where(*selected)
+        .values(deleted_at=deleted_at)
+        .execution_options(synchronize_session=False)
+    )
+    await _queue(
+        db,
+        shards,
+        ((index, product_id) for index, product_id, _ in rows),
+        DELETE,
+        deleted_at=deleted_at.isoformat(),
+    )
+    return Counter(category_id for _, _, category_id in rows)
+
+
+async def move_products(
+    db: AsyncSession,
+    shards: ProductShards,
+    *conditions: ColumnElement[bool],
+    category_id: int,
+) -> Counter[int]:
+    """
+    Re-categorize the live products matching ``conditions`` (on registry
+    columns) and queue it. Returns how many left each category. Does not
+    commit.
+    """
+    selected = [
+        ProductRegistry.deleted_at.is_(None),
+        *conditions,
+        ProductRegistry.category_id != category_id,
+    ]
+    await crud_change.record_many(
+        db,
+        entity="product",
+        op=crud_change.UPDATE,
+        rows=select(ProductRegistry.id, literal(category_id)).where(*selected),
+    )
+    rows = (await db.execute(_registered(selected))).all()
+    await db.execute(
+        update(ProductRegistry)
+        .where(*selected)
+        .values(category_id=category_id)
+        .execution_options(synchronize_session=False)
+    )
+    await _queue(
+        db,
+        shards,
+        ((index, product_id) for index, product_id, _ in rows),
+        UPDATE,
+        values={"category_id": category_id},
+    )
+    return Counter(source_id for _, _, source_id in rows)
+
+
+async def restore_products(
+    db: AsyncSession, shards: ProductShards, *conditions: ColumnElement[bool]
+) -> Counter[int]:
+    """
+    Bring back the archived products matching ``conditions`` (on registry
+    columns), without stock, and queue it. Returns how many per category.
+    Raises IntegrityError if a live product has taken a name or SKU. Does
+    not commit.
+    """
+    selected = [ProductRegistry.deleted_at.is_not(None), *conditions]
+    await crud_change.record_many(
+        db,
+        entity="product",
+        op=crud_change.CREATE,
+        rows=select(ProductRegistry.id, ProductRegistry.category_id).where(*selected),
+    )
+    rows = (await db.execute(_registered(selected))).all()
+    await db.execute(
+        update(ProductRegistry)
+        .where(*selected)
+        .values(deleted_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    await _queue(db, shards, ((index, product_id) for index, product_id, _ in rows), RESTORE)
+    return Counter(category_id for _, _, category_id in rows)
+
+
+async def purge_products(
+    db: AsyncSession, shards: ProductShards, *conditions: ColumnElement[bool]
+) -> int:
+    """
+    Forget the archived products matching ``conditions`` (on registry
+    columns) and queue dropping them for good. Returns how many there were.
+    Does not commit.
+    """
+    rows = (
+        await db.execute(
+            delete(ProductRegistry)
+            .where(ProductRegistry.deleted_at.is_not(None), *conditions)
+            .returning(ProductRegistry.shard, ProductRegistry.id)
+        )
+    ).all()
+    await _queue(db, shards, rows, PURGE)
+    return len(rows)
+
+
+async def _apply_insert(session: AsyncSession, payload: dict[str, Any]) -> None:
+    values = _load(payload["values"])
+    await session.execute(insert(Product).values(**values))
+    await crud_trigram.index(session, values["id"], values["name"])
+
+
+async def _apply_update(session: AsyncSession, payload: dict[str, Any]) -> None:
+    ids, values = payload["ids"], _load(payload["values"])
+    if "name" in values:
+        await crud_trigram.unindex(session, ids)
+        await crud_trigram.index_many(session, ((id_, values["name"]) for id_ in ids))
+    await session.execute(
+        update(Product)
+        .where(Product.id.in_(ids))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _apply_delete(session: AsyncSession, payload: dict[str, Any]) -> None:
+    ids = payload["ids"]
+    deleted_at = datetime.fromisoformat(payload["deleted_at"])
+    await crud_archive.archive(
+        session, Product, ProductArchive, Product.id.in_(ids), deleted_at=deleted_at
+    )
+    await crud_trigram.unindex(session, ids)
+    await session.execute(delete(Product).where(Product.id.in_(ids)))
+
+
+async def _apply_restore(session: AsyncSession, payload: dict[str, Any]) -> None:
+    condition = ProductArchive.id.in_(payload["ids"])
+    names = (
+        await session.execute(select(ProductArchive.id, ProductArchive.name).where(condition))
+    ).all()
+    await crud_archive.restore(
+        session, Product, ProductArchive, condition, available_quantity=0
+    )
+    await crud_trigram.index_many(session, names)
+
+
+async def _apply_purge(session: AsyncSession, payload: dict[str, Any]) -> None:
+    await crud_archive.purge(session, ProductArchive, payload["ids"])
+
+
+_APPLY = {
+    INSERT: _apply_insert,
+    UPDATE: _apply_update,
+    DELETE: _apply_delete,
+    RESTORE: _apply_restore,
+    PURGE: _apply_purge,
+}
+
+
+async def apply(db: AsyncSession, shard: Shard) -> int:
+    """
+    Apply the shard's pending writes (read from ``db``) and commit the
+    shard. Returns how many were applied.
+    """
+    session = shard.session
+    # Start a write transaction (ending any read one) and take the shard's
+    # write lock before reading the cursor: concurrent appliers queue here
+    # and find the writes applied by the one before them.
+    await session.commit()
+    applied = (
+        await session.execute(
+            update(ShardCursor)
+            .values(applied=ShardCursor.applied)
+            .returning(ShardCursor.applied)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalar_one()
+    done = 0
+    try:
+        while writes := (
+            await db.execute(
+                select(ShardWrite.id, ShardWrite.op, ShardWrite.payload)
+                .where(ShardWrite.shard == shard.index, ShardWrite.id > applied)
+                .order_by(ShardWrite.id)
+                .limit(APPLY_BATCH)
+            )
+        ).all():
+            for _, op, payload in writes:
+                await _APPLY[op](session, payload)
+            applied = writes[-1].id
+            done += len(writes)
+        if done:
+            await session.execute(update(ShardCursor).values(applied=applied))
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    shard.shards.applied[shard.index] = max(shard.shards.applied[shard.index], applied)
+    db.info.get(_QUEUED, set()).discard(shard.index)
+    return done
+
+
+async def apply_many(db: AsyncSession, shards: ProductShards, indexes: Iterable[int]) -> None:
+    """``apply`` on each of the shards ``indexes``, one after the other."""
+    for index in sorted(indexes):
+        async with shards.open(index) as shard:
+            await apply(db, shard)
+
+
+async def commit(db: AsyncSession, shards: ProductShards) -> None:
+    """Commit ``db``, then apply the writes it queued on each of their shards."""
+    await db.commit()
+    await apply_many(db, shards, db.info.pop(_QUEUED, ()))
+
+
+async def replay(session_factory: sessionmaker, shards: ProductShards) -> None:
+    """
+    Register the products of shards written before the registry existed,
+    then apply every shard's pending writes. Run at startup.
+    """
+    async with session_factory() as db:
+        await _adopt_missing(db, shards)
+        await db.commit()
+        await apply_many(db, shards, range(len(shards)))
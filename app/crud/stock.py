@@ -0,0 +1,445 @@
+# app/crud/stock.py
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import NamedTuple, Sequence
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Select,
+    String,
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update as sql_update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import change as crud_change
+from app.db.base import utcnow
+from app.models.product import Product
+from app.models.stock_movement import StockDailySnapshot, StockMovement
+from app.models.warehouse import StockLevel, Warehouse
+from app.schemas.warehouse import StockMovementCreate, WarehouseCreate
+
+# Rows per executemany / IN list.
+BATCH_SIZE = 5_000
+
+RECEIPT = "receipt"
+SALE = "sale"
+ADJUSTMENT = "adjustment"
+SNAPSHOT = "snapshot"
+
+_products = Product.__table__
+_levels = StockLevel.__table__
+
+# Movements are stamped before they commit, so a day is only compacted once
+# the day after it has ended too: a movement stamped just before midnight
+# that commits after the nightly compaction still precedes its day's snapshot.
+COMPACT_SETTLE_DAYS = 1
+
+# (product_id, warehouse_id) -> (old quantity, new quantity)
+_LevelChanges = dict[tuple[int, int], tuple[int, int]]
+
+
+class SnapshotResult(NamedTuple):
+    changed: int
+    unchanged: int
+    unknown_skus: list[str]
+
+
+def _batched(items: Iterable, size: int = BATCH_SIZE) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def get_warehouse(db: AsyncSession, warehouse_id: int) -> Warehouse | None:
+    return await db.get(Warehouse, warehouse_id)
+
+
+async def get_warehouses(db: AsyncSession) -> Sequence[Warehouse]:
+    result = await db.execute(select(Warehouse).order_by(Warehouse.code))
+    return result.scalars().all()
+
+
+async def create_warehouse(db: AsyncSession, obj_in: WarehouseCreate) -> Warehouse:
+    db_obj = Warehouse(**obj_in.model_dump())
+    db.add(db_obj)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
+    await db.refresh(db_obj)
+    return db_obj
+
+
+async def get_levels(db: AsyncSession, product_id: int) -> Sequence[StockLevel]:
+    """A product's stock per warehouse (one primary key range)."""
+    result = await db.execute(
+        select(StockLevel)
+        .where(StockLevel.product_id == product_id)
+        .order_by(StockLevel.warehouse_id)
+    )
+    return result.scalars().all()
+
+
+async def remove_products(db: AsyncSession, product_ids: Sequence[int] | Select) -> None:
+    """
+    Drop the stock rows of products being deleted, journalling an
+    "adjustment" that takes each one to zero (restored products come back
+    empty, so the journal keeps matching). Does not commit.
+    """
+    in_products = StockLevel.product_id.in_(product_ids)
+    await db.execute(
+        insert(StockMovement).from_select(
+            ["product_id", "warehouse_id", "delta", "reason", "reference", "created_at"],
+            select(
+                StockLevel.product_id,
+                StockLevel.warehouse_id,
+                -StockLevel.quantity,
+                literal(ADJUSTMENT, String),
+                literal("delete", String),
+                literal(utcnow(), DateTime),
+            ).where(in_products),
+        )
+    )
+    await db.execute(delete(StockLevel).where(in_products))
+
+
+async def _write_levels(db: AsyncSession, changes: _LevelChanges) -> None:
+    """
+    Store the new quantities of ``changes`` and move each product's
+    ``available_quantity`` by its net difference: batched executemany
+    INSERTs, UPDATEs and DELETEs (rows exist only for positive
+    quantities). Existing rows and totals move by the difference rather
+    than being overwritten, and inserting a row another transaction has
+    created meanwhile adds to it instead (upsert). Records a change log
+    entry per product. Does not commit.
+    """
+    now = utcnow()
+    inserts, updates, emptied = [], [], []
+    available: dict[int, int] = defaultdict(int)
+    for (product_id, warehouse_id), (old, new) in changes.items():
+        row = {
+            "b_product_id": product_id,
+            "b_warehouse_id": warehouse_id,
+            "b_quantity": new,
+            "b_delta": new - old,
+        }
+        if old:
+            # Relative, so a concurrent writer's change is not overwritten.
+            updates.append(row)
+            if not new:
+                emptied.append(row)
+        else:
+            inserts.append(row)
+        available[product_id] += new - old
+
+    same_row = (
+        _levels.c.product_id == bindparam("b_product_id"),
+        _levels.c.warehouse_id == bindparam("b_warehouse_id"),
+    )
+    first_level = sqlite_insert(_levels).values(
+        product_id=bindparam("b_product_id"),
+        warehouse_id=bindparam("b_warehouse_id"),
+        quantity=bindparam("b_quantity"),
+        updated_at=now,
+    )
+    statements = [
+        (
+            first_level.on_conflict_do_update(
+                index_elements=[_levels.c.product_id, _levels.c.warehouse_id],
+                set_={
+                    "quantity": _levels.c.quantity + first_level.excluded.quantity,
+                    "updated_at": now,
+                },
+            ),
+            inserts,
+        ),
+        (
+            sql_update(_levels)
+            .where(*same_row)
+            .values(quantity=_levels.c.quantity + bindparam("b_delta"), updated_at=now),
+            updates,
+        ),
+        (delete(_levels).where(*same_row, _levels.c.quantity <= 0), emptied),
+        (
+            sql_update(_products)
+            .where(_products.c.id == bindparam("b_product_id"))
+            .values(available_quantity=_products.c.available_quantity + bindparam("b_delta")),
+            [
+                {"b_product_id": product_id, "b_delta": delta}
+                for product_id, delta in available.items()
+                if delta
+            ],
+        ),
+    ]
+    for statement, rows in statements:
+        for batch in _batched(rows):
+            await db.execute(statement, batch)
+
+    for batch in _batched(available):
+        await crud_change.record_many(
+            db,
+            entity="product",
+            op=crud_change.UPDATE,
+            rows=select(Product.id, Product.category_id).where(Product.id.in_(batch)),
+        )
+
+
+async def _journal(db: AsyncSession, movements: list[dict]) -> None:
+    """Append movements (StockMovement column dicts) in executemany batches."""
+    now = utcnow()
+    for batch in _batched(movements):
+        await db.execute(
+            insert(StockMovement), [{**movement, "created_at": now} for movement in batch]
+        )
+
+
+async def record_movements(db: AsyncSession, movements: Sequence[StockMovementCreate]) -> int:
+    """
+    Journal a batch of receipts, sales and adjustments and apply them to
+    the stock levels and availability, all in one transaction. Raises
+    ValueError (writing nothing) for unknown products or warehouses, or if
+    a warehouse's stock of a product would go negative. Returns how many
+    movements were recorded.
+    """
+    net: dict[tuple[int, int], int] = defaultdict(int)
+    for movement in movements:
+        net[(movement.product_id, movement.warehouse_id)] += movement.delta
+
+    product_ids = {product_id for product_id, _ in net}
+    warehouse_ids = {warehouse_id for _, warehouse_id in net}
+    found = set()
+    for batch in _batched(product_ids):
+        found.update((await db.execute(select(Product.id).where(Product.id.in_(batch)))).scalars())
+    if missing := product_ids - found:
+        raise ValueError(f"Products do not exist: {sorted(missing)}")
+    found = set(
+        (await db.execute(select(Warehouse.id).where(Warehouse.id.in_(warehouse_ids)))).scalars()
+    )
+    if missing := warehouse_ids - found:
+        raise ValueError(f"Warehouses do not exist: {sorted(missing)}")
+
+    current: dict[tuple[int, int], int] = {}
+    for batch in _batched(net):
+        rows = await db.execute(
+            select(StockLevel.product_id, StockLevel.warehouse_id, StockLevel.quantity).where(
+                tuple_(StockLevel.product_id, StockLevel.warehouse_id).in_(batch)
+            )
+        )
+        current.update(((product_id, warehouse_id), qty) for product_id, warehouse_id, qty in rows)
+
+    changes: _LevelChanges = {}
+    for pair, delta in net.items():
+        old = current.get(pair, 0)
+        if old + delta < 0:
+            raise ValueError(
+                f"Stock of product {pair[0]} in warehouse {pair[1]} would drop below zero"
+            )
+        if delta:
+            changes[pair] = (old, old + delta)
+
+    await _write_levels(db, changes)
+    await _journal(db, [movement.model_dump() for movement in movements])
+    await db.commit()
+    return len(movements)
+
+
+async def apply_snapshot(
+    db: AsyncSession, *, warehouse_id: int, levels: Iterable[tuple[str, int]]
+) -> SnapshotResult:
+    """
+    Make ``levels`` ((sku, quantity) pairs) the warehouse's complete stock:
+    listed products get their quantity, unlisted ones drop to zero. Only
+    differing rows are written (see ``_write_levels``), and each difference
+    is journalled as a "snapshot" movement. Commits once.
+    """
+    quantities = dict(levels)
+    product_ids: dict[str, int] = {}
+    for batch in _batched(quantities):
+        rows = await db.execute(select(Product.sku, Product.id).where(Product.sku.in_(batch)))
+        product_ids.update(rows.all())
+    target = {
+        product_ids[sku]: quantity for sku, quantity in quantities.items() if sku in product_ids
+    }
+
+    rows = await db.execute(
+        select(StockLevel.product_id, StockLevel.quantity).where(
+            StockLevel.warehouse_id == warehouse_id
+        )
+    )
+    current = dict(rows.all())
+
+    changes: _LevelChanges = {
+        (product_id, warehouse_id): (current.get(product_id, 0), target.get(product_id, 0))
+        for product_id in target.keys() | current.keys()
+        if target.get(product_id, 0) != current.get(product_id, 0)
+    }
+    await _write_levels(db, changes)
+    await _journal(
+        db,
+        [
+            {
+                "product_id": product_id,
+                "warehouse_id": warehouse_id,
+                "delta": new - old,
+                "reason": SNAPSHOT,
+            }
+            for (product_id, _), (old, new) in changes.items()
+        ],
+    )
+    await db.commit()
+    return SnapshotResult(
+        changed=len(changes),
+        unchanged=sum(1 for product_id in target if (product_id, warehouse_id) not in changes),
+        unknown_skus=sorted(quantities.keys() - product_ids.keys()),
+    )
+
+
+async def get_movements(
+    db: AsyncSession,
+    *,
+    product_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 100,
+) -> Sequence[StockMovement]:
+    """
+    Movements in ``[since, until)``, oldest first; with ``product_id`` only
+    that product's. Either way one range scan of a created_at index.
+    """
+    query = select(StockMovement)
+    if product_id is not None:
+        query = query.where(StockMovement.product_id == product_id)
+    if since is not None:
+        query = query.where(StockMovement.created_at >= since)
+    if until is not None:
+        query = query.where(StockMovement.created_at < until)
+    result = await db.execute(
+        query.order_by(StockMovement.created_at, StockMovement.id).limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def quantity_as_of(db: AsyncSession, *, product_id: int, at: datetime) -> int:
+    """
+    A product's total quantity at ``at``: its latest daily snapshot from
+    before that day plus the movements since. Once compaction is current,
+    the tail is at most the movements of ``at``'s own day.
+    """
+    snapshot = (
+        await db.execute(
+            select(StockDailySnapshot.day, StockDailySnapshot.quantity)
+            .where(StockDailySnapshot.product_id == product_id, StockDailySnapshot.day < at.date())
+            .order_by(StockDailySnapshot.day.desc())
+            .limit(1)
+        )
+    ).first()
+    tail = select(func.coalesce(func.sum(StockMovement.delta), 0)).where(
+        StockMovement.product_id == product_id, StockMovement.created_at <= at
+    )
+    if snapshot is None:
+        return (await db.execute(tail)).scalar_one()
+    since = datetime.combine(snapshot.day + timedelta(days=1), time())
+    tail = tail.where(StockMovement.created_at >= since)
+    return snapshot.quantity + (await db.execute(tail)).scalar_one()
+
+
+async def compact(db: AsyncSession, *, until: date) -> int:
+    """
+    Write daily snapshots for every day before ``until`` not compacted yet,
+    one statement and commit per day: each product that moved that day
+    gets its previous snapshot plus the day's net movement. Days within
+    ``COMPACT_SETTLE_DAYS`` of today are left for a later run whatever
+    ``until`` says. The journal itself is kept. Safe to re-run; returns the
+    number of days compacted.
+    """
+    until = min(until, utcnow().date() - timedelta(days=COMPACT_SETTLE_DAYS))
+    last_day = (await db.execute(select(func.max(StockDailySnapshot.day)))).scalar_one()
+    if last_day is not None:
+        day = last_day + timedelta(days=1)
+    else:
+        first = (await db.execute(select(func.min(StockMovement.created_at)))).scalar_one()
+        if first is None:
+            return 0
+        day = first.date()
+
+    previous = (
+        select(StockDailySnapshot.quantity)
+        .where(
+            StockDailySnapshot.product_id == StockMovement.product_id,
+            StockDailySnapshot.day < bindparam("day", type_=Date),
+        )
+        .order_by(StockDailySnapshot.day.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    statement = insert(StockDailySnapshot.__table__).from_select(
+        ["product_id", "day", "quantity"],
+        select(
+            StockMovement.product_id,
+            bindparam("day", type_=Date),
+            func.coalesce(previous, 0) + func.sum(StockMovement.delta),
+        )
+        .where(
+            StockMovement.created_at >= bindparam("start"),
+            StockMovement.created_at < bindparam("end"),
+        )
+        .group_by(StockMovement.product_id),
+    )
+
+    days = 0
+    while day < until:
+        start = datetime.combine(day, time())
+        await db.execute(
+            statement, {"day": day, "start": start, "end": start + timedelta(days=1)}
+        )
+        await db.commit()
+        day += timedelta(days=1)
+        days += 1
+    return days
+
+
+async def refresh_sales_velocity(db: AsyncSession, *, until: date, window_days: int) -> int:
+    """
+    Set ``Product.sales_velocity`` to units sold per day over the
+    ``window_days`` before ``until``, from the journal's sales (one range
+    of the created_at index). Returns the number of products with sales.
+    """
+    start = datetime.combine(until - timedelta(days=window_days), time())
+    sold = (
+        select(StockMovement.product_id, (-func.sum(StockMovement.delta)).label("units"))
+        .where(
+            StockMovement.reason == SALE,
+            StockMovement.created_at >= start,
+            StockMovement.created_at < datetime.combine(until, time()),
+        )
+        .group_by(StockMovement.product_id)
+        .subquery()
+    )
+    await db.execute(
+        sql_update(_products)
+        .where(
+            _products.c.sales_velocity != 0,
+            _products.c.id.not_in(select(sold.c.product_id)),
+        )
+        .values(sales_velocity=0.0)
+    )
+    result = await db.execute(
+        sql_update(_products)
+        .where(_products.c.id == sold.c.product_id)
+        .values(sales_velocity=sold.c.units / float(window_days))
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,136 @@
+# app/crud/trigram.py
+"""
+Trigram index over product names for typo-tolerant search. Every product
+write that adds, renames or deletes a product keeps ``product_trigram``
+and its posting list lengths (``product_trigram_count``) in step within
+the same transaction. About 20 postings per product; see
+scripts/bench_fuzzy_search.py for latency at a million products.
+"""
+import math
+from collections import Counter
+from typing import Iterable, Sequence
+
+from sqlalchemy import Select, bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product_trigram import ProductTrigram, ProductTrigramCount
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Distinct lower-case trigrams of each alphanumeric word in ``text``, each
+    word padded with two leading spaces and one trailing space (as in
+    PostgreSQL's pg_trgm), so word starts carry more trigrams than word ends.
+    """
+    words = "".join(c if c.isalnum() else " " for c in text.casefold()).split()
+    result = set()
+    for word in words:
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(query: set[str], name: set[str]) -> tuple[float, float]:
+    """
+    Rank key of a name for a query: the share of the query's trigrams found
+    in the name (long names are not penalized), then Jaccard similarity
+    (names closest to the query as a whole first).
+    """
+    shared = len(query & name)
+    return shared / len(query), shared / len(query | name)
+
+
+async def index(db: AsyncSession, product_id: int, name: str) -> None:
+    """Add the postings of a new (or just unindexed) product. Does not commit."""
+    await index_many(db, [(product_id, name)])
+
+
+async def index_many(db: AsyncSession, products: Iterable[tuple[int, str]]) -> None:
+    """
+    Add the postings of ``(id, name)`` products in one executemany, and
+    count them in another. Does not commit.
+    """
+    postings = [
+        {"trigram": trigram, "product_id": product_id}
+        for product_id, name in products
+        for trigram in trigrams(name)
+    ]
+    if not postings:
+        return
+    await db.execute(insert(ProductTrigram), postings)
+    added = sqlite_insert(ProductTrigramCount).values(
+        trigram=bindparam("b_trigram"), products=bindparam("b_products")
+    )
+    await db.execute(
+        added.on_conflict_do_update(
+            index_elements=[ProductTrigramCount.trigram],
+            set_={"products": ProductTrigramCount.products + added.excluded.products},
+        ),
+        [
+            {"b_trigram": trigram, "b_products": count}
+            for trigram, count in Counter(posting["trigram"] for posting in postings).items()
+        ],
+    )
+
+
+async def unindex(db: AsyncSession, product_ids: Sequence[int] | Select) -> None:
+    """Drop the postings of ``product_ids`` (a list or an id subquery). Does not commit."""
+    condition = ProductTrigram.product_id.in_(product_ids)
+    dropped = (
+        select(ProductTrigram.trigram, func.count().label("products"))
+        .where(condition)
+        .group_by(ProductTrigram.trigram)
+        .subquery()
+    )
+    await db.execute(
+        update(ProductTrigramCount)
+        .where(ProductTrigramCount.trigram == dropped.c.trigram)
+        .values(products=ProductTrigramCount.products - dropped.c.products)
+    )
+    await db.execute(delete(ProductTrigram).where(condition))
+
+
+async def common(db: AsyncSession, query: set[str], *, max_products: int) -> set[str]:
+    """
+    The trigrams of ``query`` in more than ``max_products`` names, but for
+    the least common one: reading their posting lists would cost more than
+    the rest of the search. One primary key lookup per trigram.
+    """
+    result = await db.execute(
+        select(ProductTrigramCount.trigram, ProductTrigramCount.products).where(
+            ProductTrigramCount.trigram.in_(sorted(query))
+        )
+    )
+    counts = dict(result.all())
+    frequent = {trigram for trigram in query if counts.get(trigram, 0) > max_products}
+    if frequent == query:
+        frequent.remove(min(query, key=lambda trigram: (counts[trigram], trigram)))
+    return frequent
+
+
+def candidates(
+    query: set[str],
+    *,
+    min_similarity: float,
+    limit: int,
+    unread: frozenset[str] | set[str] = frozenset(),
+) -> Select:
+    """
+    Ids of up to ``limit`` products sharing the most trigrams with
+    ``query``, skipping those sharing too few to reach ``min_similarity``.
+    Reads only the posting lists of the query's trigrams (primary key
+    ranges), never the product table. The lists of ``unread`` (see
+    ``common``) are skipped too: products are assumed to contain those
+    trigrams, so callers must check the similarity of the results.
+    """
+    shared = func.count().label("shared")
+    needed = math.ceil(len(query) * min_similarity) - len(query & unread)
+    return (
+        select(ProductTrigram.product_id)
+        .where(ProductTrigram.trigram.in_(sorted(query - unread)))
+        .group_by(ProductTrigram.product_id)
+        .having(shared >= max(1, needed))
+        .order_by(shared.desc(), ProductTrigram.product_id)
+        .limit(limit)
+    )
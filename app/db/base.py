@@ -1,4 +1,6 @@
 # app/db/base.py
+from datetime import datetime, timezone
+
 from sqlalchemy.orm import DeclarativeBase, declared_attr
 from sqlalchemy import MetaData
 
@@ -20,4 +22,9 @@ class Base(DeclarativeBase):
 
     @declared_attr.directive
     def __tablename__(cls) -> str:  # type: ignore
-        return cls.__name__.lower()
\ No newline at end of file
+        return cls.__name__.lower()
+
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, the form stored in DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,77 @@
+# app/db/migrate.py
+# Alembic is imported lazily: workers that only verify the schema revision
+# should not pay for loading it on every boot.
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+# Revision matching the schema ``Base.metadata.create_all`` produced before
+# migrations were introduced.
+BASELINE_REVISION = "0001"
+
+# Latest revision in ``migrations/versions``; bump together with every new
+# revision (tests/test_migrations.py guards against drift).
+HEAD_REVISION = "0015"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def get_config(connection: Connection | None = None) -> "Config":
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _upgrade(connection: Connection, revision: str) -> None:
+    from alembic import command
+
+    config = get_config(connection)
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" not in tables and "product" in tables:
+        # Database created by the old create_all startup hook.
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+
+async def upgrade(engine: AsyncEngine, revision: str = "head") -> None:
+    """Bring the database behind ``engine`` up to ``revision``."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade, revision)
+
+
+async def current_revision(engine: AsyncEngine) -> str | None:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except OperationalError:
+            return None
+        return result.scalar_one_or_none()
+
+
+async def verify(engine: AsyncEngine) -> None:
+    """Fail fast unless the database is already at ``HEAD_REVISION``.
+
+    A single indexed read of ``alembic_version``; no reflection, no DDL.
+    """
+    revision = await current_revision(engine)
+    if revision != HEAD_REVISION:
+        raise SchemaVersionError(
+            f"Database schema is at revision {revision!r}, expected {HEAD_REVISION!r}. "
+            "Run `python -m app.cli migrate` before starting workers."
+        )
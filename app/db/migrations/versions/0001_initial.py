@@ -0,0 +1,64 @@
+"""initial schema
+
+Mirrors the tables that ``Base.metadata.create_all`` used to build on
+startup, so databases created before migrations existed can be stamped
+at this revision and upgraded from here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "category",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_category")),
+    )
+    op.create_index(op.f("ix_category_id"), "category", ["id"], unique=False)
+    op.create_index(op.f("ix_category_name"), "category", ["name"], unique=True)
+
+    op.create_table(
+        "product",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["category_id"],
+            ["category.id"],
+            name=op.f("fk_product_category_id_category"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_product")),
+    )
+    op.create_index(op.f("ix_product_id"), "product", ["id"], unique=False)
+    op.create_index(op.f("ix_product_name"), "product", ["name"], unique=True)
+    op.create_index(op.f("ix_product_category_id"), "product", ["category_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_product_category_id"), table_name="product")
+    op.drop_index(op.f("ix_product_name"), table_name="product")
+    op.drop_index(op.f("ix_product_id"), table_name="product")
+    op.drop_table("product")
+    op.drop_index(op.f("ix_category_name"), table_name="category")
+    op.drop_index(op.f("ix_category_id"), table_name="category")
+    op.drop_table("category")
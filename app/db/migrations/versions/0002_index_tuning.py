@@ -0,0 +1,45 @@
+"""tune product and category indexes for the list/filter/keyset queries
+
+* ``ix_category_id`` / ``ix_product_id`` duplicated the primary keys.
+* ``ix_product_category_id`` is a prefix of the new composite index.
+* ``ix_product_category_id_name_id`` serves ``WHERE category_id = ?
+  ORDER BY name, id`` (and keyset continuation on ``(name, id)``) as a
+  single range scan without a temp B-tree sort.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index("ix_category_id", table_name="category")
+    op.drop_index("ix_product_id", table_name="product")
+    op.drop_index("ix_product_category_id", table_name="product")
+    op.create_index(
+        "ix_product_category_id_name_id",
+        "product",
+        ["category_id", "name", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_category_id_name_id", table_name="product")
+    op.create_index("ix_product_category_id", "product", ["category_id"], unique=False)
+    op.create_index("ix_product_id", "product", ["id"], unique=False)
+    op.create_index("ix_category_id", "category", ["id"], unique=False)
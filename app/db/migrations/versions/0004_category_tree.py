@@ -0,0 +1,66 @@
+"""hierarchical categories: parent, materialized path and product counts
+
+Existing categories become roots (path "/<id>/") and their counts are
+backfilled from the product table.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("category") as batch_op:
+        batch_op.add_column(sa.Column("parent_id", sa.Integer(), nullable=True))
+        batch_op.add_column(
+            sa.Column("path", sa.String(length=255), nullable=False, server_default="")
+        )
+        batch_op.add_column(sa.Column("depth", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(
+            sa.Column("product_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("subtree_product_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.create_foreign_key(
+            op.f("fk_category_parent_id_category"), "category", ["parent_id"], ["id"]
+        )
+
+    op.execute("UPDATE category SET path = '/' || id || '/'")
+    op.execute(
+        "UPDATE category SET product_count = "
+        "(SELECT count(*) FROM product WHERE product.category_id = category.id)"
+    )
+    op.execute("UPDATE category SET subtree_product_count = product_count")
+
+    with op.batch_alter_table("category") as batch_op:
+        for column in ("path", "depth", "product_count", "subtree_product_count"):
+            batch_op.alter_column(column, server_default=None)
+        batch_op.create_index(op.f("ix_category_path"), ["path"], unique=False)
+        batch_op.create_index("ix_category_parent_id_name", ["parent_id", "name"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("category") as batch_op:
+        batch_op.drop_index("ix_category_parent_id_name")
+        batch_op.drop_index(op.f("ix_category_path"))
+        batch_op.drop_constraint(op.f("fk_category_parent_id_category"), type_="foreignkey")
+        batch_op.drop_column("subtree_product_count")
+        batch_op.drop_column("product_count")
+        batch_op.drop_column("depth")
+        batch_op.drop_column("path")
+        batch_op.drop_column("parent_id")
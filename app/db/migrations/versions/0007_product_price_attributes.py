@@ -0,0 +1,49 @@
+"""product price, sku and typed attributes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.add_column(sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=True))
+        batch_op.add_column(sa.Column("sku", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("brand", sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column("color", sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column("weight_grams", sa.Integer(), nullable=True))
+    op.create_index(op.f("ix_product_sku"), "product", ["sku"], unique=True)
+    op.create_index("ix_product_price_id", "product", ["price", "id"], unique=False)
+    op.create_index(
+        "ix_product_category_id_price_id",
+        "product",
+        ["category_id", "price", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_category_id_price_id", table_name="product")
+    op.drop_index("ix_product_price_id", table_name="product")
+    op.drop_index(op.f("ix_product_sku"), table_name="product")
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.drop_column("weight_grams")
+        batch_op.drop_column("color")
+        batch_op.drop_column("brand")
+        batch_op.drop_column("sku")
+        batch_op.drop_column("price")
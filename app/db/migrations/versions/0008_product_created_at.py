@@ -0,0 +1,50 @@
+"""product created_at and sort indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are stamped with the migration time; the server default
+    # is only needed for that backfill (the application sets the value).
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "created_at",
+                sa.DateTime(),
+                nullable=False,
+                server_default=sa.func.current_timestamp(),
+            )
+        )
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.alter_column("created_at", server_default=None)
+    op.create_index("ix_product_created_at_id", "product", ["created_at", "id"], unique=False)
+    op.create_index(
+        "ix_product_category_id_created_at_id",
+        "product",
+        ["category_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_category_id_created_at_id", table_name="product")
+    op.drop_index("ix_product_created_at_id", table_name="product")
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.drop_column("created_at")
@@ -0,0 +1,68 @@
+"""product name trigram index for fuzzy search
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def _trigrams(text: str) -> set[str]:
+    # Frozen copy of app.crud.trigram.trigrams as of this revision.
+    words = "".join(c if c.isalnum() else " " for c in text.casefold()).split()
+    result = set()
+    for word in words:
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    product_trigram = op.create_table(
+        "product_trigram",
+        sa.Column("trigram", sa.String(length=3), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["product.id"],
+            name=op.f("fk_product_trigram_product_id_product"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("trigram", "product_id", name=op.f("pk_product_trigram")),
+        sqlite_with_rowid=False,
+    )
+    op.create_index(
+        "ix_product_trigram_product_id", "product_trigram", ["product_id"], unique=False
+    )
+
+    # Index the existing products.
+    bind = op.get_bind()
+    products = bind.execute(sa.text("SELECT id, name FROM product"))
+    while batch := products.fetchmany(BACKFILL_BATCH_SIZE):
+        postings = [
+            {"trigram": trigram, "product_id": id_}
+            for id_, name in batch
+            for trigram in _trigrams(name)
+        ]
+        if postings:
+            op.bulk_insert(product_trigram, postings)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_trigram_product_id", table_name="product_trigram")
+    op.drop_table("product_trigram")
@@ -0,0 +1,84 @@
+"""warehouses, per-warehouse stock levels and product availability
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "warehouse",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("code", sa.String(length=20), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_warehouse")),
+    )
+    op.create_index(op.f("ix_warehouse_code"), "warehouse", ["code"], unique=True)
+
+    op.create_table(
+        "stock_level",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"],
+            ["product.id"],
+            name=op.f("fk_stock_level_product_id_product"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["warehouse_id"],
+            ["warehouse.id"],
+            name=op.f("fk_stock_level_warehouse_id_warehouse"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("product_id", "warehouse_id", name=op.f("pk_stock_level")),
+        sqlite_with_rowid=False,
+    )
+    op.create_index(
+        "ix_stock_level_warehouse_id_product_id_quantity",
+        "stock_level",
+        ["warehouse_id", "product_id", "quantity"],
+        unique=False,
+    )
+
+    # No stock anywhere yet; the server default only backfills existing rows.
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.add_column(
+            sa.Column("available_quantity", sa.Integer(), nullable=False, server_default="0")
+        )
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.alter_column("available_quantity", server_default=None)
+    op.create_index(
+        "ix_product_in_stock_name_id",
+        "product",
+        ["name", "id"],
+        unique=False,
+        sqlite_where=sa.text("available_quantity > 0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_in_stock_name_id", table_name="product")
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.drop_column("available_quantity")
+    op.drop_index("ix_stock_level_warehouse_id_product_id_quantity", table_name="stock_level")
+    op.drop_table("stock_level")
+    op.drop_index(op.f("ix_warehouse_code"), table_name="warehouse")
+    op.drop_table("warehouse")
@@ -0,0 +1,67 @@
+"""stock movement journal and daily stock snapshots
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stock_movement",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(length=20), nullable=False),
+        sa.Column("reference", sa.String(length=100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_stock_movement")),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(
+        "ix_stock_movement_product_id_created_at",
+        "stock_movement",
+        ["product_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_stock_movement_created_at", "stock_movement", ["created_at"], unique=False
+    )
+
+    op.create_table(
+        "stock_daily_snapshot",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("product_id", "day", name=op.f("pk_stock_daily_snapshot")),
+        sqlite_with_rowid=False,
+    )
+
+    # Opening balances, so the journal sums to the current stock levels.
+    op.execute(
+        "INSERT INTO stock_movement (product_id, warehouse_id, delta, reason, reference, created_at) "
+        "SELECT product_id, warehouse_id, quantity, 'snapshot', 'opening balance', updated_at "
+        "FROM stock_level"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("stock_daily_snapshot")
+    op.drop_index("ix_stock_movement_created_at", table_name="stock_movement")
+    op.drop_index("ix_stock_movement_product_id_created_at", table_name="stock_movement")
+    op.drop_table("stock_movement")
@@ -0,0 +1,38 @@
+"""product sales velocity and lead time for replenishment
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, Sequence[str], None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Velocity starts at zero until the first nightly refresh; the server
+    # default only backfills existing rows.
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.add_column(
+            sa.Column("sales_velocity", sa.Float(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(sa.Column("lead_time_days", sa.Integer(), nullable=True))
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.alter_column("sales_velocity", server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("product") as batch_op:
+        batch_op.drop_column("lead_time_days")
+        batch_op.drop_column("sales_velocity")
@@ -0,0 +1,90 @@
+"""archive tables for soft-deleted products and categories
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, Sequence[str], None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "product_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("sku", sa.String(length=64), nullable=True),
+        sa.Column("brand", sa.String(length=100), nullable=True),
+        sa.Column("color", sa.String(length=50), nullable=True),
+        sa.Column("weight_grams", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("available_quantity", sa.Integer(), nullable=False),
+        sa.Column("sales_velocity", sa.Float(), nullable=False),
+        sa.Column("lead_time_days", sa.Integer(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_product_archive")),
+    )
+    op.create_index(
+        "ix_product_archive_deleted_at_id", "product_archive", ["deleted_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_product_archive_category_id_deleted_at",
+        "product_archive",
+        ["category_id", "deleted_at"],
+        unique=False,
+    )
+
+    op.create_table(
+        "category_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.String(length=255), nullable=True),
+        sa.Column("parent_id", sa.Integer(), nullable=True),
+        sa.Column("path", sa.String(length=255), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.Column("product_count", sa.Integer(), nullable=False),
+        sa.Column("subtree_product_count", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_category_archive")),
+    )
+    op.create_index(
+        "ix_category_archive_deleted_at_id", "category_archive", ["deleted_at", "id"], unique=False
+    )
+
+    # AUTOINCREMENT so new rows never take the id of an archived one. SQLite
+    # only sets it at CREATE TABLE, so both tables are rebuilt (indexes,
+    # including partial ones, are carried over); the sequence starts at the
+    # highest id copied.
+    for table in ("category", "product"):
+        with op.batch_alter_table(
+            table, recreate="always", table_kwargs={"sqlite_autoincrement": True}
+        ):
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("product", "category"):
+        with op.batch_alter_table(
+            table, recreate="always", table_kwargs={"sqlite_autoincrement": False}
+        ):
+            pass
+    op.drop_index("ix_category_archive_deleted_at_id", table_name="category_archive")
+    op.drop_table("category_archive")
+    op.drop_index("ix_product_archive_category_id_deleted_at", table_name="product_archive")
+    op.drop_index("ix_product_archive_deleted_at_id", table_name="product_archive")
+    op.drop_table("product_archive")
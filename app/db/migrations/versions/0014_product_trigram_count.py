@@ -0,0 +1,39 @@
+"""posting list lengths for the product trigram index
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, Sequence[str], None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "product_trigram_count",
+        sa.Column("trigram", sa.String(length=3), nullable=False),
+        sa.Column("products", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("trigram", name=op.f("pk_product_trigram_count")),
+        sqlite_with_rowid=False,
+    )
+    # Count the existing postings.
+    op.execute(
+        "INSERT INTO product_trigram_count (trigram, products) "
+        "SELECT trigram, count(*) FROM product_trigram GROUP BY trigram"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("product_trigram_count")
@@ -0,0 +1,90 @@
+"""product registry and write outbox for sharded products
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-22 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, Sequence[str], None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "product_registry",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("sku", sa.String(length=64), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_product_registry")),
+    )
+    op.create_index(
+        "ix_product_registry_name",
+        "product_registry",
+        ["name"],
+        unique=True,
+        sqlite_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_product_registry_sku",
+        "product_registry",
+        ["sku"],
+        unique=True,
+        sqlite_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_product_registry_category_id_deleted_at",
+        "product_registry",
+        ["category_id", "deleted_at"],
+        unique=False,
+    )
+
+    op.create_table(
+        "shard_sequence",
+        sa.Column("shard", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("shard", name=op.f("pk_shard_sequence")),
+    )
+
+    op.create_table(
+        "shard_write",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(length=10), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_shard_write")),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_shard_write_shard_id", "shard_write", ["shard", "id"], unique=False)
+
+    shard_cursor = op.create_table(
+        "shard_cursor",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("applied", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_shard_cursor")),
+    )
+    op.bulk_insert(shard_cursor, [{"id": 1, "applied": 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("shard_cursor")
+    op.drop_index("ix_shard_write_shard_id", table_name="shard_write")
+    op.drop_table("shard_write")
+    op.drop_table("shard_sequence")
+    op.drop_index("ix_product_registry_category_id_deleted_at", table_name="product_registry")
+    op.drop_index("ix_product_registry_sku", table_name="product_registry")
+    op.drop_index("ix_product_registry_name", table_name="product_registry")
+    op.drop_table("product_registry")
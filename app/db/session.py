@@ -1,13 +1,34 @@
 # app/db/session.py
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.limits import DecayingMax
+from app.db.shards import ProductShards
+
+
+def _engine_options(url: str) -> dict[str, Any]:
+    # In-memory SQLite runs on a single static connection; pool sizing
+    # only applies to queue-pooled (file/server) databases.
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
 
 engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URI,
     future=True,
     echo=False,
+    **_engine_options(settings.SQLALCHEMY_DATABASE_URI),
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -16,4 +37,40 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
     expire_on_commit=False,
     class_=AsyncSession,
-)
\ No newline at end of file
+)
+
+# None unless products are sharded (see app/db/shards.py).
+product_shards = (
+    ProductShards(settings.PRODUCT_SHARD_URIS, _engine_options)
+    if settings.PRODUCT_SHARD_URIS
+    else None
+)
+
+
+async def prewarm(engine: AsyncEngine, size: int) -> None:
+    """Open ``size`` pooled connections concurrently and return them to the pool."""
+    if size <= 0:
+        return
+    connections = await asyncio.gather(*(engine.connect() for _ in range(size)))
+    await asyncio.gather(*(conn.close() for conn in connections))
+
+
+# Recent time sessions spent waiting for a pooled connection; read by the
+# load shedder (app/api/middleware.py).
+pool_wait = DecayingMax(half_life=settings.SHED_POOL_WAIT_HALF_LIFE_SECONDS)
+
+_CONNECT_STARTED = "pool_wait_started"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _before_first_execute(orm_execute_state) -> None:
+    session = orm_execute_state.session
+    if not session.in_transaction():
+        session.info[_CONNECT_STARTED] = time.monotonic()
+
+
+@event.listens_for(Session, "after_begin")
+def _after_connection_acquired(session, transaction, connection) -> None:
+    started = session.info.pop(_CONNECT_STARTED, None)
+    if started is not None:
+        pool_wait.observe(time.monotonic() - started)
@@ -0,0 +1,93 @@
+# app/db/shards.py
+"""
+Products spread over several databases (PRODUCT_SHARD_URIS), so product
+writes are not serialized behind a single SQLite writer.
+
+Every shard is migrated to the full schema but only its product tables
+(``product``, its archive and trigram postings, and ``shard_cursor``) are
+used; categories, the change log and everything else stay in the main
+database. A product is placed in shard ``category_id % N`` when created and
+stays there (moving it to another category does not move it), and its id is
+allocated from that shard's residue class, ``(id - 1) % N == shard``, so
+single-product reads and writes route by id alone. Listings query every
+shard concurrently and merge the ordered pages
+(crud.product.get_multi_sharded).
+
+Product writes commit to the main database first (a registry row keeping
+names and SKUs unique across shards, category counts, the change record and
+the queued shard write), then are applied to the shard; see
+app/crud/shard.py. The main commit bounds write throughput; see
+scripts/bench_sharding.py.
+"""
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import migrate
+
+
+class Shard(NamedTuple):
+    """A session on one shard, with the shard's place among ``shards``."""
+
+    session: AsyncSession
+    index: int
+    shards: "ProductShards"
+
+
+class ProductShards:
+    def __init__(self, urls: Sequence[str], engine_options: Callable[[str], dict[str, Any]]) -> None:
+        self.engines: list[AsyncEngine] = [
+            create_async_engine(url, future=True, echo=False, **engine_options(url)) for url in urls
+        ]
+        self.session_factories = [
+            sessionmaker(
+                bind=engine,
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+                class_=AsyncSession,
+            )
+            for engine in self.engines
+        ]
+        # Highest ``shard_write`` id each shard is known to have applied
+        # (app/crud/shard.py); older writes can be pruned.
+        self.applied = [0] * len(self.engines)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def for_product(self, product_id: int) -> int:
+        return (product_id - 1) % len(self)
+
+    def for_category(self, category_id: int) -> int:
+        """Shard new products of ``category_id`` are placed in."""
+        return category_id % len(self)
+
+    @contextlib.asynccontextmanager
+    async def open(self, index: int) -> AsyncIterator[Shard]:
+        async with self.session_factories[index]() as session:
+            yield Shard(session, index, self)
+
+    @contextlib.asynccontextmanager
+    async def open_all(self) -> AsyncIterator[list[AsyncSession]]:
+        """One session per shard, in shard order (connections are taken on first use)."""
+        async with contextlib.AsyncExitStack() as stack:
+            yield [
+                await stack.enter_async_context(factory()) for factory in self.session_factories
+            ]
+
+    # One at a time: Alembic's migration context is process-global.
+    async def upgrade(self) -> None:
+        for engine in self.engines:
+            await migrate.upgrade(engine)
+
+    async def verify(self) -> None:
+        for engine in self.engines:
+            await migrate.verify(engine)
+
+    async def dispose(self) -> None:
+        await asyncio.gather(*(engine.dispose() for engine in self.engines))
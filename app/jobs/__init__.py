@@ -0,0 +1,3 @@
+# app/jobs/__init__.py
+from app.jobs.runner import runner
+from app.jobs import handlers  # noqa: F401  (registers the job kinds)
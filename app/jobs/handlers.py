@@ -0,0 +1,38 @@
+# app/jobs/handlers.py
+from datetime import datetime
+from typing import Any
+
+from app import crud
+from app.db.base import utcnow
+from app.jobs.runner import JobContext, runner
+
+
+@runner.handler("delete_products")
+async def delete_products(ctx: JobContext) -> dict[str, Any]:
+    """
+    Archive a category's products chunk by chunk, committing after each
+    chunk so the write lock is held briefly; optionally drop the category.
+    Safe to resume: every pass deletes whatever is left.
+    """
+    category_id = ctx.params["category_id"]
+    chunk_size = ctx.params["chunk_size"]
+    # One archive timestamp for every chunk and the category, also when
+    # resumed, so restoring the category brings all of them back.
+    deleted_at = (
+        datetime.fromisoformat(ctx.params["deleted_at"])
+        if "deleted_at" in ctx.params
+        else utcnow()
+    )
+
+    async with ctx.session_factory() as db:
+        while deleted := await crud.product.remove_chunk(
+            db, category_id=category_id, limit=chunk_size, deleted_at=deleted_at
+        ):
+            await ctx.checkpoint(deleted)
+
+        if ctx.params.get("delete_category"):
+            category = await crud.category.get(db, category_id=category_id)
+            if category:
+                await crud.category.remove(db, db_obj=category, deleted_at=deleted_at)
+
+    return {"deleted": ctx.progress}
@@ -0,0 +1,171 @@
+# app/jobs/runner.py
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.core.config import settings
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Session.info key for a list collecting the ids of jobs submitted in a
+# transaction committed later (atomic POST /batch): the caller schedules
+# them with ``schedule`` once the job rows are committed.
+DEFERRED = "jobs_deferred"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class JobContext:
+    job_id: str
+    params: dict[str, Any]
+    progress: int
+    session_factory: sessionmaker
+
+    async def checkpoint(self, count: int) -> None:
+        """
+        Record ``count`` more rows as done and renew the lease. Call after
+        each committed chunk; raises JobCancelled if a cancel was requested.
+        """
+        self.progress += count
+        async with self.session_factory() as db:
+            cancelled = await crud.job.checkpoint(db, self.job_id, progress=self.progress)
+        if cancelled:
+            raise JobCancelled
+
+
+Handler = Callable[[JobContext], Awaitable[dict[str, Any] | None]]
+
+
+class JobRunner:
+    """
+    In-process runner for catalog operations too large for one request.
+
+    Jobs are rows in the ``job`` table; a worker claims one with a
+    conditional UPDATE, so with several workers each job runs once. A
+    running job renews its lease at every checkpoint; one whose lease
+    expires (worker killed or restarted) is claimed again and resumed, so
+    handlers must be safe to re-run from their recorded progress.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, Handler] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._poller: asyncio.Task | None = None
+
+    def handler(self, kind: str) -> Callable[[Handler], Handler]:
+        def register(fn: Handler) -> Handler:
+            self._handlers[kind] = fn
+            return fn
+
+        return register
+
+    def start(self, session_factory: sessionmaker) -> None:
+        """Resume incomplete jobs now and keep picking up orphaned ones."""
+        self._poller = asyncio.create_task(self._poll(session_factory))
+
+    async def stop(self) -> None:
+        # Interrupted jobs keep status "running" and are resumed once their
+        # lease expires.
+        tasks = [t for t in (self._poller, *self._tasks.values()) if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._poller = None
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        kind: str,
+        params: dict[str, Any],
+        *,
+        session_factory: sessionmaker,
+        total: int | None = None,
+    ) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        job = await crud.job.create(db, kind=kind, params=params, total=total)
+        deferred = db.info.get(DEFERRED)
+        if deferred is not None:
+            deferred.append(job.id)
+        else:
+            self._schedule(job.id, session_factory)
+        return job
+
+    def schedule(self, job_ids: list[str], session_factory: sessionmaker) -> None:
+        """Start jobs whose rows were committed after ``submit`` (see DEFERRED)."""
+        for job_id in job_ids:
+            self._schedule(job_id, session_factory)
+
+    async def resume(self, session_factory: sessionmaker) -> int:
+        """Schedule every pending or orphaned job. Returns how many were found."""
+        async with session_factory() as db:
+            job_ids = await crud.job.get_claimable_ids(
+                db, lease_seconds=settings.JOB_LEASE_SECONDS
+            )
+        for job_id in job_ids:
+            self._schedule(job_id, session_factory)
+        return len(job_ids)
+
+    async def wait(self, job_id: str) -> None:
+        """Wait for a job scheduled in this process to finish."""
+        task = self._tasks.get(job_id)
+        if task:
+            await asyncio.shield(task)
+
+    def _schedule(self, job_id: str, session_factory: sessionmaker) -> None:
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(job_id, session_factory))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _poll(self, session_factory: sessionmaker) -> None:
+        while True:
+            try:
+                await self.resume(session_factory)
+            except Exception:
+                logger.exception("Failed to resume background jobs")
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS)
+
+    async def _run(self, job_id: str, session_factory: sessionmaker) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.JOB_MAX_CONCURRENCY)
+
+        async with self._semaphore:
+            async with session_factory() as db:
+                if not await crud.job.claim(db, job_id, lease_seconds=settings.JOB_LEASE_SECONDS):
+                    return
+                job = await crud.job.get(db, job_id)
+
+            ctx = JobContext(job_id, job.params, job.progress, session_factory)
+            status, result, error = crud.job.SUCCEEDED, None, None
+            try:
+                if job.cancel_requested:
+                    # Flagged before this claim (e.g. while its lease was expiring).
+                    raise JobCancelled
+                handler = self._handlers.get(job.kind)
+                if handler is None:
+                    raise ValueError(f"Unknown job kind {job.kind!r}")
+                result = await handler(ctx)
+            except JobCancelled:
+                status = crud.job.CANCELLED
+            except Exception as exc:
+                logger.exception("Job %s (%s) failed", job_id, job.kind)
+                status, error = crud.job.FAILED, str(exc)
+
+            async with session_factory() as db:
+                await crud.job.finish(db, job_id, status=status, result=result, error=error)
+
+
+runner = JobRunner()
@@ -1,30 +1,87 @@
 # app/main.py
-import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from sqlalchemy import text
 
 from app.core.config import settings
+from app.core.limits import LoadShedder, RateLimiter
+from app.api.middleware import AdmissionMiddleware, ProfilingMiddleware
+from app import crud
 from app.api.v1.api import api_router
-from app.db.base import Base
-from app.db.session import engine
+from app.db import migrate
+from app.db.session import AsyncSessionLocal, engine, pool_wait, prewarm, product_shards
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Imported here, not at module level, so importing the app stays cheap.
+    from app.jobs import runner
+    from app.search import suggestions
+
+    if settings.DB_MIGRATE_ON_STARTUP:
+        # Apply pending Alembic revisions (stamps pre-migration databases first)
+        await migrate.upgrade(engine)
+        if product_shards:
+            await product_shards.upgrade()
+    else:
+        # Schema is migrated once by `python -m app.cli migrate`; each worker
+        # only reads the version row, which doubles as the connectivity check.
+        await migrate.verify(engine)
+        if product_shards:
+            await product_shards.verify()
+    if product_shards:
+        # Finish product writes whose shard was unreachable before a restart.
+        await crud.shard.replay(AsyncSessionLocal, product_shards)
+
+    await prewarm(engine, settings.DB_POOL_PREWARM)
+
+    # Resume jobs interrupted by a restart and adopt orphaned ones.
+    runner.start(AsyncSessionLocal)
+
+    # Loads every name in the background; serving does not wait for it.
+    suggestions.start(AsyncSessionLocal, product_shards)
+
+    yield
+
+    await runner.stop()
+    await suggestions.stop()
+    if product_shards:
+        await product_shards.dispose()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
-@app.on_event("startup")
-async def on_startup() -> None:
-    # Simple auto-create of tables; for real prod use Alembic migrations
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    # Optional: simple health check
-    async with engine.connect() as conn:
-        await conn.execute(text("SELECT 1"))
+# Inside admission control, so only admitted requests are profiled.
+app.add_middleware(
+    ProfilingMiddleware,
+    prefix=settings.API_V1_STR,
+    exclude=f"{settings.API_V1_STR}/admin/",
+)
 
+# Crawler storms get 429s per client, then 503s by priority once the
+# worker is saturated, before they can exhaust the connection pool (both
+# off unless configured; see RATE_LIMIT_* and SHED_* settings).
+app.add_middleware(
+    AdmissionMiddleware,
+    prefix=settings.API_V1_STR,
+    limiter=RateLimiter(
+        settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_CLIENTS
+    )
+    if settings.RATE_LIMIT_PER_SECOND > 0
+    else None,
+    shedder=LoadShedder(
+        settings.SHED_MAX_IN_FLIGHT, settings.SHED_MAX_POOL_WAIT_SECONDS, pool_wait
+    )
+    if settings.SHED_MAX_IN_FLIGHT > 0
+    else None,
+    retry_after=settings.SHED_RETRY_AFTER_SECONDS,
+    forwarded_hops=settings.RATE_LIMIT_FORWARDED_HOPS,
+    api_keys=settings.RATE_LIMIT_API_KEYS,
+)
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
\ No newline at end of file
+app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,3 +1,11 @@
 # app/models/__init__.py
 from app.models.category import Category
-from app.models.product import Product
\ No newline at end of file
+from app.models.product import Product
+from app.models.job import Job
+from app.models.change import Change
+from app.models.idempotency import IdempotencyKey
+from app.models.product_trigram import ProductTrigram, ProductTrigramCount
+from app.models.warehouse import StockLevel, Warehouse
+from app.models.stock_movement import StockDailySnapshot, StockMovement
+from app.models.archive import CategoryArchive, ProductArchive
+from app.models.shard import ProductRegistry, ShardCursor, ShardSequence, ShardWrite
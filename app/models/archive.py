@@ -0,0 +1,58 @@
+# app/models/archive.py
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Float, Index, Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ProductArchive(Base):
+    """
+    Deleted products, moved here from ``product`` by the deleting
+    transaction (app/crud/archive.py) with the same columns plus
+    ``deleted_at``. No foreign keys or unique names: the category may be
+    archived too, and a live product may take the name or SKU.
+    """
+
+    __tablename__ = "product_archive"
+    __table_args__ = (
+        # Newest deletions first, and purges by age.
+        Index("ix_product_archive_deleted_at_id", "deleted_at", "id"),
+        # The products a category delete archived with it.
+        Index("ix_product_archive_category_id_deleted_at", "category_id", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    category_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    sku: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    brand: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    color: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    weight_grams: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # At deletion; its stock rows are dropped, so a restored product starts at 0.
+    available_quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    sales_velocity: Mapped[float] = mapped_column(Float, nullable=False)
+    lead_time_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class CategoryArchive(Base):
+    """Deleted categories; see ProductArchive. Path and counts are rebuilt on restore."""
+
+    __tablename__ = "category_archive"
+    __table_args__ = (Index("ix_category_archive_deleted_at_id", "deleted_at", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    description: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    parent_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+    product_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    subtree_product_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,18 +1,52 @@
 # app/models/category.py
-from sqlalchemy import String, Integer
+from sqlalchemy import String, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
+PATH_SEPARATOR = "/"
+
 
 class Category(Base):
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # Direct children of a node, in display order.
+        Index("ix_category_parent_id_name", "parent_id", "name"),
+        # Ids of archived categories are never reused; see Product.
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True, nullable=False)
     description: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    parent_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("category.id"),
+        nullable=True,
+    )
+    # Materialized path of ids from the root, e.g. "/1/4/9/". A subtree is
+    # the index range [path, path[:-1] + "0"), since "0" sorts right after "/".
+    path: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Maintained incrementally by every product write in app/crud.
+    product_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    subtree_product_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
-    # relationship placeholder
+    # Never loaded implicitly: a category can hold 100k+ products. Deletes
+    # are set-based (see crud.category.remove) instead of the ORM loading
+    # and deleting each child row.
     products: Mapped[list["Product"]] = relationship(
         back_populates="category",
         cascade="all, delete-orphan",
-        lazy="selectin",
-    )
\ No newline at end of file
+        passive_deletes=True,
+        lazy="raise",
+    )
+
+
+def ancestor_ids(path: str) -> list[int]:
+    """Ids from the root down to and including the category at ``path``."""
+    return [int(part) for part in path.strip(PATH_SEPARATOR).split(PATH_SEPARATOR)]
+
+
+def subtree_bounds(path: str) -> tuple[str, str]:
+    """Half-open ``[low, high)`` range of paths inside the subtree at ``path``."""
+    return path, path[:-1] + chr(ord(PATH_SEPARATOR) + 1)
@@ -0,0 +1,22 @@
+# app/models/change.py
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, utcnow
+
+
+class Change(Base):
+    """One row per catalog mutation; ``id`` is the consumers' sync cursor."""
+
+    # AUTOINCREMENT so ids are never reused, keeping cursors monotonic.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # create | update | delete
+    op: Mapped[str] = mapped_column(String(10), nullable=False)
+    category_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=utcnow)
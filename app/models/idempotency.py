@@ -0,0 +1,26 @@
+# app/models/idempotency.py
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, utcnow
+
+
+class IdempotencyKey(Base):
+    """Stored outcome of a write request sent with an ``Idempotency-Key`` header."""
+
+    __tablename__ = "idempotency_key"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # Method and concrete path, e.g. "PUT /api/v1/products/7".
+    route: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of the request body; a reused key with another body is rejected.
+    body_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # NULL while the first request is still executing.
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    media_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    response_headers: Mapped[dict[str, str] | None] = mapped_column(JSON, nullable=True)
+    response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -1,20 +1,61 @@
 # app/models/product.py
-from sqlalchemy import String, Integer, ForeignKey, Text
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Float, String, Integer, ForeignKey, Numeric, Text, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
+from app.db.base import Base, utcnow
 
 
 class Product(Base):
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # Category-filtered listings ordered by (name, id); also the FK index.
+        Index("ix_product_category_id_name_id", "category_id", "name", "id"),
+        # Price ranges and price ordering, with and without a category filter;
+        # the trailing id matches the (price, id) sort so no temp sort is needed.
+        Index("ix_product_price_id", "price", "id"),
+        Index("ix_product_category_id_price_id", "category_id", "price", "id"),
+        # Newest-first listings.
+        Index("ix_product_created_at_id", "created_at", "id"),
+        Index("ix_product_category_id_created_at_id", "category_id", "created_at", "id"),
+        # In-stock listings by name; only in-stock rows are indexed. The
+        # query must spell the predicate with a literal 0 (see
+        # crud.product._filters) for SQLite to pick it.
+        Index(
+            "ix_product_in_stock_name_id",
+            "name",
+            "id",
+            sqlite_where=text("available_quantity > 0"),
+        ),
+        # AUTOINCREMENT: ids of archived products are never reused, so
+        # they can be restored (app/crud/archive.py).
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(200), unique=True, index=True, nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     category_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("category.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
+    price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    sku: Mapped[str | None] = mapped_column(String(64), unique=True, index=True, nullable=True)
+    # Typed attributes filtered and displayed by the storefront.
+    brand: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    color: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    weight_grams: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=utcnow)
+    # Sum of the product's StockLevel rows across warehouses, maintained
+    # incrementally by app/crud/stock.py so reads never aggregate them.
+    available_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Units sold per day over the trailing SALES_VELOCITY_WINDOW_DAYS,
+    # refreshed nightly from the stock journal (crud.stock.refresh_sales_velocity).
+    sales_velocity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Supplier lead time; REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS when unset.
+    lead_time_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     # Relationships
     category: Mapped["Category"] = relationship(
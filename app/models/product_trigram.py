@@ -0,0 +1,41 @@
+# app/models/product_trigram.py
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ProductTrigram(Base):
+    """
+    Inverted index from name trigrams to products for fuzzy search
+    (app/crud/trigram.py). Maintained by every product write in app/crud.
+    """
+
+    __tablename__ = "product_trigram"
+    __table_args__ = (
+        # Drop a product's postings on rename or delete.
+        Index("ix_product_trigram_product_id", "product_id"),
+        # Rows live in the primary key b-tree itself; no separate rowid table.
+        {"sqlite_with_rowid": False},
+    )
+
+    # Primary key order makes each trigram's posting list one index range.
+    trigram: Mapped[str] = mapped_column(String(3), primary_key=True)
+    product_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("product.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class ProductTrigramCount(Base):
+    """
+    Length of each trigram's posting list in ``product_trigram``, kept in
+    step by app/crud/trigram.py, so fuzzy search can skip very common
+    trigrams without counting their postings.
+    """
+
+    __tablename__ = "product_trigram_count"
+    __table_args__ = ({"sqlite_with_rowid": False},)
+
+    trigram: Mapped[str] = mapped_column(String(3), primary_key=True)
+    # Rows are kept at 0 rather than deleted.
+    products: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,89 @@
+# app/models/shard.py
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ProductRegistry(Base):
+    """
+    Every product of a sharded catalog (app/db/shards.py), live or archived
+    (``deleted_at`` set), with its shard and the columns that must hold
+    across shards. Written in the main database's transaction of each
+    sharded write (app/crud/shard.py); empty when products are not sharded.
+    """
+
+    __tablename__ = "product_registry"
+    __table_args__ = (
+        # Unique among live products, as between ``product`` and its archive.
+        Index(
+            "ix_product_registry_name",
+            "name",
+            unique=True,
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_product_registry_sku",
+            "sku",
+            unique=True,
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        # Category-wide writes, and the products a category delete archived.
+        Index("ix_product_registry_category_id_deleted_at", "category_id", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    shard: Mapped[int] = mapped_column(Integer, nullable=False)
+    # No foreign key: archived products may point at archived categories.
+    category_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    sku: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class ShardSequence(Base):
+    """
+    Last product id allocated in each shard's residue class. Only ever
+    grows, so ids of purged products are not handed out again.
+    """
+
+    __tablename__ = "shard_sequence"
+
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ShardWrite(Base):
+    """
+    A product write committed to the main database and still to be applied
+    to its shard, in id order (app/crud/shard.py). Pruned once applied.
+    """
+
+    __tablename__ = "shard_write"
+    __table_args__ = (
+        Index("ix_shard_write_shard_id", "shard", "id"),
+        # AUTOINCREMENT so ids are never reused: shards compare them with
+        # their cursor.
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, nullable=False)
+    # insert | update | delete | restore | purge
+    op: Mapped[str] = mapped_column(String(10), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+
+class ShardCursor(Base):
+    """
+    In each shard, the one row holding the id of the last ``ShardWrite``
+    applied there, advanced in the transaction that applies it.
+    """
+
+    __tablename__ = "shard_cursor"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    applied: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,51 @@
+# app/models/stock_movement.py
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, utcnow
+
+
+class StockMovement(Base):
+    """
+    Append-only journal of stock changes. Each row is written in the same
+    transaction as the StockLevel and ``Product.available_quantity`` it
+    changes (app/crud/stock.py); rows are never updated or deleted.
+    """
+
+    __tablename__ = "stock_movement"
+    __table_args__ = (
+        # A product's history in time order, and the tail after a snapshot;
+        # the rowid (id) trails every index entry, so ties stay ordered.
+        Index("ix_stock_movement_product_id_created_at", "product_id", "created_at"),
+        # Whole-catalog time ranges, e.g. one day's movements for compaction.
+        Index("ix_stock_movement_created_at", "created_at"),
+        # AUTOINCREMENT so ids are never reused, keeping the journal ordered.
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # No foreign keys: the journal outlives deleted products and warehouses.
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    warehouse_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)
+    # receipt | sale | adjustment | snapshot
+    reason: Mapped[str] = mapped_column(String(20), nullable=False)
+    reference: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=utcnow)
+
+
+class StockDailySnapshot(Base):
+    """
+    A product's total quantity at the end of ``day``, for days it moved.
+    Written by ``crud.stock.compact``; "stock as of" reads the latest one
+    plus the movements after it.
+    """
+
+    __tablename__ = "stock_daily_snapshot"
+    __table_args__ = ({"sqlite_with_rowid": False},)
+
+    product_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,45 @@
+# app/models/warehouse.py
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, utcnow
+
+
+class Warehouse(Base):
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    code: Mapped[str] = mapped_column(String(20), unique=True, index=True, nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+class StockLevel(Base):
+    """
+    On-hand quantity of a product in a warehouse; rows exist only for
+    positive quantities. ``Product.available_quantity`` is their per-product
+    sum, maintained by every stock write in app/crud/stock.py.
+    """
+
+    __tablename__ = "stock_level"
+    __table_args__ = (
+        # A warehouse's whole stock (snapshots), read from the index alone.
+        Index(
+            "ix_stock_level_warehouse_id_product_id_quantity",
+            "warehouse_id",
+            "product_id",
+            "quantity",
+        ),
+        # Rows live in the (product_id, warehouse_id) primary key b-tree.
+        {"sqlite_with_rowid": False},
+    )
+
+    product_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("product.id", ondelete="CASCADE"), primary_key=True
+    )
+    warehouse_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("warehouse.id", ondelete="CASCADE"), primary_key=True
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=utcnow, onupdate=utcnow
+    )
@@ -0,0 +1 @@
+from app.reports import replenishment
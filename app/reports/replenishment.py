@@ -0,0 +1,245 @@
+# app/reports/replenishment.py
+"""
+Replenishment report: days of cover and reorder quantities for every
+product, or totals per category.
+
+Columns are read in chunks of ``chunk_size`` rows straight into NumPy
+arrays, every metric is computed with array operations on the whole chunk,
+and the rows are formatted and streamed chunk by chunk. Memory stays
+bounded by the chunk size (category totals keep one slot per category id).
+See scripts/bench_replenishment.py.
+
+NumPy is an optional dependency (``pip install ".[reports]"``); without it
+``available()`` is False and callers refuse the report.
+"""
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from typing import Literal, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models.product import Product
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Level = Literal["product", "category"]
+Format = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+PRODUCT_COLUMNS = (
+    "product_id",
+    "sku",
+    "category_id",
+    "available_quantity",
+    "sales_velocity",
+    "lead_time_days",
+    "days_of_cover",
+    "reorder_point",
+    "reorder_quantity",
+)
+CATEGORY_COLUMNS = (
+    "category_id",
+    "products",
+    "products_to_reorder",
+    "available_quantity",
+    "sales_velocity",
+    "days_of_cover",
+    "reorder_quantity",
+)
+
+
+def available() -> bool:
+    return np is not None
+
+
+class Policy(NamedTuple):
+    default_lead_time_days: int
+    target_cover_days: int
+
+
+class Chunk(NamedTuple):
+    """One chunk of products as columns."""
+
+    ids: "np.ndarray"
+    skus: "np.ndarray"
+    category_ids: "np.ndarray"
+    available: "np.ndarray"
+    velocity: "np.ndarray"
+    # NaN where the product has no lead time of its own.
+    lead_time: "np.ndarray"
+
+
+class Metrics(NamedTuple):
+    lead_time: "np.ndarray"
+    days_of_cover: "np.ndarray"
+    reorder_point: "np.ndarray"
+    reorder_quantity: "np.ndarray"
+
+
+def compute(chunk: Chunk, policy: Policy) -> Metrics:
+    """
+    Per product: days the stock lasts at the current sales velocity
+    (infinite without sales), the reorder point (sales during the lead
+    time) and, at or below it, the quantity bringing stock up to lead time
+    plus ``target_cover_days`` of sales.
+    """
+    lead_time = np.where(np.isnan(chunk.lead_time), policy.default_lead_time_days, chunk.lead_time)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_cover = np.where(chunk.velocity > 0, chunk.available / chunk.velocity, np.inf)
+    reorder_point = chunk.velocity * lead_time
+    order_up_to = chunk.velocity * (lead_time + policy.target_cover_days)
+    reorder_quantity = np.where(
+        chunk.available <= reorder_point,
+        np.ceil(np.maximum(order_up_to - chunk.available, 0)),
+        0,
+    ).astype(np.int64)
+    return Metrics(lead_time, days_of_cover, reorder_point, reorder_quantity)
+
+
+async def read_chunks(db: AsyncSession, chunk_size: int) -> AsyncIterator[Chunk]:
+    """Every product's report columns, in id order, ``chunk_size`` rows at a time."""
+    # Core columns on the session's connection: plain tuples, no ORM
+    # loading per row.
+    products = Product.__table__.c
+    query = select(
+        products.id,
+        products.sku,
+        products.category_id,
+        products.available_quantity,
+        products.sales_velocity,
+        products.lead_time_days,
+    ).order_by(products.id)
+    conn = await db.connection()
+    result = await conn.stream(query.execution_options(yield_per=chunk_size))
+    async for rows in result.partitions():
+        ids, skus, category_ids, quantities, velocity, lead_time = zip(*rows)
+        yield Chunk(
+            ids=np.array(ids, dtype=np.int64),
+            skus=np.array(skus, dtype=object),
+            category_ids=np.array(category_ids, dtype=np.int64),
+            available=np.array(quantities, dtype=np.int64),
+            velocity=np.array(velocity, dtype=np.float64),
+            # None becomes NaN.
+            lead_time=np.array(lead_time, dtype=np.float64),
+        )
+
+
+def _rounded(values: "np.ndarray", decimals: int = 2) -> list:
+    """Rounded floats, with None (empty CSV cell, JSON null) for infinity."""
+    return np.where(np.isinf(values), None, np.round(values, decimals)).tolist()
+
+
+def _format(columns: tuple[str, ...], rows: list[tuple], fmt: Format) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+
+def _product_rows(chunk: Chunk, metrics: Metrics, only_reorder: bool) -> list[tuple]:
+    if only_reorder:
+        keep = metrics.reorder_quantity > 0
+        chunk = Chunk(*(column[keep] for column in chunk))
+        metrics = Metrics(*(column[keep] for column in metrics))
+    return list(
+        zip(
+            chunk.ids.tolist(),
+            chunk.skus.tolist(),
+            chunk.category_ids.tolist(),
+            chunk.available.tolist(),
+            _rounded(chunk.velocity, 3),
+            metrics.lead_time.astype(np.int64).tolist(),
+            _rounded(metrics.days_of_cover, 1),
+            _rounded(metrics.reorder_point, 1),
+            metrics.reorder_quantity.tolist(),
+        )
+    )
+
+
+class _CategoryTotals:
+    """Per-category sums, indexed by category id and grown as ids appear."""
+
+    FIELDS = ("products", "products_to_reorder", "available_quantity", "sales_velocity", "reorder_quantity")
+
+    def __init__(self) -> None:
+        self.sums = {name: np.zeros(0) for name in self.FIELDS}
+
+    def add(self, chunk: Chunk, metrics: Metrics) -> None:
+        weights = {
+            "products": None,
+            "products_to_reorder": (metrics.reorder_quantity > 0).astype(np.float64),
+            "available_quantity": chunk.available.astype(np.float64),
+            "sales_velocity": chunk.velocity,
+            "reorder_quantity": metrics.reorder_quantity.astype(np.float64),
+        }
+        for name, values in weights.items():
+            counts = np.bincount(chunk.category_ids, weights=values)
+            total = self.sums[name]
+            if len(counts) > len(total):
+                total = np.pad(total, (0, len(counts) - len(total)))
+            total[: len(counts)] += counts
+            self.sums[name] = total
+
+    def rows(self, only_reorder: bool) -> list[tuple]:
+        products = self.sums["products"]
+        keep = products > 0
+        if only_reorder:
+            keep &= self.sums["reorder_quantity"] > 0
+        sums = {name: values[keep] for name, values in self.sums.items()}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days_of_cover = np.where(
+                sums["sales_velocity"] > 0,
+                sums["available_quantity"] / sums["sales_velocity"],
+                np.inf,
+            )
+        return list(
+            zip(
+                np.flatnonzero(keep).tolist(),
+                sums["products"].astype(np.int64).tolist(),
+                sums["products_to_reorder"].astype(np.int64).tolist(),
+                sums["available_quantity"].astype(np.int64).tolist(),
+                _rounded(sums["sales_velocity"], 3),
+                _rounded(days_of_cover, 1),
+                sums["reorder_quantity"].astype(np.int64).tolist(),
+            )
+        )
+
+
+async def stream_report(
+    session_factory: sessionmaker,
+    *,
+    policy: Policy,
+    level: Level = "product",
+    fmt: Format = "csv",
+    only_reorder: bool = False,
+    chunk_size: int = 50_000,
+) -> AsyncIterator[str]:
+    """
+    The report as text chunks: one per ``chunk_size`` products at product
+    level, a single one at the end at category level (CSV starts with a
+    header line). Uses its own session, so it can outlive the request.
+    """
+    columns = PRODUCT_COLUMNS if level == "product" else CATEGORY_COLUMNS
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+
+    totals = _CategoryTotals()
+    async with session_factory() as db:
+        async for chunk in read_chunks(db, chunk_size):
+            metrics = compute(chunk, policy)
+            if level == "category":
+                totals.add(chunk, metrics)
+            elif rows := _product_rows(chunk, metrics, only_reorder):
+                yield _format(columns, rows, fmt)
+
+    if level == "category":
+        yield _format(columns, totals.rows(only_reorder), fmt)
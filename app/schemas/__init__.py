@@ -3,10 +3,46 @@ from app.schemas.category import (
     Category,
     CategoryCreate,
     CategoryUpdate,
+    CategoryMerge,
+    CategoryMergeResult,
 )
 from app.schemas.product import (
     Product,
     ProductCreate,
     ProductUpdate,
     ProductListResponse,
-)
\ No newline at end of file
+    CategoryFacet,
+    ProductBulkDeleteResult,
+    ProductMove,
+    ProductMoveResult,
+    ProductSort,
+)
+from app.schemas.job import Job
+from app.schemas.archive import (
+    ArchivedCategory,
+    ArchivedCategoryList,
+    ArchivedProduct,
+    ArchivedProductList,
+    ArchiveIds,
+    ArchivePurgeResult,
+    ArchiveRestoreResult,
+)
+from app.schemas.batch import BatchOperation, BatchOperationResult, BatchRequest, BatchResult
+from app.schemas.warehouse import (
+    Warehouse,
+    WarehouseCreate,
+    StockLevel,
+    StockSnapshot,
+    StockSnapshotItem,
+    StockSnapshotResult,
+    StockMovement,
+    StockMovementCreate,
+    StockMovementBatch,
+    StockMovementBatchResult,
+    StockAsOf,
+)
+from app.schemas.change import Change, ChangeList
+from app.schemas.metrics import CoalescingStats
+from app.schemas.profile import MemorySnapshot, MemoryStat
+from app.schemas.suggest import Suggestion
+from app.schemas.fields import parse_fields, sparse_list_adapter, sparse_model
\ No newline at end of file
@@ -0,0 +1,49 @@
+# app/schemas/archive.py
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.category import CategoryInDBBase
+from app.schemas.product import ProductInDBBase
+
+
+class ArchivedProduct(ProductInDBBase):
+    # Stock at deletion; a restored product starts with none.
+    available_quantity: int
+    deleted_at: datetime
+
+
+class ArchivedProductList(BaseModel):
+    items: list[ArchivedProduct]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+
+
+class ArchivedCategory(CategoryInDBBase):
+    deleted_at: datetime
+
+
+class ArchivedCategoryList(BaseModel):
+    items: list[ArchivedCategory]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+
+
+class ArchiveIds(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=10_000)
+
+
+class ArchiveRestoreResult(BaseModel):
+    # Ids moved back; requested ids not in the archive are left out.
+    restored: list[int]
+
+
+class ArchivePurgeResult(BaseModel):
+    purged: int
+    # Category purges only: archived products of the purged categories.
+    products_purged: Optional[int] = None
@@ -0,0 +1,31 @@
+# app/schemas/batch.py
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PUT", "DELETE"]
+    # Relative to the API prefix, query string included.
+    path: str = Field(
+        ..., pattern=r"^/(products|categories)(/|\?|$)", examples=["/products/42?fields=id,name"]
+    )
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_length=1, max_length=100)
+    # All or nothing: the first operation answering 4xx/5xx rolls back the
+    # whole batch and the operations after it are not run.
+    atomic: bool = False
+
+
+class BatchOperationResult(BaseModel):
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResult(BaseModel):
+    results: list[BatchOperationResult]
+    # An atomic batch failed: nothing it did was kept.
+    rolled_back: bool = False
@@ -10,19 +10,35 @@ class CategoryBase(BaseModel):
 
 
 class CategoryCreate(CategoryBase):
-    pass
+    parent_id: Optional[int] = Field(None, gt=0)
 
 
 class CategoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=255)
+    # An explicit null moves the category (and its subtree) to the root.
+    parent_id: Optional[int] = Field(None, gt=0)
 
 
 class CategoryInDBBase(CategoryBase):
     id: int
+    parent_id: Optional[int] = None
+    path: str
+    depth: int
+    product_count: int
+    subtree_product_count: int
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class Category(CategoryInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+class CategoryMerge(BaseModel):
+    target_category_id: int = Field(..., gt=0)
+
+
+class CategoryMergeResult(BaseModel):
+    category: Category
+    moved: int
@@ -0,0 +1,22 @@
+# app/schemas/change.py
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Change(BaseModel):
+    id: int
+    entity: Literal["product", "category"]
+    entity_id: int
+    op: Literal["create", "update", "delete"]
+    category_id: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangeList(BaseModel):
+    changes: list[Change]
+    # Pass back as ``since`` to continue after the last returned change.
+    next_cursor: int
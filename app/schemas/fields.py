@@ -0,0 +1,42 @@
+# app/schemas/fields.py
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+def parse_fields(value: str | None, model: type[BaseModel]) -> frozenset[str] | None:
+    """
+    Parse a ``fields=a,b`` query value against ``model``'s fields.
+    None means every field. Raises ValueError for unknown or no fields.
+    """
+    if value is None:
+        return None
+    fields = frozenset(name.strip() for name in value.split(",") if name.strip())
+    if not fields:
+        raise ValueError("fields must name at least one field")
+    unknown = fields - model.model_fields.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Choose from: {', '.join(model.model_fields)}"
+        )
+    return fields
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: type[BaseModel], fields: frozenset[str]) -> type[BaseModel]:
+    """``model`` narrowed to ``fields`` (validated from attributes, like ``model``)."""
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (info.annotation, info)
+            for name, info in model.model_fields.items()
+            if name in fields
+        },
+    )
+
+
+@lru_cache(maxsize=256)
+def sparse_list_adapter(model: type[BaseModel], fields: frozenset[str]) -> TypeAdapter:
+    return TypeAdapter(list[sparse_model(model, fields)])
@@ -0,0 +1,20 @@
+# app/schemas/job.py
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: Literal["pending", "running", "succeeded", "failed", "cancelled"]
+    progress: int
+    total: Optional[int] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
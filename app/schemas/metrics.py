@@ -0,0 +1,9 @@
+# app/schemas/metrics.py
+from pydantic import BaseModel
+
+
+class CoalescingStats(BaseModel):
+    name: str
+    calls: int
+    # Calls that joined an identical in-flight call instead of querying.
+    coalesced: int
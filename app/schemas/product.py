@@ -1,15 +1,28 @@
 # app/schemas/product.py
-from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 from app.schemas.category import Category
 
 
+ProductSort = Literal[
+    "name", "-name", "price", "-price", "created_at", "-created_at", "id", "-id"
+]
+
+
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = None
     category_id: int = Field(..., gt=0)
+    price: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
+    sku: Optional[str] = Field(None, min_length=1, max_length=64)
+    brand: Optional[str] = Field(None, max_length=100)
+    color: Optional[str] = Field(None, max_length=50)
+    weight_grams: Optional[int] = Field(None, ge=0)
+    lead_time_days: Optional[int] = Field(None, ge=0, le=365)
 
 
 class ProductCreate(ProductBase):
@@ -20,10 +33,21 @@ class ProductUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = None
     category_id: Optional[int] = Field(None, gt=0)
+    price: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
+    sku: Optional[str] = Field(None, min_length=1, max_length=64)
+    brand: Optional[str] = Field(None, max_length=100)
+    color: Optional[str] = Field(None, max_length=50)
+    weight_grams: Optional[int] = Field(None, ge=0)
+    lead_time_days: Optional[int] = Field(None, ge=0, le=365)
 
 
 class ProductInDBBase(ProductBase):
     id: int
+    created_at: datetime
+    # Total across warehouses.
+    available_quantity: int
+    # Units sold per day, recently.
+    sales_velocity: float
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -32,11 +56,44 @@ class Product(ProductInDBBase):
     category: Category
 
 
+class CategoryFacet(BaseModel):
+    category_id: int
+    name: str
+    count: int
+
+
 class ProductListResponse(BaseModel):
     items: list[Product]
     total: int
+    # Fuzzy search stops counting once its candidates run out; the total is
+    # then a lower bound.
+    total_is_estimate: bool = False
     page: int
     page_size: int
     total_pages: int
+    facets: Optional[list[CategoryFacet]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProductBulkDeleteResult(BaseModel):
+    deleted: int
+
+
+class ProductMove(BaseModel):
+    """Selectors are ANDed; at least one is required."""
+
+    target_category_id: int = Field(..., gt=0)
+    product_ids: Optional[list[int]] = Field(None, min_length=1, max_length=10_000)
+    source_category_id: Optional[int] = Field(None, gt=0)
+    search: Optional[str] = Field(None, min_length=1)
+
+    @model_validator(mode="after")
+    def check_selector(self) -> "ProductMove":
+        if self.product_ids is None and self.source_category_id is None and self.search is None:
+            raise ValueError("Provide product_ids, source_category_id or search")
+        return self
+
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+class ProductMoveResult(BaseModel):
+    moved: int
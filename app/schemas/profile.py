@@ -0,0 +1,19 @@
+# app/schemas/profile.py
+from pydantic import BaseModel
+
+
+class MemoryStat(BaseModel):
+    # Allocation site, "file:line" from the outermost frame to the allocation.
+    traceback: list[str]
+    size_bytes: int
+    count: int
+    # Change since the previous snapshot (None on the first one).
+    size_diff_bytes: int | None = None
+    count_diff: int | None = None
+
+
+class MemorySnapshot(BaseModel):
+    traced_bytes: int
+    peak_bytes: int
+    compared_to_previous: bool
+    stats: list[MemoryStat]
@@ -0,0 +1,12 @@
+# app/schemas/suggest.py
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Suggestion(BaseModel):
+    kind: Literal["product", "category"]
+    id: int
+    name: str
+
+    model_config = ConfigDict(from_attributes=True)
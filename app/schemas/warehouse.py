@@ -0,0 +1,87 @@
+# app/schemas/warehouse.py
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class WarehouseCreate(BaseModel):
+    code: str = Field(..., min_length=1, max_length=20)
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class Warehouse(WarehouseCreate):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockLevel(BaseModel):
+    warehouse_id: int
+    quantity: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockSnapshotItem(BaseModel):
+    sku: str = Field(..., min_length=1, max_length=64)
+    quantity: int = Field(..., ge=0)
+
+
+class StockSnapshot(BaseModel):
+    """A warehouse's complete stock; products left out have none there."""
+
+    levels: list[StockSnapshotItem] = Field(..., max_length=200_000)
+
+
+class StockSnapshotResult(BaseModel):
+    changed: int
+    unchanged: int
+    unknown_skus: list[str]
+
+
+class StockMovementCreate(BaseModel):
+    """A signed quantity change: receipts add stock, sales remove it."""
+
+    product_id: int = Field(..., gt=0)
+    warehouse_id: int = Field(..., gt=0)
+    delta: int
+    reason: Literal["receipt", "sale", "adjustment"]
+    reference: Optional[str] = Field(None, max_length=100)
+
+    @model_validator(mode="after")
+    def check_sign(self) -> "StockMovementCreate":
+        if self.reason == "receipt" and self.delta <= 0:
+            raise ValueError("A receipt must have a positive delta")
+        if self.reason == "sale" and self.delta >= 0:
+            raise ValueError("A sale must have a negative delta")
+        if self.delta == 0:
+            raise ValueError("An adjustment must have a non-zero delta")
+        return self
+
+
+class StockMovementBatch(BaseModel):
+    movements: list[StockMovementCreate] = Field(..., min_length=1, max_length=10_000)
+
+
+class StockMovementBatchResult(BaseModel):
+    recorded: int
+
+
+class StockMovement(BaseModel):
+    id: int
+    product_id: int
+    warehouse_id: int
+    delta: int
+    reason: str
+    reference: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockAsOf(BaseModel):
+    product_id: int
+    at: datetime
+    quantity: int
@@ -0,0 +1 @@
+from app.search.suggest import suggestions
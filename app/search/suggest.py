@@ -0,0 +1,337 @@
+# app/search/suggest.py
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import accumulate, islice
+from operator import itemgetter
+from typing import AsyncIterator, Iterable, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.core.config import settings
+from app.db.shards import ProductShards
+
+logger = logging.getLogger(__name__)
+
+# Separates the normalized name from the displayed one inside index keys;
+# sorts before every printable character, so "ab" sorts before "abc" and
+# shorter names come first.
+SEP = "\x00"
+
+PRODUCT = "product"
+CATEGORY = "category"
+
+# Changes read from the feed per catch-up round trip.
+CATCH_UP_BATCH = 1_000
+
+# Pending changes merged into the sorted run once they pass this many, or a
+# sixteenth of the run if larger.
+COMPACT_MIN_CHANGES = 4_096
+
+
+class Suggestion(NamedTuple):
+    kind: str
+    id: int
+    name: str
+
+
+def normalize(text: str) -> str:
+    return text.strip().casefold()
+
+
+def _ref(kind: str, id_: int) -> int:
+    return id_ << 1 | (kind == PRODUCT)
+
+
+def _key(name: str) -> bytes:
+    """``normalized SEP name``, the name left out when it is the normalized form."""
+    normalized = normalize(name)
+    return f"{normalized}{SEP}{'' if name == normalized else name}".encode()
+
+
+def _suggestion(key: bytes, ref: int) -> Suggestion:
+    normalized, _, name = key.decode().partition(SEP)
+    return Suggestion(PRODUCT if ref & 1 else CATEGORY, ref >> 1, name or normalized)
+
+
+class _Run(NamedTuple):
+    """
+    Sorted ``(key, ref)`` entries in flat buffers: key ``i`` is
+    ``blob[offsets[i]:offsets[i + 1]]``; ``by_ref``/``positions`` map refs
+    back to entries by bisection.
+    """
+
+    blob: bytes
+    offsets: array
+    refs: array
+    by_ref: array
+    positions: array
+
+    def key(self, i: int) -> bytes:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]]
+
+
+def _build_run(keys: list[bytes], refs: array) -> _Run:
+    """A run from keys in order and their refs."""
+    blob = b"".join(keys)
+    offsets = array("I" if len(blob) < 2**32 else "Q", [0])
+    offsets.extend(accumulate(map(len, keys)))
+    order = sorted(range(len(refs)), key=refs.__getitem__)
+    return _Run(blob, offsets, refs, array("q", map(refs.__getitem__, order)), array("I", order))
+
+
+def _unzip(entries: Iterable[tuple[bytes, int]]) -> tuple[list[bytes], array]:
+    keys = []
+    refs = array("q")
+    for key, ref in entries:
+        keys.append(key)
+        refs.append(ref)
+    return keys, refs
+
+
+class PrefixIndex:
+    """
+    Names as one sorted run of ``normalized SEP name`` keys packed into a
+    bytes buffer with parallel arrays of offsets and refs (kind and id in
+    one integer), so a prefix lookup is a bisect plus a short forward scan.
+    About 60 bytes per name for typical names, against ~190 for a list of
+    strings plus a dict, i.e. ~60 MB per million names in every worker;
+    ``max_names`` caps it. See scripts/bench_suggest.py.
+
+    Writes do not touch the run: a rename or delete marks the old entry
+    dead and new names go into a small sorted overlay that lookups merge
+    in. ``compacted`` merges both into a new run in one pass once
+    ``needs_compaction``.
+    """
+
+    def __init__(self, max_names: int) -> None:
+        self.max_names = max_names
+        self._run = _build_run([], array("q"))
+        # Run positions renamed or deleted since it was built.
+        self._dead: set[int] = set()
+        # Sorted (key, ref) for names added or renamed since, and ref -> key.
+        self._overlay: list[tuple[bytes, int]] = []
+        self._overlay_keys: dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._run.refs) - len(self._dead) + len(self._overlay)
+
+    def load(self, entries: Iterable[tuple[str, int, str]]) -> None:
+        """Replace the contents with ``(kind, id, name)`` entries in one sort."""
+        keys = {}
+        for kind, id_, name in islice(entries, self.max_names):
+            keys[_ref(kind, id_)] = _key(name)
+        # By key only: equal keys are rare and may come in any order.
+        entries = sorted(keys.items(), key=itemgetter(1))
+        self.install(
+            _build_run(list(map(itemgetter(1), entries)), array("q", map(itemgetter(0), entries)))
+        )
+
+    def _position(self, ref: int) -> int | None:
+        """The live run entry of ``ref``, if any."""
+        run = self._run
+        j = bisect_left(run.by_ref, ref)
+        if j < len(run.by_ref) and run.by_ref[j] == ref and run.positions[j] not in self._dead:
+            return run.positions[j]
+        return None
+
+    def put(self, kind: str, id_: int, name: str) -> None:
+        ref = _ref(kind, id_)
+        key = _key(name)
+        old = self._overlay_keys.get(ref)
+        if old is not None:
+            if old == key:
+                return
+            self._remove_pending(old, ref)
+        else:
+            position = self._position(ref)
+            if position is not None:
+                if self._run.key(position) == key:
+                    return
+                self._dead.add(position)
+            elif len(self) >= self.max_names:
+                logger.warning(
+                    "Suggestion index full (%d names); skipping %s %d", self.max_names, kind, id_
+                )
+                return
+        insort(self._overlay, (key, ref))
+        self._overlay_keys[ref] = key
+
+    def discard(self, kind: str, id_: int) -> None:
+        ref = _ref(kind, id_)
+        old = self._overlay_keys.get(ref)
+        if old is not None:
+            # Its run entry, if any, is dead already.
+            self._remove_pending(old, ref)
+        elif (position := self._position(ref)) is not None:
+            self._dead.add(position)
+
+    def _remove_pending(self, key: bytes, ref: int) -> None:
+        del self._overlay[bisect_left(self._overlay, (key, ref))]
+        del self._overlay_keys[ref]
+
+    @property
+    def needs_compaction(self) -> bool:
+        pending = len(self._overlay) + len(self._dead)
+        return pending > max(COMPACT_MIN_CHANGES, len(self._run.refs) // 16)
+
+    def compacted(self) -> _Run:
+        """
+        The live run entries and the overlay merged into a new run. Reads
+        the index without changing it, so it can run in a thread while
+        lookups continue; pass the result to ``install``.
+        """
+        run, dead = self._run, self._dead
+        live = ((run.key(i), run.refs[i]) for i in range(len(run.refs)) if i not in dead)
+        return _build_run(*_unzip(merge(live, list(self._overlay), key=itemgetter(0))))
+
+    def install(self, run: _Run) -> None:
+        self._run = run
+        self._dead = set()
+        self._overlay = []
+        self._overlay_keys = {}
+
+    def search(self, prefix: str, limit: int) -> list[Suggestion]:
+        """Up to ``limit`` names starting with ``prefix``, shortest/alphabetical first."""
+        prefix = normalize(prefix)
+        if not prefix or SEP in prefix:
+            return []
+        wanted = prefix.encode()
+        run = self._run
+        found = []
+        i = bisect_left(range(len(run.refs)), wanted, key=run.key)
+        while i < len(run.refs) and len(found) < limit:
+            key = run.key(i)
+            if not key.startswith(wanted):
+                break
+            if i not in self._dead:
+                found.append((key, run.refs[i]))
+            i += 1
+        pending = []
+        j = bisect_left(self._overlay, (wanted,))
+        while j < len(self._overlay) and len(pending) < limit:
+            key, ref = self._overlay[j]
+            if not key.startswith(wanted):
+                break
+            pending.append((key, ref))
+            j += 1
+        merged = merge(found, pending, key=itemgetter(0))
+        return [_suggestion(key, ref) for key, ref in islice(merged, limit)]
+
+
+class SuggestionService:
+    """
+    The prefix index plus its sync state. Built from the product and
+    category tables after startup, then kept current by replaying the change
+    log that every crud write appends to: immediately after commits in this
+    worker, and at least every second for other workers' commits. With
+    ``shards``, product names are read from the shards (the change log stays
+    in the main database).
+    """
+
+    def __init__(self) -> None:
+        self.index = PrefixIndex(settings.SUGGEST_MAX_NAMES)
+        self.cursor = 0
+        self.shards: ProductShards | None = None
+        self._task: asyncio.Task | None = None
+
+    def search(self, prefix: str, limit: int) -> list[Suggestion]:
+        return self.index.search(prefix, limit)
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        # Take the cursor first: changes racing with the scan are replayed,
+        # and replaying is idempotent.
+        cursor = await crud.change.get_last_id(db)
+        entries = [(CATEGORY, id_, name) async for id_, name in crud.category.stream_names(db)]
+        entries += [(PRODUCT, id_, name) async for id_, name in self._product_names(db)]
+        self.index.load(entries)
+        self.cursor = cursor
+        await self.catch_up(db)
+
+    async def catch_up(self, db: AsyncSession) -> int:
+        """Apply changes committed since the cursor. Returns how many were read."""
+        applied = 0
+        while changes := await crud.change.get_since(db, since=self.cursor, limit=CATCH_UP_BATCH):
+            touched: dict[str, set[int]] = {PRODUCT: set(), CATEGORY: set()}
+            for change in changes:
+                touched[change.entity].add(change.entity_id)
+            # Current names for every touched row; rows no longer there
+            # were deleted (whatever the order of the changes).
+            for kind, ids in touched.items():
+                if not ids:
+                    continue
+                found = set()
+                names = (
+                    crud.category.stream_names(db, ids=list(ids))
+                    if kind == CATEGORY
+                    else self._product_names(db, ids)
+                )
+                async for id_, name in names:
+                    self.index.put(kind, id_, name)
+                    found.add(id_)
+                for id_ in ids - found:
+                    self.index.discard(kind, id_)
+            self.cursor = changes[-1].id
+            applied += len(changes)
+            if self.index.needs_compaction:
+                # Merged off the event loop; lookups keep reading the old
+                # run, and nothing writes to the index until this returns.
+                self.index.install(await asyncio.to_thread(self.index.compacted))
+        return applied
+
+    async def _product_names(
+        self, db: AsyncSession, ids: set[int] | None = None
+    ) -> AsyncIterator[tuple[int, str]]:
+        """(id, name) of every product (or of ``ids``), from each shard in turn when sharded."""
+        if self.shards is None:
+            async for row in crud.product.stream_names(db, ids=None if ids is None else [*ids]):
+                yield row
+            return
+        for index in range(len(self.shards)):
+            shard_ids = None
+            if ids is not None:
+                shard_ids = [id_ for id_ in ids if self.shards.for_product(id_) == index]
+                if not shard_ids:
+                    continue
+            async with self.shards.open(index) as shard:
+                async for row in crud.product.stream_names(shard.session, ids=shard_ids):
+                    yield row
+
+    def start(self, session_factory: sessionmaker, shards: ProductShards | None = None) -> None:
+        """
+        Build the index, then keep following the change log, in the
+        background: the worker serves while the names load, and suggests
+        nothing until then.
+        """
+        self.shards = shards
+        self._task = asyncio.create_task(self._sync(session_factory))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sync(self, session_factory: sessionmaker) -> None:
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.rebuild(db)
+                break
+            except Exception:
+                logger.exception("Failed to build the suggestion index")
+                await asyncio.sleep(settings.SUGGEST_SYNC_INTERVAL_SECONDS)
+        while True:
+            await crud.change.notifier.wait(settings.SUGGEST_SYNC_INTERVAL_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await self.catch_up(db)
+            except Exception:
+                logger.exception("Failed to update the suggestion index")
+
+
+suggestions = SuggestionService()
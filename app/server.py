@@ -0,0 +1,98 @@
+# app/server.py
+"""
+Production entry point behind ``python -m app.cli serve``: uvicorn worker
+processes with the event loop, HTTP parser, timeouts and recycling taken
+from Settings. See scripts/bench_serve.py for throughput per setup.
+"""
+import importlib.util
+import os
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import Settings
+
+APP = "app.main:app"
+
+# Faster implementation of each choice, preferred under "auto" when installed
+# (the 'server' extra).
+_FAST_LOOP = "uvloop"
+_FAST_HTTP = "httptools"
+
+
+def usable_cpus() -> int:
+    """CPUs this process may run on (respects taskset and cgroup cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        return os.cpu_count() or 1
+
+
+def worker_count(configured: int) -> int:
+    """``configured``, or one worker per usable CPU when it is 0."""
+    return configured if configured > 0 else usable_cpus()
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve(choice: str, *, fast: str, fallback: str) -> str:
+    """
+    The implementation to run for a loop/http setting: "auto" is ``fast``
+    when installed, else ``fallback``. Naming ``fast`` explicitly when it
+    is not installed is a ValueError rather than a silent fallback.
+    """
+    if choice == "auto":
+        return fast if _installed(fast) else fallback
+    if choice == fast and not _installed(fast):
+        raise ValueError(f"{fast} is not installed; install the 'server' extra or use 'auto'.")
+    return choice
+
+
+def build_config(
+    settings: Settings,
+    *,
+    host: str | None = None,
+    port: int | None = None,
+    workers: int | None = None,
+) -> uvicorn.Config:
+    """uvicorn's config from Settings; ``host``/``port``/``workers`` override them."""
+    max_requests = settings.SERVER_MAX_REQUESTS or None
+    return uvicorn.Config(
+        APP,
+        host=host or settings.SERVER_HOST,
+        port=port or settings.SERVER_PORT,
+        workers=worker_count(settings.SERVER_WORKERS if workers is None else workers),
+        loop=resolve(settings.SERVER_LOOP, fast=_FAST_LOOP, fallback="asyncio"),
+        http=resolve(settings.SERVER_HTTP, fast=_FAST_HTTP, fallback="h11"),
+        # The app serves HTTP only; skip importing a WebSocket implementation.
+        ws="none",
+        lifespan="on",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        limit_max_requests=max_requests,
+        limit_max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER if max_requests else 0,
+        access_log=settings.SERVER_ACCESS_LOG,
+    )
+
+
+def run(config: uvicorn.Config) -> int:
+    """
+    Serve until SIGINT/SIGTERM; returns the exit status. Workers run under
+    uvicorn's supervisor, which replaces any worker that exits. That
+    includes a single worker with request recycling on: served directly,
+    it would stop the whole server at its request limit.
+    """
+    if config.workers == 1 and not config.limit_max_requests:
+        server = uvicorn.Server(config)
+        server.run()
+        return 0 if server.started else 1
+
+    sock = config.bind_socket()
+    try:
+        Multiprocess(config, sockets=[sock]).run()
+    finally:
+        sock.close()
+    return 0
@@ -0,0 +1,154 @@
+# scripts/bench_fuzzy_search.py
+"""Benchmark fuzzy product search over the trigram index: load time and query latency.
+
+    python scripts/bench_fuzzy_search.py --products 1000000 --queries 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.crud.trigram import trigrams  # noqa: E402
+from app.db import migrate  # noqa: E402
+
+WORDS = [
+    "".join(random.Random(i).choices(string.ascii_lowercase, k=random.Random(i).randint(3, 9)))
+    for i in range(5_000)
+]
+LOAD_BATCH_SIZE = 50_000
+
+
+def _names(count: int, rng: random.Random) -> list[str]:
+    return [
+        " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 3))) + f" {i}"
+        for i in range(count)
+    ]
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    """Swap two adjacent letters, as in "iphnoe"."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _load(path: Path, names: list[str]) -> float:
+    """Insert products and their postings the way crud.product.create does, in bulk."""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO category (id, name, path, depth, product_count, subtree_product_count) "
+        "VALUES (1, 'Bench', '/1/', 0, ?, ?)",
+        (len(names), len(names)),
+    )
+    start = time.perf_counter()
+    for offset in range(0, len(names), LOAD_BATCH_SIZE):
+        batch = list(enumerate(names[offset : offset + LOAD_BATCH_SIZE], start=offset + 1))
+        conn.executemany(
+            "INSERT INTO product (id, name, category_id, created_at) "
+            "VALUES (?, ?, 1, '2026-01-01')",
+            batch,
+        )
+        conn.executemany(
+            "INSERT INTO product_trigram (trigram, product_id) VALUES (?, ?)",
+            ((trigram, id_) for id_, name in batch for trigram in trigrams(name)),
+        )
+    conn.execute(
+        "INSERT INTO product_trigram_count (trigram, products) "
+        "SELECT trigram, count(*) FROM product_trigram GROUP BY trigram"
+    )
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - start
+
+
+async def _measure(url: str, queries: list[str], page_size: int) -> dict:
+    engine = create_async_engine(url)
+    latencies, hits = [], 0
+    async with AsyncSession(engine) as db:
+        for query in queries:
+            start = time.perf_counter()
+            products, _, _ = await crud.product.fuzzy_search(
+                db,
+                search=query,
+                limit=page_size,
+                min_similarity=settings.FUZZY_MIN_SIMILARITY,
+                max_candidates=settings.FUZZY_MAX_CANDIDATES,
+                max_trigram_products=settings.FUZZY_MAX_TRIGRAM_PRODUCTS,
+            )
+            latencies.append(time.perf_counter() - start)
+            hits += bool(products)
+            db.expunge_all()
+
+        # The substring search the fuzzy mode replaces, for scale.
+        start = time.perf_counter()
+        await crud.product.get_multi(db, search=queries[0], limit=page_size)
+        like = time.perf_counter() - start
+    await engine.dispose()
+    return {
+        "fuzzy_p50_ms": round(_percentile(latencies, 0.5) * 1e3, 2),
+        "fuzzy_p99_ms": round(_percentile(latencies, 0.99) * 1e3, 2),
+        "queries_with_results": round(hits / len(queries), 3),
+        "substring_like_ms": round(like * 1e3, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = _names(args.products, rng)
+    # One or two words of a real name, one of them misspelled.
+    queries = []
+    for _ in range(args.queries):
+        words = rng.choice(names).split()[:-1]
+        words = words[: rng.randint(1, 2)]
+        words[0] = _typo(words[0], rng)
+        queries.append(" ".join(words))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        url = f"sqlite+aiosqlite:///{path}"
+        engine = create_async_engine(url)
+        asyncio.run(migrate.upgrade(engine))
+        asyncio.run(engine.dispose())
+        load = _load(path, names)
+        result = asyncio.run(_measure(url, queries, args.page_size))
+        size = path.stat().st_size
+
+    print(
+        json.dumps(
+            {
+                "products": args.products,
+                "load_seconds": round(load, 1),
+                "db_bytes_per_product": round(size / args.products),
+                **result,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# scripts/bench_replenishment.py
+"""Benchmark the replenishment report: rows per second and peak memory.
+
+    python scripts/bench_replenishment.py --products 1000000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import resource
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db import migrate  # noqa: E402
+from app.reports import replenishment  # noqa: E402
+
+CATEGORIES = 1_000
+LOAD_BATCH_SIZE = 50_000
+
+
+def _load(path: Path, count: int) -> None:
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO category (id, name, path, depth, product_count, subtree_product_count) "
+        "VALUES (?, ?, ?, 0, 0, 0)",
+        ((i, f"Category {i}", f"/{i}/") for i in range(1, CATEGORIES + 1)),
+    )
+    for offset in range(0, count, LOAD_BATCH_SIZE):
+        conn.executemany(
+            "INSERT INTO product (id, name, sku, category_id, available_quantity, "
+            "sales_velocity, lead_time_days, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, '2026-01-01')",
+            (
+                (
+                    i,
+                    f"Product {i}",
+                    f"SKU-{i}",
+                    rng.randint(1, CATEGORIES),
+                    rng.randint(0, 500),
+                    rng.choice((0.0, rng.uniform(0, 20))),
+                    rng.choice((None, rng.randint(1, 60))),
+                )
+                for i in range(offset + 1, min(count, offset + LOAD_BATCH_SIZE) + 1)
+            ),
+        )
+    conn.commit()
+    conn.close()
+
+
+async def _measure(url: str, level: str, fmt: str) -> dict:
+    engine = create_async_engine(url)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    policy = replenishment.Policy(
+        default_lead_time_days=settings.REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS,
+        target_cover_days=settings.REPLENISHMENT_TARGET_COVER_DAYS,
+    )
+    start = time.perf_counter()
+    size = 0
+    async for text in replenishment.stream_report(
+        factory, policy=policy, level=level, fmt=fmt, chunk_size=settings.REPORT_CHUNK_SIZE
+    ):
+        size += len(text)
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return {"seconds": round(elapsed, 2), "output_mb": round(size / 1e6, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    args = parser.parse_args()
+    if not replenishment.available():
+        sys.exit("NumPy is required: pip install '.[reports]'")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        url = f"sqlite+aiosqlite:///{path}"
+        engine = create_async_engine(url)
+        asyncio.run(migrate.upgrade(engine))
+        asyncio.run(engine.dispose())
+        _load(path, args.products)
+        results = {
+            f"{level}_{fmt}": asyncio.run(_measure(url, level, fmt))
+            for level, fmt in [("product", "csv"), ("product", "ndjson"), ("category", "csv")]
+        }
+
+    for result in results.values():
+        result["rows_per_second"] = round(args.products / result["seconds"])
+    # Process-wide high-water mark (kB on Linux), report runs included.
+    peak_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3)
+    print(json.dumps({"products": args.products, "peak_rss_mb": peak_rss_mb, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# scripts/bench_serve.py
+"""Benchmark `python -m app.cli serve`: requests per second and latency per server setup.
+
+Starts the server for each setup against a seeded database and drives it
+over keep-alive connections with product reads (GET /products/{id}).
+
+    python scripts/bench_serve.py --products 10000 --workers 1,2,4 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SETUPS = {
+    "asyncio+h11": {"SERVER_LOOP": "asyncio", "SERVER_HTTP": "h11"},
+    "auto": {"SERVER_LOOP": "auto", "SERVER_HTTP": "auto"},
+}
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _seed(path: Path, products: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO category (id, name, path, depth, product_count, subtree_product_count) "
+        "VALUES (1, 'Bench', '/1/', 0, ?, ?)",
+        (products, products),
+    )
+    conn.executemany(
+        "INSERT INTO product (id, name, category_id, created_at, available_quantity, "
+        "sales_velocity) VALUES (?, ?, 1, '2026-01-01', 0, 0)",
+        ((i, f"Product {i}") for i in range(1, products + 1)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def _connection(port: int, products: int, deadline: float, latencies: list[float]) -> int:
+    """One keep-alive client: request, read the whole response, repeat."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    rng = random.Random()
+    errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(
+            f"GET /api/v1/products/{rng.randint(1, products)} HTTP/1.1\r\n"
+            f"Host: bench\r\n\r\n".encode()
+        )
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            errors += 1
+        length = next(
+            int(line.split(b":", 1)[1])
+            for line in head.split(b"\r\n")
+            if line.lower().startswith(b"content-length:")
+        )
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        if b"connection: close" in head.lower():
+            # A recycled worker closed the connection; open a new one.
+            writer.close()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.close()
+    return errors
+
+
+async def _drive(port: int, products: int, connections: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    deadline = time.perf_counter() + seconds
+    errors = await asyncio.gather(
+        *(_connection(port, products, deadline, latencies) for _ in range(connections))
+    )
+    return {
+        "requests_per_second": round(len(latencies) / seconds),
+        "p50_ms": round(_percentile(latencies, 0.5) * 1e3, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1e3, 2),
+        "errors": sum(errors),
+    }
+
+
+def _wait_ready(port: int, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/v1/products/1", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8731)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        env = {
+            **os.environ,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite+aiosqlite:///{path}",
+            # Measure the server, not admission control.
+            "RATE_LIMIT_PER_SECOND": "0",
+            "SHED_MAX_IN_FLIGHT": "0",
+        }
+        subprocess.run(
+            [sys.executable, "-m", "app.cli", "migrate"],
+            cwd=ROOT, env=env, check=True, capture_output=True,
+        )
+        _seed(path, args.products)
+        env["DB_MIGRATE_ON_STARTUP"] = "false"
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            for label, overrides in SETUPS.items():
+                process = subprocess.Popen(
+                    [sys.executable, "-m", "app.cli", "serve",
+                     "--port", str(args.port), "--workers", str(workers)],
+                    cwd=ROOT, env={**env, **overrides},
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                try:
+                    _wait_ready(args.port, process)
+                    result = asyncio.run(
+                        _drive(args.port, args.products, args.connections, args.seconds)
+                    )
+                finally:
+                    process.terminate()
+                    process.wait()
+                results.append({"workers": workers, "setup": label, **result})
+
+    print(json.dumps({"cpus": os.cpu_count(), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
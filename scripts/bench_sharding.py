@@ -0,0 +1,105 @@
+# scripts/bench_sharding.py
+"""Benchmark concurrent product creation and listing with and without product shards.
+
+    python scripts/bench_sharding.py --products 5000 --concurrency 32 --shards 4
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.db import migrate  # noqa: E402
+from app.db.shards import ProductShards  # noqa: E402
+from app.schemas.category import CategoryCreate  # noqa: E402
+from app.schemas.product import ProductCreate  # noqa: E402
+
+CATEGORIES = 16
+
+
+def _options(url: str) -> dict:
+    return {"pool_size": 8, "max_overflow": 32, "connect_args": {"timeout": 60}}
+
+
+async def _run(tmp: Path, shard_count: int, products: int, concurrency: int) -> dict:
+    url = f"sqlite+aiosqlite:///{tmp / f'main-{shard_count}.db'}"
+    engine = create_async_engine(url, **_options(url))
+    await migrate.upgrade(engine)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    shards = None
+    if shard_count:
+        shards = ProductShards(
+            [f"sqlite+aiosqlite:///{tmp / f'shard-{shard_count}-{i}.db'}" for i in range(shard_count)],
+            _options,
+        )
+        await shards.upgrade()
+
+    async with factory() as db:
+        category_ids = [
+            (await crud.category.create(db, obj_in=CategoryCreate(name=f"Category {i}"))).id
+            for i in range(CATEGORIES)
+        ]
+
+    queue = list(range(products))
+
+    async def writer() -> None:
+        while queue:
+            i = queue.pop()
+            obj_in = ProductCreate(name=f"Product {i}", category_id=category_ids[i % CATEGORIES])
+            async with factory() as db:
+                if shards is None:
+                    await crud.product.create(db, obj_in=obj_in)
+                    continue
+                async with shards.open(shards.for_category(obj_in.category_id)) as shard:
+                    await crud.product.create(db, obj_in=obj_in, shard=shard)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    writes = time.perf_counter() - start
+
+    start = time.perf_counter()
+    async with factory() as db:
+        for page in range(20):
+            if shards is None:
+                await crud.product.get_multi(db, skip=page * 50, limit=50)
+            else:
+                async with shards.open_all() as sessions:
+                    await crud.product.get_multi_sharded(db, sessions, skip=page * 50, limit=50)
+    listing = (time.perf_counter() - start) / 20
+
+    await engine.dispose()
+    if shards:
+        await shards.dispose()
+    return {
+        "creates_per_second": round(products / writes),
+        "list_page_ms": round(listing * 1e3, 2),
+    }
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        return {
+            "unsharded": await _run(Path(tmp), 0, args.products, args.concurrency),
+            f"{args.shards}_shards": await _run(Path(tmp), args.shards, args.products, args.concurrency),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps({"products": args.products, **asyncio.run(_main(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
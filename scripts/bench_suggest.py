@@ -0,0 +1,97 @@
+# scripts/bench_suggest.py
+"""Benchmark the in-memory suggestion index: build time, memory, lookup and update latency.
+
+    python scripts/bench_suggest.py --names 1000000 --queries 20000
+"""
+import argparse
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.search.suggest import PrefixIndex  # noqa: E402
+
+WORDS = [
+    "".join(random.Random(i).choices(string.ascii_lowercase, k=random.Random(i).randint(3, 9)))
+    for i in range(5_000)
+]
+
+
+def _names(count: int, rng: random.Random) -> list[str]:
+    return [
+        " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 3))) + f" {i}"
+        for i in range(count)
+    ]
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = _names(args.names, rng)
+    entries = [("product", i, name) for i, name in enumerate(names)]
+
+    # Memory from a separate build: tracing slows the timed one down.
+    tracemalloc.start()
+    traced = PrefixIndex(max_names=args.names * 2)
+    traced.load(entries)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    index = PrefixIndex(max_names=args.names * 2)
+    start = time.perf_counter()
+    index.load(entries)
+    build = time.perf_counter() - start
+
+    lookups = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        prefix = name[: rng.randint(1, 6)]
+        start = time.perf_counter()
+        index.search(prefix, args.limit)
+        lookups.append(time.perf_counter() - start)
+
+    updates = []
+    for i in range(min(args.queries, 2_000)):
+        start = time.perf_counter()
+        index.put("product", args.names + i, rng.choice(names) + " new")
+        updates.append(time.perf_counter() - start)
+
+    # Merging pending writes into the sorted run (off the event loop in the service).
+    start = time.perf_counter()
+    index.install(index.compacted())
+    compact = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "names": args.names,
+                "build_seconds": round(build, 3),
+                "bytes_per_name": round(memory / args.names),
+                "lookup_p50_us": round(_percentile(lookups, 0.5) * 1e6, 1),
+                "lookup_p99_us": round(_percentile(lookups, 0.99) * 1e6, 1),
+                "put_p99_us": round(_percentile(updates, 0.99) * 1e6, 1),
+                "compact_seconds": round(compact, 3),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
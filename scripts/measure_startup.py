@@ -0,0 +1,83 @@
+# scripts/measure_startup.py
+"""Measure worker cold start: import of ``app.main`` plus the startup hook.
+
+Each sample is a fresh interpreter, as with a newly forked uvicorn worker.
+
+    python scripts/measure_startup.py --runs 10 --prewarm 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+from app.db.session import engine
+t1 = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+    await engine.dispose()
+    return t2
+
+t2 = asyncio.run(boot())
+print(json.dumps({"import": t1 - t0, "startup": t2 - t1}))
+"""
+
+
+def _sample(env: dict[str, str]) -> dict[str, float]:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _report(label: str, samples: list[dict[str, float]]) -> None:
+    for phase in ("import", "startup"):
+        values = sorted(s[phase] * 1000 for s in samples)
+        print(
+            f"{label:<14} {phase:<8} median {statistics.median(values):7.1f} ms"
+            f"   max {values[-1]:7.1f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--prewarm", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["SQLALCHEMY_DATABASE_URI"] = f"sqlite+aiosqlite:///{Path(tmp) / 'startup.db'}"
+        env["DB_POOL_PREWARM"] = str(args.prewarm)
+        subprocess.run(
+            [sys.executable, "-m", "app.cli", "migrate"],
+            cwd=ROOT, env=env, check=True, capture_output=True,
+        )
+
+        modes = {
+            "migrate": {"DB_MIGRATE_ON_STARTUP": "true"},
+            "verify-only": {"DB_MIGRATE_ON_STARTUP": "false"},
+        }
+        for label, overrides in modes.items():
+            samples = [_sample({**env, **overrides}) for _ in range(args.runs)]
+            _report(label, samples)
+
+
+if __name__ == "__main__":
+    main()
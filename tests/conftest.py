@@ -13,8 +13,16 @@ from sqlalchemy import delete
 from app.api.v1.api import api_router
 from app.api import deps
 from app.db.base import Base
+from app.models.archive import CategoryArchive, ProductArchive
 from app.models.category import Category
+from app.models.change import Change
+from app.models.idempotency import IdempotencyKey
+from app.models.job import Job
 from app.models.product import Product
+from app.models.product_trigram import ProductTrigram, ProductTrigramCount
+from app.models.shard import ProductRegistry, ShardSequence, ShardWrite
+from app.models.stock_movement import StockDailySnapshot, StockMovement
+from app.models.warehouse import StockLevel, Warehouse
 
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -36,27 +44,45 @@ async def test_engine():
     await engine.dispose()
 
 
-@pytest.fixture(scope="function")
-async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    async_session = sessionmaker(
+@pytest.fixture(scope="session")
+def session_factory(test_engine) -> sessionmaker:
+    return sessionmaker(
         bind=test_engine,
         autocommit=False,
         autoflush=False,
         expire_on_commit=False,
         class_=AsyncSession,
     )
-    async with async_session() as session:
+
+
+@pytest.fixture(scope="function")
+async def db_session(session_factory) -> AsyncGenerator[AsyncSession, None]:
+    async with session_factory() as session:
         yield session
         # Clean up: delete all records in reverse dependency order
         # This ensures each test starts with a clean database
+        await session.execute(delete(ProductTrigram))
+        await session.execute(delete(ProductTrigramCount))
+        await session.execute(delete(StockLevel))
+        await session.execute(delete(StockMovement))
+        await session.execute(delete(StockDailySnapshot))
+        await session.execute(delete(Warehouse))
         await session.execute(delete(Product))
         await session.execute(delete(Category))
+        await session.execute(delete(Job))
+        await session.execute(delete(Change))
+        await session.execute(delete(IdempotencyKey))
+        await session.execute(delete(ProductArchive))
+        await session.execute(delete(ProductRegistry))
+        await session.execute(delete(ShardSequence))
+        await session.execute(delete(ShardWrite))
+        await session.execute(delete(CategoryArchive))
         await session.commit()
         await session.rollback()
 
 
 @pytest.fixture(scope="function")
-async def app_with_overrides(db_session: AsyncSession) -> FastAPI:
+async def app_with_overrides(db_session: AsyncSession, session_factory) -> FastAPI:
     app = FastAPI()
     app.include_router(api_router, prefix="/api/v1")
 
@@ -64,6 +90,7 @@ async def app_with_overrides(db_session: AsyncSession) -> FastAPI:
         yield db_session
 
     app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_session_factory] = lambda: session_factory
     return app
 
 
@@ -0,0 +1,184 @@
+# tests/test_archive.py
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.db.base import utcnow
+from app.jobs import runner
+
+
+async def _category(client: AsyncClient, name: str, parent: dict | None = None) -> dict:
+    body = {"name": name}
+    if parent:
+        body["parent_id"] = parent["id"]
+    resp = await client.post("/api/v1/categories", json=body)
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _product(client: AsyncClient, name: str, category: dict, **fields) -> dict:
+    resp = await client.post(
+        "/api/v1/products", json={"name": name, "category_id": category["id"], **fields}
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _counts(client: AsyncClient, category: dict) -> tuple[int, int]:
+    data = (await client.get(f"/api/v1/categories/{category['id']}")).json()
+    return data["product_count"], data["subtree_product_count"]
+
+
+@pytest.mark.asyncio
+async def test_deleted_product_is_archived_and_restored(async_client: AsyncClient):
+    books = await _category(async_client, "Books")
+    dune = await _product(async_client, "Dune", books, sku="BK-1")
+    await _product(async_client, "Emma", books)
+
+    await async_client.delete(f"/api/v1/products/{dune['id']}")
+    listing = (await async_client.get("/api/v1/products")).json()
+    assert [p["name"] for p in listing["items"]] == ["Emma"]
+    archive = (await async_client.get("/api/v1/products/archive")).json()
+    assert archive["total"] == 1
+    assert archive["items"][0]["id"] == dune["id"]
+    assert archive["items"][0]["sku"] == "BK-1"
+    assert await _counts(async_client, books) == (1, 1)
+
+    # Unknown ids are skipped.
+    resp = await async_client.post(
+        "/api/v1/products/archive/restore", json={"ids": [dune["id"], 99999]}
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"restored": [dune["id"]]}
+    assert (await async_client.get(f"/api/v1/products/{dune['id']}")).json()["sku"] == "BK-1"
+    assert (await async_client.get("/api/v1/products/archive")).json()["total"] == 0
+    assert await _counts(async_client, books) == (2, 2)
+    fuzzy = (
+        await async_client.get("/api/v1/products", params={"search": "dune", "fuzzy": True})
+    ).json()
+    assert [p["id"] for p in fuzzy["items"]] == [dune["id"]]
+    changes = (await async_client.get("/api/v1/changes", params={"since": 0})).json()["changes"]
+    assert [(c["op"], c["entity_id"]) for c in changes[-2:]] == [
+        ("delete", dune["id"]),
+        ("create", dune["id"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_restore_conflicts_and_missing_category(async_client: AsyncClient):
+    books = await _category(async_client, "Books")
+    dune = await _product(async_client, "Dune", books)
+    await async_client.delete(f"/api/v1/products/{dune['id']}")
+    await _product(async_client, "Dune", books)
+
+    resp = await async_client.post("/api/v1/products/archive/restore", json={"ids": [dune["id"]]})
+    assert resp.status_code == 409
+    assert (await async_client.get("/api/v1/products/archive")).json()["total"] == 1
+
+    music = await _category(async_client, "Music")
+    abbey = await _product(async_client, "Abbey Road", music)
+    await async_client.delete(f"/api/v1/products/{abbey['id']}")
+    await async_client.delete(f"/api/v1/categories/{music['id']}")
+    resp = await async_client.post("/api/v1/products/archive/restore", json={"ids": [abbey["id"]]})
+    assert resp.status_code == 400
+    assert "restore it first" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_category_restore_brings_back_its_products(
+    async_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "BULK_DELETE_SYNC_LIMIT", 1)
+    electronics = await _category(async_client, "Electronics")
+    phones = await _category(async_client, "Phones", electronics)
+    pixel = await _product(async_client, "Pixel", phones)
+    galaxy = await _product(async_client, "Galaxy", phones)
+    # Deleted on its own, before the category: stays archived.
+    landline = await _product(async_client, "Landline", phones)
+    await async_client.delete(f"/api/v1/products/{landline['id']}")
+
+    resp = await async_client.delete(f"/api/v1/categories/{phones['id']}")
+    assert resp.status_code == 202
+    await runner.wait(resp.json()["id"])
+    await async_client.delete(f"/api/v1/categories/{electronics['id']}")
+    assert (await async_client.get("/api/v1/categories/archive")).json()["total"] == 2
+
+    # Children are restored after their parents whatever the order asked.
+    resp = await async_client.post(
+        "/api/v1/categories/archive/restore", json={"ids": [phones["id"], electronics["id"]]}
+    )
+    assert resp.json() == {"restored": [electronics["id"], phones["id"]]}
+    restored = (await async_client.get(f"/api/v1/categories/{phones['id']}")).json()
+    assert restored["path"] == phones["path"]
+    assert await _counts(async_client, electronics) == (0, 2)
+    assert await _counts(async_client, phones) == (2, 2)
+    products = (await async_client.get("/api/v1/products", params={"sort": "id"})).json()
+    assert [p["id"] for p in products["items"]] == [pixel["id"], galaxy["id"]]
+    assert all(p["available_quantity"] == 0 for p in products["items"])
+    archive = (await async_client.get("/api/v1/products/archive")).json()
+    assert [p["id"] for p in archive["items"]] == [landline["id"]]
+
+
+@pytest.mark.asyncio
+async def test_purge_and_ids_are_never_reused(async_client: AsyncClient):
+    books = await _category(async_client, "Books")
+    dune = await _product(async_client, "Dune", books)
+    await async_client.delete(f"/api/v1/products/{dune['id']}")
+    music = await _category(async_client, "Music")
+    abbey = await _product(async_client, "Abbey Road", music)
+    await async_client.delete(f"/api/v1/products/{abbey['id']}")
+    await async_client.post("/api/v1/products/archive/restore", json={"ids": [abbey["id"]]})
+    await async_client.delete(f"/api/v1/categories/{music['id']}")
+
+    resp = await async_client.post("/api/v1/products/archive/purge", json={"ids": [dune["id"]]})
+    assert resp.json() == {"purged": 1, "products_purged": None}
+    resp = await async_client.post(
+        "/api/v1/categories/archive/purge", json={"ids": [music["id"]]}
+    )
+    assert resp.json() == {"purged": 1, "products_purged": 1}
+    assert (await async_client.get("/api/v1/products/archive")).json()["total"] == 0
+    assert (await async_client.get("/api/v1/categories/archive")).json()["total"] == 0
+
+    # Deleted and purged ids stay taken.
+    emma = await _product(async_client, "Emma", books)
+    assert emma["id"] > abbey["id"] > dune["id"]
+    assert (await _category(async_client, "Film"))["id"] > music["id"]
+
+
+@pytest.mark.asyncio
+async def test_deleted_stock_is_journalled(async_client: AsyncClient):
+    tools = await _category(async_client, "Tools")
+    hammer = await _product(async_client, "Hammer", tools)
+    warehouse = (
+        await async_client.post("/api/v1/warehouses", json={"code": "BER", "name": "Berlin"})
+    ).json()
+    await async_client.post(
+        "/api/v1/stock/movements",
+        json={
+            "movements": [
+                {
+                    "product_id": hammer["id"],
+                    "warehouse_id": warehouse["id"],
+                    "delta": 7,
+                    "reason": "receipt",
+                }
+            ]
+        },
+    )
+
+    await async_client.delete(f"/api/v1/products/{hammer['id']}")
+    await async_client.post("/api/v1/products/archive/restore", json={"ids": [hammer["id"]]})
+    restored = (await async_client.get(f"/api/v1/products/{hammer['id']}")).json()
+    assert restored["available_quantity"] == 0
+    resp = await async_client.get(
+        "/api/v1/stock/as-of",
+        params={"product_id": hammer["id"], "at": utcnow().isoformat()},
+    )
+    assert resp.json()["quantity"] == 0
+    movements = (
+        await async_client.get("/api/v1/stock/movements", params={"product_id": hammer["id"]})
+    ).json()
+    assert [(m["delta"], m["reason"], m["reference"]) for m in movements] == [
+        (7, "receipt", None),
+        (-7, "adjustment", "delete"),
+    ]
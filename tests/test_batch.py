@@ -0,0 +1,187 @@
+# tests/test_batch.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.api.v1.api import api_router
+from app.core.config import settings
+from app.jobs import runner
+
+
+async def _batch(async_client: AsyncClient, operations: list[dict], **extra) -> dict:
+    resp = await async_client.post("/api/v1/batch", json={"operations": operations, **extra})
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_operations_in_order(async_client: AsyncClient):
+    data = await _batch(
+        async_client,
+        [
+            {"method": "POST", "path": "/categories", "body": {"name": "Tools"}},
+            {"method": "GET", "path": "/categories?limit=5"},
+        ],
+    )
+    statuses = [result["status"] for result in data["results"]]
+    assert statuses == [201, 200]
+    tools = data["results"][0]["body"]
+    assert [category["name"] for category in data["results"][1]["body"]] == ["Tools"]
+
+    data = await _batch(
+        async_client,
+        [
+            {"method": "POST", "path": "/products", "body": {"name": "Hammer", "category_id": tools["id"]}},
+            {"method": "POST", "path": "/products", "body": {"name": "Saw", "category_id": tools["id"]}},
+            # Invalid bodies and unknown ids fail alone.
+            {"method": "POST", "path": "/products", "body": {"name": ""}},
+            {"method": "POST", "path": "/products", "body": {"name": "Drill", "category_id": 999}},
+            {"method": "GET", "path": "/products/999"},
+        ],
+    )
+    results = data["results"]
+    assert [result["status"] for result in results] == [201, 201, 422, 400, 404]
+    assert results[3]["body"] == {"detail": "Category with id 999 does not exist"}
+    assert data["rolled_back"] is False
+    hammer, saw = results[0]["body"], results[1]["body"]
+
+    # Consecutive reads run concurrently and come back in request order.
+    data = await _batch(
+        async_client,
+        [
+            {"method": "GET", "path": f"/products/{saw['id']}?fields=id,name"},
+            {"method": "GET", "path": f"/products/{hammer['id']}"},
+            {"method": "GET", "path": "/products?sort=-name&fields=name"},
+            {"method": "DELETE", "path": f"/products/{saw['id']}"},
+            {"method": "GET", "path": f"/products/{saw['id']}"},
+        ],
+    )
+    results = data["results"]
+    assert [result["status"] for result in results] == [200, 200, 200, 204, 404]
+    assert results[0]["body"] == {"id": saw["id"], "name": "Saw"}
+    assert results[1]["body"]["category"]["name"] == "Tools"
+    assert [item["name"] for item in results[2]["body"]["items"]] == ["Saw", "Hammer"]
+    assert results[3]["body"] is None
+
+
+@pytest.mark.asyncio
+async def test_atomic_batch_is_all_or_nothing(async_client: AsyncClient):
+    tools = (await async_client.post("/api/v1/categories", json={"name": "Tools"})).json()
+    operations = [
+        {"method": "POST", "path": "/products", "body": {"name": "Hammer", "category_id": tools["id"]}},
+        # Reads see the batch's own writes.
+        {"method": "GET", "path": f"/categories/{tools['id']}"},
+        {"method": "POST", "path": "/products", "body": {"name": "Hammer", "category_id": tools["id"]}},
+        {"method": "POST", "path": "/categories", "body": {"name": "Garden"}},
+    ]
+    data = await _batch(async_client, operations, atomic=True)
+    assert data["rolled_back"] is True
+    assert [result["status"] for result in data["results"]] == [201, 200, 400, 424]
+    assert data["results"][1]["body"]["product_count"] == 1
+
+    resp = await async_client.get("/api/v1/products")
+    assert resp.json()["total"] == 0
+    resp = await async_client.get(f"/api/v1/categories/{tools['id']}")
+    assert resp.json()["product_count"] == 0
+    resp = await async_client.get("/api/v1/changes")
+    assert [change["entity"] for change in resp.json()["changes"]] == ["category"]
+
+    data = await _batch(async_client, [operations[0], operations[3]], atomic=True)
+    assert data["rolled_back"] is False
+    assert [result["status"] for result in data["results"]] == [201, 201]
+    resp = await async_client.get("/api/v1/products")
+    assert [item["name"] for item in resp.json()["items"]] == ["Hammer"]
+    resp = await async_client.get("/api/v1/changes")
+    assert [change["entity"] for change in resp.json()["changes"]] == [
+        "category",
+        "product",
+        "category",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_validation(async_client: AsyncClient):
+    for operations in [
+        [],
+        [{"method": "GET", "path": "/warehouses"}],
+        [{"method": "PATCH", "path": "/products"}],
+        [{"method": "GET", "path": "/products"}] * 101,
+    ]:
+        resp = await async_client.post("/api/v1/batch", json={"operations": operations})
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_atomic_batch_starts_jobs_after_commit(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_DELETE_SYNC_LIMIT", 1)
+    tools = (await async_client.post("/api/v1/categories", json={"name": "Tools"})).json()
+    for name in ("Saw", "Drill"):
+        await async_client.post("/api/v1/products", json={"name": name, "category_id": tools["id"]})
+
+    # Whether the batch had committed when each job was scheduled (tests
+    # share one in-memory connection, so the job would see the row anyway).
+    committed = False
+    scheduled = []
+    commit = Session.commit
+    schedule = runner._schedule
+
+    def record_commit(session):
+        nonlocal committed
+        committed = committed or type(session).__name__ == "_AtomicSession"
+        return commit(session)
+
+    def record_schedule(job_id, session_factory):
+        scheduled.append(committed)
+        return schedule(job_id, session_factory)
+
+    monkeypatch.setattr(Session, "commit", record_commit)
+    monkeypatch.setattr(runner, "_schedule", record_schedule)
+    data = await _batch(
+        async_client,
+        [
+            {"method": "POST", "path": "/categories", "body": {"name": "Garden"}},
+            {"method": "DELETE", "path": f"/products?category_id={tools['id']}"},
+        ],
+        atomic=True,
+    )
+    assert [result["status"] for result in data["results"]] == [201, 202]
+    assert scheduled == [True]
+    job = data["results"][1]["body"]
+    await runner.wait(job["id"])
+    resp = await async_client.get(f"/api/v1/jobs/{job['id']}")
+    assert resp.json()["status"] == "succeeded"
+    assert (await async_client.get("/api/v1/products")).json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_keep_their_own_dependencies(
+    async_client: AsyncClient, app_with_overrides: FastAPI
+):
+    async def unsharded_after_a_while():
+        await asyncio.sleep(0.02)
+        return None
+
+    app_with_overrides.dependency_overrides[deps.get_product_shards] = unsharded_after_a_while
+    # A second app whose products are "sharded": stock reads are refused there.
+    sharded = FastAPI()
+    sharded.include_router(api_router, prefix="/api/v1")
+    sharded.dependency_overrides = {
+        **app_with_overrides.dependency_overrides,
+        deps.get_product_shards: lambda: object(),
+    }
+    operations = [{"method": "GET", "path": "/products/1/stock"}] * 3
+
+    async def while_the_first_runs(client: AsyncClient) -> dict:
+        await asyncio.sleep(0.03)
+        return await _batch(client, operations)
+
+    async with AsyncClient(transport=ASGITransport(app=sharded), base_url="http://test") as other:
+        plain, refused = await asyncio.gather(
+            _batch(async_client, operations), while_the_first_runs(other)
+        )
+    assert [result["status"] for result in plain["results"]] == [404] * 3
+    assert [result["status"] for result in refused["results"]] == [501] * 3
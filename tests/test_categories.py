@@ -78,4 +78,103 @@ async def test_delete_category(async_client: AsyncClient):
     assert del_resp.status_code == 204
 
     get_resp = await async_client.get(f"/api/v1/categories/{cat_id}")
-    assert get_resp.status_code == 404
\ No newline at end of file
+    assert get_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_category_removes_its_products(async_client: AsyncClient):
+    create_resp = await async_client.post("/api/v1/categories", json={"name": "Doomed"})
+    cat_id = create_resp.json()["id"]
+    for i in range(3):
+        await async_client.post(
+            "/api/v1/products", json={"name": f"Doomed {i}", "category_id": cat_id}
+        )
+
+    del_resp = await async_client.delete(f"/api/v1/categories/{cat_id}")
+    assert del_resp.status_code == 204
+
+    resp = await async_client.get("/api/v1/products")
+    assert resp.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_large_category_runs_as_job(async_client: AsyncClient, monkeypatch):
+    from app.core.config import settings
+    from app.jobs import runner
+
+    monkeypatch.setattr(settings, "BULK_DELETE_SYNC_LIMIT", 1)
+    create_resp = await async_client.post("/api/v1/categories", json={"name": "Huge"})
+    cat_id = create_resp.json()["id"]
+    for i in range(3):
+        await async_client.post(
+            "/api/v1/products", json={"name": f"Huge {i}", "category_id": cat_id}
+        )
+
+    del_resp = await async_client.delete(f"/api/v1/categories/{cat_id}")
+    assert del_resp.status_code == 202
+    job_id = del_resp.json()["id"]
+    await runner.wait(job_id)
+    job_resp = await async_client.get(f"/api/v1/jobs/{job_id}")
+    assert job_resp.json()["status"] == "succeeded"
+
+    get_resp = await async_client.get(f"/api/v1/categories/{cat_id}")
+    assert get_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_job_not_found(async_client: AsyncClient):
+    resp = await async_client.get("/api/v1/jobs/missing")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_merge_category(async_client: AsyncClient):
+    source = (await async_client.post("/api/v1/categories", json={"name": "Phones"})).json()
+    target = (await async_client.post("/api/v1/categories", json={"name": "Mobile"})).json()
+    for i in range(3):
+        await async_client.post(
+            "/api/v1/products", json={"name": f"Phone {i}", "category_id": source["id"]}
+        )
+
+    resp = await async_client.post(
+        f"/api/v1/categories/{source['id']}/merge",
+        json={"target_category_id": target["id"]},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["moved"] == 3
+    assert resp.json()["category"]["id"] == target["id"]
+    assert resp.json()["category"]["product_count"] == 3
+
+    assert (await async_client.get(f"/api/v1/categories/{source['id']}")).status_code == 404
+    resp = await async_client.get(f"/api/v1/products?category_id={target['id']}")
+    assert resp.json()["total"] == 3
+
+    archive = (await async_client.get("/api/v1/categories/archive")).json()
+    assert [c["id"] for c in archive["items"]] == [source["id"]]
+    resp = await async_client.post(
+        "/api/v1/categories/archive/restore", json={"ids": [source["id"]]}
+    )
+    assert resp.json() == {"restored": [source["id"]]}
+    restored = (await async_client.get(f"/api/v1/categories/{source['id']}")).json()
+    assert restored["name"] == "Phones"
+    assert restored["product_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_merge_category_errors(async_client: AsyncClient):
+    cat = (await async_client.post("/api/v1/categories", json={"name": "Solo"})).json()
+
+    resp = await async_client.post(
+        f"/api/v1/categories/{cat['id']}/merge", json={"target_category_id": cat["id"]}
+    )
+    assert resp.status_code == 400
+
+    resp = await async_client.post(
+        f"/api/v1/categories/{cat['id']}/merge", json={"target_category_id": 99999}
+    )
+    assert resp.status_code == 400
+
+    resp = await async_client.post(
+        "/api/v1/categories/99999/merge", json={"target_category_id": cat["id"]}
+    )
+    assert resp.status_code == 404
@@ -0,0 +1,171 @@
+# tests/test_category_tree.py
+import pytest
+from httpx import AsyncClient
+
+
+async def _category(client: AsyncClient, name: str, parent: dict | None = None) -> dict:
+    body = {"name": name}
+    if parent:
+        body["parent_id"] = parent["id"]
+    resp = await client.post("/api/v1/categories", json=body)
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _product(client: AsyncClient, name: str, category: dict) -> dict:
+    resp = await client.post(
+        "/api/v1/products", json={"name": name, "category_id": category["id"]}
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _counts(client: AsyncClient, category: dict) -> tuple[int, int]:
+    data = (await client.get(f"/api/v1/categories/{category['id']}")).json()
+    return data["product_count"], data["subtree_product_count"]
+
+
+@pytest.fixture
+async def tree(async_client: AsyncClient) -> dict[str, dict]:
+    """electronics > phones > android, electronics > laptops."""
+    electronics = await _category(async_client, "Electronics")
+    phones = await _category(async_client, "Phones", electronics)
+    android = await _category(async_client, "Android", phones)
+    laptops = await _category(async_client, "Laptops", electronics)
+    await _product(async_client, "Pixel", android)
+    await _product(async_client, "Galaxy", android)
+    await _product(async_client, "Landline", phones)
+    await _product(async_client, "ThinkPad", laptops)
+    return {"electronics": electronics, "phones": phones, "android": android, "laptops": laptops}
+
+
+@pytest.mark.asyncio
+async def test_create_child_category_sets_path(async_client: AsyncClient, tree):
+    electronics, phones, android = tree["electronics"], tree["phones"], tree["android"]
+    assert electronics["path"] == f"/{electronics['id']}/"
+    assert android["path"] == f"/{electronics['id']}/{phones['id']}/{android['id']}/"
+    assert android["depth"] == 2
+    assert android["parent_id"] == phones["id"]
+
+
+@pytest.mark.asyncio
+async def test_create_category_with_missing_parent(async_client: AsyncClient):
+    resp = await async_client.post("/api/v1/categories", json={"name": "Orphan", "parent_id": 99999})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_children(async_client: AsyncClient, tree):
+    resp = await async_client.get(f"/api/v1/categories?parent_id={tree['electronics']['id']}")
+    assert [c["name"] for c in resp.json()] == ["Laptops", "Phones"]
+
+
+@pytest.mark.asyncio
+async def test_subtree_counts_maintained_on_product_writes(async_client: AsyncClient, tree):
+    assert await _counts(async_client, tree["electronics"]) == (0, 4)
+    assert await _counts(async_client, tree["phones"]) == (1, 3)
+    assert await _counts(async_client, tree["android"]) == (2, 2)
+
+    pixel = (await async_client.get("/api/v1/products?search=pixel")).json()["items"][0]
+    await async_client.put(
+        f"/api/v1/products/{pixel['id']}", json={"category_id": tree["laptops"]["id"]}
+    )
+    assert await _counts(async_client, tree["phones"]) == (1, 2)
+    assert await _counts(async_client, tree["laptops"]) == (2, 2)
+    assert await _counts(async_client, tree["electronics"]) == (0, 4)
+
+    await async_client.delete(f"/api/v1/products/{pixel['id']}")
+    assert await _counts(async_client, tree["laptops"]) == (1, 1)
+    assert await _counts(async_client, tree["electronics"]) == (0, 3)
+
+    await async_client.post(
+        "/api/v1/products/move",
+        json={"target_category_id": tree["laptops"]["id"], "source_category_id": tree["android"]["id"]},
+    )
+    assert await _counts(async_client, tree["android"]) == (0, 0)
+    assert await _counts(async_client, tree["phones"]) == (1, 1)
+    assert await _counts(async_client, tree["laptops"]) == (2, 2)
+
+    await async_client.delete(f"/api/v1/products?category_id={tree['laptops']['id']}")
+    assert await _counts(async_client, tree["electronics"]) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_list_products_in_subtree(async_client: AsyncClient, tree):
+    resp = await async_client.get(
+        f"/api/v1/products?category_id={tree['phones']['id']}&include_subcategories=true"
+    )
+    assert [p["name"] for p in resp.json()["items"]] == ["Galaxy", "Landline", "Pixel"]
+    assert resp.json()["total"] == 3
+
+    resp = await async_client.get(f"/api/v1/products?category_id={tree['phones']['id']}")
+    assert [p["name"] for p in resp.json()["items"]] == ["Landline"]
+
+    resp = await async_client.get("/api/v1/products?category_id=99999&include_subcategories=true")
+    assert resp.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_move_subtree(async_client: AsyncClient, tree):
+    electronics, phones, android, laptops = (
+        tree["electronics"], tree["phones"], tree["android"], tree["laptops"]
+    )
+    resp = await async_client.put(
+        f"/api/v1/categories/{phones['id']}", json={"parent_id": laptops["id"]}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["path"] == f"{laptops['path']}{phones['id']}/"
+    assert resp.json()["depth"] == 2
+
+    moved_android = (await async_client.get(f"/api/v1/categories/{android['id']}")).json()
+    assert moved_android["path"] == f"{laptops['path']}{phones['id']}/{android['id']}/"
+    assert moved_android["depth"] == 3
+    assert await _counts(async_client, laptops) == (1, 4)
+    assert await _counts(async_client, electronics) == (0, 4)
+
+    # Detach to the root.
+    resp = await async_client.put(f"/api/v1/categories/{phones['id']}", json={"parent_id": None})
+    assert resp.json()["path"] == f"/{phones['id']}/"
+    assert resp.json()["depth"] == 0
+    assert await _counts(async_client, laptops) == (1, 1)
+    assert await _counts(async_client, electronics) == (0, 1)
+
+    resp = await async_client.get(
+        f"/api/v1/products?category_id={phones['id']}&include_subcategories=true"
+    )
+    assert resp.json()["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_move_subtree_into_itself_rejected(async_client: AsyncClient, tree):
+    resp = await async_client.put(
+        f"/api/v1/categories/{tree['phones']['id']}", json={"parent_id": tree["android"]["id"]}
+    )
+    assert resp.status_code == 400
+    assert "own subtree" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_delete_or_merge_category_with_children_rejected(async_client: AsyncClient, tree):
+    resp = await async_client.delete(f"/api/v1/categories/{tree['phones']['id']}")
+    assert resp.status_code == 409
+
+    resp = await async_client.post(
+        f"/api/v1/categories/{tree['phones']['id']}/merge",
+        json={"target_category_id": tree["laptops"]["id"]},
+    )
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_delete_and_merge_leaf_update_ancestor_counts(async_client: AsyncClient, tree):
+    resp = await async_client.post(
+        f"/api/v1/categories/{tree['android']['id']}/merge",
+        json={"target_category_id": tree["laptops"]["id"]},
+    )
+    assert resp.json()["moved"] == 2
+    assert await _counts(async_client, tree["phones"]) == (1, 1)
+    assert await _counts(async_client, tree["laptops"]) == (3, 3)
+
+    await async_client.delete(f"/api/v1/categories/{tree['laptops']['id']}")
+    assert await _counts(async_client, tree["electronics"]) == (0, 1)
@@ -0,0 +1,175 @@
+# tests/test_changes.py
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+
+async def _changes(client: AsyncClient, since: int = 0, **params) -> dict:
+    resp = await client.get("/api/v1/changes", params={"since": since, **params})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def _summary(changes: list[dict]) -> list[tuple[str, str, int]]:
+    return [(c["entity"], c["op"], c["entity_id"]) for c in changes]
+
+
+@pytest.mark.asyncio
+async def test_feed_records_single_row_writes(async_client: AsyncClient):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Books"})).json()
+    product = (
+        await async_client.post(
+            "/api/v1/products", json={"name": "Dune", "category_id": category["id"]}
+        )
+    ).json()
+    await async_client.put(f"/api/v1/products/{product['id']}", json={"name": "Dune II"})
+    await async_client.delete(f"/api/v1/products/{product['id']}")
+
+    data = await _changes(async_client)
+    assert _summary(data["changes"]) == [
+        ("category", "create", category["id"]),
+        ("product", "create", product["id"]),
+        ("product", "update", product["id"]),
+        ("product", "delete", product["id"]),
+    ]
+    assert all(c["category_id"] == category["id"] for c in data["changes"])
+    assert data["next_cursor"] == data["changes"][-1]["id"]
+
+
+@pytest.mark.asyncio
+async def test_feed_records_bulk_writes(async_client: AsyncClient):
+    source = (await async_client.post("/api/v1/categories", json={"name": "Old"})).json()
+    target = (await async_client.post("/api/v1/categories", json={"name": "New"})).json()
+    ids = [
+        (
+            await async_client.post(
+                "/api/v1/products", json={"name": f"Item {i}", "category_id": source["id"]}
+            )
+        ).json()["id"]
+        for i in range(3)
+    ]
+    cursor = (await _changes(async_client))["next_cursor"]
+
+    await async_client.post(
+        f"/api/v1/categories/{source['id']}/merge", json={"target_category_id": target["id"]}
+    )
+    data = await _changes(async_client, since=cursor)
+    assert sorted(_summary(data["changes"])) == sorted(
+        [("product", "update", i) for i in ids] + [("category", "delete", source["id"])]
+    )
+    moved = [c for c in data["changes"] if c["entity"] == "product"]
+    assert {c["category_id"] for c in moved} == {target["id"]}
+
+    cursor = data["next_cursor"]
+    await async_client.delete(f"/api/v1/products?category_id={target['id']}")
+    data = await _changes(async_client, since=cursor)
+    assert sorted(_summary(data["changes"])) == [("product", "delete", i) for i in ids]
+
+
+@pytest.mark.asyncio
+async def test_cursor_paging(async_client: AsyncClient):
+    for name in ("A", "B", "C"):
+        await async_client.post("/api/v1/categories", json={"name": name})
+
+    first = await _changes(async_client, limit=2)
+    assert len(first["changes"]) == 2
+    rest = await _changes(async_client, since=first["next_cursor"], limit=2)
+    assert len(rest["changes"]) == 1
+    assert rest["changes"][0]["id"] > first["next_cursor"]
+
+    empty = await _changes(async_client, since=rest["next_cursor"])
+    assert empty == {"changes": [], "next_cursor": rest["next_cursor"]}
+
+
+@pytest.mark.asyncio
+async def test_long_poll_wakes_on_commit(async_client: AsyncClient, session_factory):
+    from app import crud, schemas
+
+    cursor = (await _changes(async_client))["next_cursor"]
+    poll = asyncio.create_task(_changes(async_client, since=cursor, wait=10))
+    await asyncio.sleep(0.05)
+    assert not poll.done()
+
+    async with session_factory() as db:
+        await crud.category.create(db, schemas.CategoryCreate(name="Late"))
+
+    data = await asyncio.wait_for(poll, timeout=5)
+    assert _summary(data["changes"])[0][:2] == ("category", "create")
+
+
+@pytest.fixture
+def subscription():
+    from app.core.broadcast import hub
+
+    subscription = hub.subscribe(maxsize=10)
+    yield subscription
+    hub.unsubscribe(subscription)
+
+
+@pytest.mark.asyncio
+async def test_commits_publish_to_subscribers(async_client: AsyncClient, subscription):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Live"})).json()
+    other = (await async_client.post("/api/v1/categories", json={"name": "Other"})).json()
+    product = (
+        await async_client.post(
+            "/api/v1/products", json={"name": "Widget", "category_id": category["id"]}
+        )
+    ).json()
+    await async_client.post(
+        "/api/v1/products/move",
+        json={"target_category_id": other["id"], "source_category_id": category["id"]},
+    )
+
+    events = [await subscription.get(1) for _ in range(4)]
+    assert [(e["entity"], e["op"], e["entity_id"]) for e in events] == [
+        ("category", "create", category["id"]),
+        ("category", "create", other["id"]),
+        ("product", "create", product["id"]),
+        ("product", "update", product["id"]),
+    ]
+    assert events[-1]["category_id"] == other["id"]
+    # Event ids match the change feed cursor.
+    feed = (await _changes(async_client))["changes"]
+    assert [e["id"] for e in events] == [c["id"] for c in feed]
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_are_not_published(db_session, subscription):
+    from app import crud
+
+    crud.change.record(db_session, entity="category", entity_id=1, op="create")
+    await db_session.flush()
+    await db_session.rollback()
+    assert await subscription.get(0.05) is None
+
+
+def test_category_filter_and_slow_consumer_dropped():
+    from app.core.broadcast import Broadcaster
+
+    hub = Broadcaster()
+    filtered = hub.subscribe(maxsize=10, predicate=lambda e: e["category_id"] == 1)
+    slow = hub.subscribe(maxsize=2)
+
+    hub.publish([{"category_id": 1}, {"category_id": 2}, {"category_id": 1}])
+    assert filtered.queue.qsize() == 2
+    assert slow.dropped
+    assert len(hub) == 1
+
+
+def test_event_stream_format():
+    from app.api.v1.endpoints.change import format_event
+
+    text = format_event(
+        {
+            "id": 7,
+            "entity": "product",
+            "entity_id": 3,
+            "op": "update",
+            "category_id": 2,
+            "created_at": "2024-01-01T00:00:00",
+        }
+    )
+    assert text.startswith("id: 7\nevent: change\ndata: {")
+    assert text.endswith("}\n\n")
+    assert '"entity_id":3' in text
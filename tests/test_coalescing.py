@@ -0,0 +1,156 @@
+# tests/test_coalescing.py
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, inspect
+
+from app import crud
+from app.core.singleflight import SingleFlight, reads
+from app.models.category import Category
+from app.schemas.category import CategoryCreate
+
+
+@pytest.fixture
+def count_selects(test_engine):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution(db_session):
+    flight = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def read(db, key):
+        nonlocal started
+        started += 1
+        await release.wait()
+        return [key]
+
+    shared = flight.coalesce(read)
+    calls = [asyncio.ensure_future(shared(db_session, key=k)) for k in ("a", "a", "a", "b")]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*calls)
+
+    assert results == [["a"], ["a"], ["a"], ["b"]]
+    assert results[0] is results[1]
+    assert started == 2
+    assert flight.stats() == [(f"{__name__.rsplit('.', 1)[-1]}.read", 4, 2)]
+
+    # Nothing is cached once the call has completed.
+    await shared(db_session, key="a")
+    assert started == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_caller(db_session):
+    flight = SingleFlight()
+
+    async def boom(db):
+        await asyncio.sleep(0)
+        raise RuntimeError("db down")
+
+    shared = flight.coalesce(boom)
+    results = await asyncio.gather(shared(db_session), shared(db_session), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_shared_call_runs_on_its_own_session(db_session):
+    category = await crud.category.create(db_session, obj_in=CategoryCreate(name="Own"))
+    flight = SingleFlight()
+    sessions = []
+
+    async def read(db, *, category_id, names=()):
+        sessions.append(db)
+        await asyncio.sleep(0)
+        return await db.get(Category, category_id)
+
+    shared = flight.coalesce(read)
+    first, second = await asyncio.gather(
+        shared(db_session, category_id=category.id),
+        shared(db_session, category_id=category.id),
+    )
+    assert first is second
+    assert sessions[0] is not db_session
+    # Closed before returning: the result belongs to no session.
+    assert inspect(first).detached
+    assert first.name == "Own"
+
+    # Unhashable arguments cannot be keyed; such calls run alone on the caller's session.
+    await asyncio.gather(
+        *(shared(db_session, category_id=category.id, names=["x"]) for _ in range(2))
+    )
+    assert sessions[1:] == [db_session, db_session]
+    assert flight.stats() == [(f"{__name__.rsplit('.', 1)[-1]}.read", 2, 1)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_product_reads_coalesced(async_client: AsyncClient, count_selects):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Hot"})).json()
+    product = (
+        await async_client.post(
+            "/api/v1/products", json={"name": "Viral", "category_id": category["id"]}
+        )
+    ).json()
+    before = {name: (calls, coalesced) for name, calls, coalesced in reads.stats()}
+    count_selects.clear()
+
+    responses = await asyncio.gather(
+        *(async_client.get(f"/api/v1/products/{product['id']}") for _ in range(20))
+    )
+    assert all(r.json() == product for r in responses)
+    # One product query plus its selectin category load, not 20 of each.
+    assert len(count_selects) == 2
+
+    resp = await async_client.get("/api/v1/metrics/coalescing")
+    stats = next(s for s in resp.json() if s["name"] == "product.get")
+    calls, coalesced = before.get("product.get", (0, 0))
+    assert stats["calls"] - calls == 20
+    assert stats["coalesced"] - coalesced == 19
+
+
+@pytest.mark.asyncio
+async def test_every_endpoint_argument_is_hashable(async_client: AsyncClient):
+    """Listings with every filter, sparse fields and facets still coalesce."""
+    category = (await async_client.post("/api/v1/categories", json={"name": "Hot"})).json()
+    await async_client.post(
+        "/api/v1/products",
+        json={"name": "Viral", "category_id": category["id"], "price": "5.00", "sku": "V-1"},
+    )
+    params = {
+        "search": "vir",
+        "category_id": category["id"],
+        "include_subcategories": True,
+        "min_price": "1",
+        "max_price": "10",
+        "sku": "V-1",
+        "in_stock": False,
+        "sort": "-price",
+        "fields": "id,name",
+        "facets": True,
+    }
+    names = ("product.get_multi", "product.fuzzy_search", "product.facet_counts")
+    before = {name: coalesced for name, _, coalesced in reads.stats()}
+    for fuzzy in (False, True):
+        responses = await asyncio.gather(
+            *(
+                async_client.get("/api/v1/products", params={**params, "fuzzy": fuzzy})
+                for _ in range(5)
+            )
+        )
+        assert all(r.status_code == 200 and r.json()["total"] == 1 for r in responses)
+
+    after = {name: coalesced for name, _, coalesced in reads.stats()}
+    for name in names:
+        assert after[name] - before.get(name, 0) > 0, name
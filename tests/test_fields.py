@@ -0,0 +1,68 @@
+# tests/test_fields.py
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+
+@pytest.fixture
+def selects(test_engine):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.fixture
+async def product(async_client: AsyncClient) -> dict:
+    category = (
+        await async_client.post("/api/v1/categories", json={"name": "Books", "description": "Long"})
+    ).json()
+    resp = await async_client.post(
+        "/api/v1/products",
+        json={"name": "Atlas", "description": "x" * 1000, "category_id": category["id"]},
+    )
+    return resp.json()
+
+
+@pytest.mark.asyncio
+async def test_list_products_sparse_fields(async_client: AsyncClient, product, selects):
+    resp = await async_client.get("/api/v1/products?fields=id,name,category_id")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["items"] == [
+        {"id": product["id"], "name": "Atlas", "category_id": product["category_id"]}
+    ]
+    assert data["total"] == 1
+
+    list_query = next(s for s in selects if "ORDER BY" in s)
+    assert "description" not in list_query
+    # No selectin load of the category.
+    assert not any("FROM category" in s for s in selects)
+
+
+@pytest.mark.asyncio
+async def test_read_product_sparse_fields(async_client: AsyncClient, product):
+    resp = await async_client.get(f"/api/v1/products/{product['id']}?fields=name,category")
+    assert resp.json() == {"name": "Atlas", "category": product["category"]}
+
+
+@pytest.mark.asyncio
+async def test_unknown_field_rejected(async_client: AsyncClient, product):
+    resp = await async_client.get("/api/v1/products?fields=id,secret")
+    assert resp.status_code == 400
+    assert "secret" in resp.json()["detail"]
+
+    resp = await async_client.get("/api/v1/categories?fields=,")
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_categories_sparse_fields(async_client: AsyncClient, product, selects):
+    resp = await async_client.get("/api/v1/categories?fields=id,name")
+    assert resp.json() == [{"id": product["category_id"], "name": "Books"}]
+    assert "description" not in next(s for s in selects if "FROM category" in s)
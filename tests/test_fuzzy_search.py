@@ -0,0 +1,153 @@
+# tests/test_fuzzy_search.py
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app import crud
+from app.core.config import settings
+from app.crud.trigram import similarity, trigrams
+from app.models.product_trigram import ProductTrigram, ProductTrigramCount
+
+
+def test_trigrams_pad_each_word():
+    assert trigrams("Hi-Fi") == {"  h", " hi", "hi ", "  f", " fi", "fi "}
+    assert trigrams("  --  ") == set()
+    assert trigrams("IPHONE") == trigrams("iphone")
+
+
+def test_similarity_prefers_contained_then_closest():
+    query = trigrams("iphnoe")
+    exact = similarity(query, trigrams("iphnoe"))
+    assert exact == (1.0, 1.0)
+    short = similarity(query, trigrams("iPhone"))
+    long = similarity(query, trigrams("Apple iPhone 15 Pro Max"))
+    assert short[0] == long[0] > 0.4
+    assert short[1] > long[1]
+
+
+@pytest.fixture
+async def catalog(async_client: AsyncClient):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Phones"})).json()
+    for name in ["iPhone 15", "Apple iPhone 15 Pro Max", "Galaxy S24", "Pixel 8", "Phone Case"]:
+        resp = await async_client.post(
+            "/api/v1/products", json={"name": name, "category_id": category["id"]}
+        )
+        assert resp.status_code == 201
+    return category
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_tolerates_typos(async_client: AsyncClient, catalog):
+    resp = await async_client.get("/api/v1/products", params={"search": "iphnoe"})
+    assert resp.json()["total"] == 0
+
+    resp = await async_client.get(
+        "/api/v1/products", params={"search": "iphnoe", "fuzzy": True}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [item["name"] for item in data["items"]] == ["iPhone 15", "Apple iPhone 15 Pro Max"]
+    assert data["total"] == 2
+
+    resp = await async_client.get(
+        "/api/v1/products", params={"search": "galxy", "fuzzy": True, "fields": "id,name"}
+    )
+    assert resp.json()["items"] == [{"id": resp.json()["items"][0]["id"], "name": "Galaxy S24"}]
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_filters_and_pagination(async_client: AsyncClient, catalog):
+    other = (await async_client.post("/api/v1/categories", json={"name": "Refurbished"})).json()
+    await async_client.post("/api/v1/products", json={"name": "iPhone 12", "category_id": other["id"]})
+
+    params = {"search": "iphone", "fuzzy": True}
+    resp = await async_client.get("/api/v1/products", params={**params, "category_id": other["id"]})
+    assert [item["name"] for item in resp.json()["items"]] == ["iPhone 12"]
+
+    resp = await async_client.get("/api/v1/products", params={**params, "page_size": 1, "page": 2})
+    data = resp.json()
+    # "Phone Case" holds 4 of the 7 trigrams of "iphone".
+    assert data["total"] == 4
+    assert data["total_pages"] == 4
+    assert len(data["items"]) == 1
+
+    resp = await async_client.get("/api/v1/products", params={"fuzzy": True})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_trigrams_follow_writes(async_client: AsyncClient, db_session, catalog):
+    resp = await async_client.get("/api/v1/products", params={"search": "pixel", "fuzzy": True})
+    pixel = resp.json()["items"][0]
+
+    await async_client.put(f"/api/v1/products/{pixel['id']}", json={"name": "Nexus 6"})
+    resp = await async_client.get("/api/v1/products", params={"search": "pixel", "fuzzy": True})
+    assert resp.json()["total"] == 0
+    resp = await async_client.get("/api/v1/products", params={"search": "nexsus", "fuzzy": True})
+    assert [item["id"] for item in resp.json()["items"]] == [pixel["id"]]
+
+    await async_client.delete(f"/api/v1/products/{pixel['id']}")
+    postings = await db_session.execute(
+        select(ProductTrigram).where(ProductTrigram.product_id == pixel["id"])
+    )
+    assert postings.all() == []
+
+    await async_client.delete(f"/api/v1/categories/{catalog['id']}")
+    assert (await db_session.execute(select(ProductTrigram))).all() == []
+    counts = await db_session.execute(select(ProductTrigramCount.products).distinct())
+    assert counts.scalars().all() == [0]
+
+
+@pytest.mark.asyncio
+async def test_trigram_counts_match_postings(async_client: AsyncClient, db_session, catalog):
+    resp = await async_client.get("/api/v1/products", params={"search": "galaxy"})
+    galaxy = resp.json()["items"][0]
+    await async_client.put(f"/api/v1/products/{galaxy['id']}", json={"name": "Galaxy S25"})
+    await async_client.delete(f"/api/v1/products/{galaxy['id'] - 1}")
+
+    postings = await db_session.execute(
+        select(ProductTrigram.trigram, func.count()).group_by(ProductTrigram.trigram)
+    )
+    counts = await db_session.execute(
+        select(ProductTrigramCount.trigram, ProductTrigramCount.products).where(
+            ProductTrigramCount.products > 0
+        )
+    )
+    assert dict(counts.all()) == dict(postings.all())
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_skips_common_trigrams(db_session, catalog):
+    query = trigrams("iphone")
+    # "pho", "hon", "one" and "ne " are each in three names.
+    common = await crud.trigram.common(db_session, query, max_products=2)
+    assert common == {"pho", "hon", "one", "ne "}
+    # Never all of them: the least common list is still read.
+    assert len(await crud.trigram.common(db_session, query, max_products=0)) == 6
+
+    products, total, estimate = await crud.product.fuzzy_search(
+        db_session, search="iphone", max_trigram_products=2
+    )
+    assert [product.name for product in products] == [
+        "iPhone 15", "Apple iPhone 15 Pro Max"
+    ]
+    assert (total, estimate) == (2, False)
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_flags_capped_totals(
+    async_client: AsyncClient, catalog, monkeypatch
+):
+    params = {"search": "iphone", "fuzzy": True}
+    data = (await async_client.get("/api/v1/products", params=params)).json()
+    assert (data["total"], data["total_is_estimate"]) == (3, False)
+
+    monkeypatch.setattr(settings, "FUZZY_MAX_CANDIDATES", 2)
+    data = (await async_client.get("/api/v1/products", params=params)).json()
+    assert (data["total"], data["total_is_estimate"]) == (2, True)
+
+    # Filtered-out candidates still count towards the limit.
+    data = (
+        await async_client.get("/api/v1/products", params={**params, "max_price": 1})
+    ).json()
+    assert (data["total"], data["total_is_estimate"]) == (0, True)
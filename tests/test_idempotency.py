@@ -0,0 +1,132 @@
+# tests/test_idempotency.py
+import asyncio
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+
+from app.db.base import utcnow
+from app.models.idempotency import IdempotencyKey
+from app.models.product import Product
+
+
+@pytest.fixture
+async def category(async_client: AsyncClient) -> dict:
+    resp = await async_client.post("/api/v1/categories", json={"name": "Retries"})
+    return resp.json()
+
+
+async def _product_count(db_session) -> int:
+    return (await db_session.execute(select(func.count()).select_from(Product))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_stored_response(async_client: AsyncClient, db_session, category):
+    body = {"name": "Kettle", "category_id": category["id"]}
+    headers = {"Idempotency-Key": "create-kettle"}
+
+    first = await async_client.post("/api/v1/products", json=body, headers=headers)
+    retry = await async_client.post("/api/v1/products", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert await _product_count(db_session) == 1
+
+    # Without the key the same body is a new request (and a duplicate name).
+    resp = await async_client.post("/api/v1/products", json=body)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_different_body(async_client: AsyncClient, category):
+    headers = {"Idempotency-Key": "k1"}
+    await async_client.post(
+        "/api/v1/products", json={"name": "A", "category_id": category["id"]}, headers=headers
+    )
+    resp = await async_client.post(
+        "/api/v1/products", json={"name": "B", "category_id": category["id"]}, headers=headers
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_different_query(async_client: AsyncClient, db_session, category):
+    other = (await async_client.post("/api/v1/categories", json={"name": "Other"})).json()
+    for name, owner in (("Kept", category), ("Doomed", other)):
+        await async_client.post(
+            "/api/v1/products", json={"name": name, "category_id": owner["id"]}
+        )
+    headers = {"Idempotency-Key": "bulk-delete"}
+    resp = await async_client.delete(
+        f"/api/v1/products?category_id={other['id']}", headers=headers
+    )
+    assert resp.status_code == 200
+
+    # Not a replay of the first delete: the query string differs.
+    resp = await async_client.delete(
+        f"/api/v1/products?category_id={category['id']}", headers=headers
+    )
+    assert resp.status_code == 422
+    assert await _product_count(db_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_key_scoped_to_route(async_client: AsyncClient, category):
+    product = (
+        await async_client.post(
+            "/api/v1/products", json={"name": "Lamp", "category_id": category["id"]}
+        )
+    ).json()
+    headers = {"Idempotency-Key": "same"}
+    body = {"description": "Bright"}
+    await async_client.put(f"/api/v1/products/{product['id']}", json=body, headers=headers)
+    resp = await async_client.put(
+        f"/api/v1/categories/{category['id']}", json=body, headers=headers
+    )
+    assert resp.status_code == 200
+    assert "Idempotent-Replayed" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_failed_request_is_not_stored(async_client: AsyncClient, category):
+    headers = {"Idempotency-Key": "retry-after-fix"}
+    body = {"name": "Ghost", "category_id": 99999}
+    resp = await async_client.post("/api/v1/products", json=body, headers=headers)
+    assert resp.status_code == 400
+
+    await async_client.post("/api/v1/categories", json={"name": "Late"})
+    resp = await async_client.post("/api/v1/products", json=body, headers=headers)
+    assert resp.status_code == 400
+    assert "Idempotent-Replayed" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_execute_once(
+    async_client: AsyncClient, db_session, category
+):
+    body = {"name": "Toaster", "category_id": category["id"]}
+    headers = {"Idempotency-Key": "burst"}
+    responses = await asyncio.gather(
+        *(async_client.post("/api/v1/products", json=body, headers=headers) for _ in range(5))
+    )
+    assert [r.status_code for r in responses] == [201] * 5
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 4
+    assert await _product_count(db_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_key_executes_again(async_client: AsyncClient, db_session, category):
+    headers = {"Idempotency-Key": "old"}
+    await async_client.post("/api/v1/categories", json={"name": "Once"}, headers=headers)
+    await db_session.execute(
+        update(IdempotencyKey).values(expires_at=utcnow() - timedelta(seconds=1))
+    )
+    await db_session.commit()
+
+    resp = await async_client.post("/api/v1/categories", json={"name": "Once"}, headers=headers)
+    assert resp.status_code == 400
+    assert "already exists" in resp.json()["detail"]
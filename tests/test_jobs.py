@@ -0,0 +1,158 @@
+# tests/test_jobs.py
+import asyncio
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app import crud
+from app.db.base import utcnow
+from app.jobs import runner
+from app.jobs.runner import JobContext
+from app.models.job import Job
+
+
+@pytest.fixture
+def gated_handler(monkeypatch):
+    """Register a 'count' job that checkpoints once per released gate."""
+    gate = asyncio.Queue()
+
+    async def count(ctx: JobContext):
+        while ctx.progress < ctx.params["to"]:
+            await gate.get()
+            await ctx.checkpoint(1)
+        return {"counted": ctx.progress}
+
+    monkeypatch.setitem(runner._handlers, "count", count)
+    return gate
+
+
+@pytest.mark.asyncio
+async def test_job_runs_to_completion(db_session, session_factory, gated_handler):
+    job = await runner.submit(db_session, "count", {"to": 2}, session_factory=session_factory)
+    gated_handler.put_nowait(None)
+    gated_handler.put_nowait(None)
+    await runner.wait(job.id)
+
+    job = await crud.job.get(db_session, job.id)
+    assert job.status == "succeeded"
+    assert job.progress == 2
+    assert job.result == {"counted": 2}
+
+
+@pytest.mark.asyncio
+async def test_submit_unknown_kind(db_session, session_factory):
+    with pytest.raises(ValueError):
+        await runner.submit(db_session, "nope", {}, session_factory=session_factory)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(db_session, session_factory, monkeypatch):
+    async def boom(ctx: JobContext):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setitem(runner._handlers, "boom", boom)
+    job = await runner.submit(db_session, "boom", {}, session_factory=session_factory)
+    await runner.wait(job.id)
+
+    job = await crud.job.get(db_session, job.id)
+    assert job.status == "failed"
+    assert job.error == "disk full"
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_job(
+    async_client: AsyncClient, db_session, session_factory, gated_handler
+):
+    job = await runner.submit(db_session, "count", {"to": 10}, session_factory=session_factory)
+    gated_handler.put_nowait(None)
+    while (await crud.job.get(db_session, job.id)).progress < 1:
+        await asyncio.sleep(0.01)
+
+    resp = await async_client.post(f"/api/v1/jobs/{job.id}/cancel")
+    assert resp.status_code == 202
+    assert resp.json()["cancel_requested"] is True
+
+    gated_handler.put_nowait(None)
+    await runner.wait(job.id)
+    resp = await async_client.get(f"/api/v1/jobs/{job.id}")
+    assert resp.json()["status"] == "cancelled"
+    assert resp.json()["progress"] == 2
+
+    resp = await async_client.post(f"/api/v1/jobs/{job.id}/cancel")
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_pending_job_cancelled_immediately(async_client: AsyncClient, db_session):
+    job = await crud.job.create(db_session, kind="count", params={"to": 1})
+
+    resp = await async_client.post(f"/api/v1/jobs/{job.id}/cancel")
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_cancel_racing_a_claim_flags_the_running_job(db_session, session_factory):
+    job = await crud.job.create(db_session, kind="count", params={"to": 1})
+    # Read as pending, then claimed by a worker before the cancel is written.
+    async with session_factory() as worker:
+        assert await crud.job.claim(worker, job.id, lease_seconds=60)
+
+    job = await crud.job.request_cancel(db_session, job)
+    assert (job.status, job.cancel_requested) == ("running", True)
+    async with session_factory() as worker:
+        assert await crud.job.checkpoint(worker, job.id, progress=1)
+
+
+@pytest.mark.asyncio
+async def test_claim_is_exclusive_until_lease_expires(db_session):
+    job = await crud.job.create(db_session, kind="count", params={"to": 1})
+
+    assert await crud.job.claim(db_session, job.id, lease_seconds=60)
+    assert not await crud.job.claim(db_session, job.id, lease_seconds=60)
+
+    # Simulate a worker that died without checkpointing for two minutes.
+    await db_session.execute(
+        update(Job).where(Job.id == job.id).values(updated_at=utcnow() - timedelta(minutes=2))
+    )
+    await db_session.commit()
+    assert await crud.job.claim(db_session, job.id, lease_seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_resume_picks_up_interrupted_job(db_session, session_factory, gated_handler):
+    # A job left half-done by a previous worker process.
+    job = await crud.job.create(db_session, kind="count", params={"to": 3})
+    await db_session.execute(
+        update(Job)
+        .where(Job.id == job.id)
+        .values(status="running", progress=2, updated_at=utcnow() - timedelta(hours=1))
+    )
+    await db_session.commit()
+
+    assert await runner.resume(session_factory) == 1
+    gated_handler.put_nowait(None)
+    await runner.wait(job.id)
+
+    job = await crud.job.get(db_session, job.id)
+    assert job.status == "succeeded"
+    assert job.result == {"counted": 3}
+
+
+@pytest.mark.asyncio
+async def test_flagged_job_is_cancelled_when_claimed(db_session, session_factory, gated_handler):
+    # Cancel requested while running, then its worker died before a checkpoint.
+    job = await crud.job.create(db_session, kind="count", params={"to": 3})
+    await db_session.execute(
+        update(Job)
+        .where(Job.id == job.id)
+        .values(status="running", cancel_requested=True, updated_at=utcnow() - timedelta(hours=1))
+    )
+    await db_session.commit()
+
+    assert await runner.resume(session_factory) == 1
+    await asyncio.wait_for(runner.wait(job.id), 5)
+    job = await crud.job.get(db_session, job.id)
+    assert (job.status, job.progress) == ("cancelled", 0)
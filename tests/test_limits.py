@@ -0,0 +1,148 @@
+# tests/test_limits.py
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.middleware import AdmissionMiddleware, request_priority
+from app.core.limits import DecayingMax, LoadShedder, Priority, RateLimiter
+
+
+def test_token_bucket_allows_burst_then_refills():
+    limiter = RateLimiter(rate=2, burst=3, max_clients=100)
+    assert [limiter.acquire("a", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a", now=0) == pytest.approx(0.5)
+    # Other clients have their own bucket.
+    assert limiter.acquire("b", now=0) == 0
+    assert limiter.acquire("a", now=0.5) == 0
+
+
+def test_token_bucket_tracks_bounded_clients():
+    limiter = RateLimiter(rate=1, burst=1, max_clients=2)
+    for client in ("a", "b", "c"):
+        limiter.acquire(client, now=0)
+    assert len(limiter._buckets) == 2
+    # "a" was evicted, so it starts with a full bucket again.
+    assert limiter.acquire("a", now=0) == 0
+
+
+def test_decaying_max():
+    peak = DecayingMax(half_life=1.0)
+    peak.observe(0.8, now=10)
+    peak.observe(0.1, now=10)
+    assert peak.value(now=10) == pytest.approx(0.8)
+    assert peak.value(now=12) == pytest.approx(0.2)
+
+
+def test_shedder_drops_low_priority_first():
+    pool_wait = DecayingMax(half_life=1.0)
+    shedder = LoadShedder(max_in_flight=4, max_pool_wait=0.25, pool_wait=pool_wait)
+
+    shedder.in_flight = 2
+    assert not shedder.admit(Priority.LOW)
+    assert shedder.admit(Priority.NORMAL)
+    shedder.in_flight = 3
+    assert not shedder.admit(Priority.NORMAL)
+    assert shedder.admit(Priority.CRITICAL)
+    shedder.in_flight = 4
+    assert not shedder.admit(Priority.CRITICAL)
+
+    shedder.in_flight = 0
+    pool_wait.observe(0.3)
+    assert not shedder.admit(Priority.LOW)
+    assert shedder.admit(Priority.NORMAL)
+    pool_wait.observe(10)
+    assert shedder.admit(Priority.CRITICAL)
+
+
+def test_request_priority():
+    assert request_priority("GET", "/api/v1/products/42") is Priority.CRITICAL
+    assert request_priority("GET", "/api/v1/categories/7") is Priority.CRITICAL
+    assert request_priority("GET", "/api/v1/products") is Priority.LOW
+    assert request_priority("POST", "/api/v1/products") is Priority.NORMAL
+
+
+def _client(**limits) -> AsyncClient:
+    app = FastAPI()
+
+    @app.get("/api/v1/products/{product_id}")
+    async def item(product_id: int):
+        return {"id": product_id}
+
+    @app.get("/api/v1/products")
+    async def listing():
+        return []
+
+    app.add_middleware(AdmissionMiddleware, prefix="/api/v1", retry_after=3, **limits)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_middleware_rate_limits_per_api_key():
+    limiter = RateLimiter(rate=0.5, burst=1, max_clients=100)
+    async with _client(limiter=limiter, shedder=None, api_keys=["a", "b"]) as client:
+        assert (await client.get("/api/v1/products", headers={"X-API-Key": "a"})).status_code == 200
+        resp = await client.get("/api/v1/products", headers={"X-API-Key": "a"})
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == "2"
+        assert (await client.get("/api/v1/products", headers={"X-API-Key": "b"})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_unknown_api_keys_share_the_address_bucket():
+    limiter = RateLimiter(rate=0.5, burst=1, max_clients=100)
+    async with _client(limiter=limiter, shedder=None, api_keys=["a"]) as client:
+        # A crawler sending a new key with every request.
+        statuses = [
+            (await client.get("/api/v1/products", headers={"X-API-Key": f"k{i}"})).status_code
+            for i in range(3)
+        ]
+        assert statuses == [200, 429, 429]
+        assert (await client.get("/api/v1/products", headers={"X-API-Key": "a"})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_forwarded_for_trusted_only_when_configured():
+    forwarded = {"X-Forwarded-For": "6.6.6.6, 10.0.0.1"}
+    # Ignored by default: every request through the proxy shares its address.
+    limiter = RateLimiter(rate=0.5, burst=1, max_clients=100)
+    async with _client(limiter=limiter, shedder=None) as client:
+        assert (await client.get("/api/v1/products", headers=forwarded)).status_code == 200
+        resp = await client.get("/api/v1/products", headers={"X-Forwarded-For": "10.0.0.2"})
+        assert resp.status_code == 429
+
+    # One trusted proxy: its appended entry is the client; the spoofable
+    # entries before it are not.
+    limiter = RateLimiter(rate=0.5, burst=1, max_clients=100)
+    async with _client(limiter=limiter, shedder=None, forwarded_hops=1) as client:
+        assert (await client.get("/api/v1/products", headers=forwarded)).status_code == 200
+        resp = await client.get(
+            "/api/v1/products", headers={"X-Forwarded-For": "7.7.7.7, 10.0.0.1"}
+        )
+        assert resp.status_code == 429
+        resp = await client.get("/api/v1/products", headers={"X-Forwarded-For": "10.0.0.2"})
+        assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_by_priority():
+    shedder = LoadShedder(max_in_flight=4, max_pool_wait=0.25, pool_wait=DecayingMax(1.0))
+    shedder.in_flight = 3
+    async with _client(limiter=None, shedder=shedder) as client:
+        resp = await client.get("/api/v1/products")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "3"
+        assert (await client.get("/api/v1/products/1")).status_code == 200
+    assert shedder.in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_observed_on_first_query(session_factory):
+    from sqlalchemy import text
+
+    from app.db.session import pool_wait
+
+    observed_at = pool_wait._at
+    async with session_factory() as db:
+        await db.execute(text("SELECT 1"))
+    # The connection checkout was timed and recorded.
+    assert pool_wait._at > observed_at
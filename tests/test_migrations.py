@@ -0,0 +1,302 @@
+# tests/test_migrations.py
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import crud
+from app.db import migrate
+from app.db.base import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+
+
+@pytest.fixture
+async def migrated_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}")
+    await migrate.upgrade(engine)
+    yield engine
+    await engine.dispose()
+
+
+def _schema_diff(connection):
+    context = MigrationContext.configure(connection)
+    return compare_metadata(context, Base.metadata)
+
+
+@pytest.mark.asyncio
+async def test_migrations_match_models(migrated_engine):
+    """Test that upgrading to head yields exactly the schema the models declare."""
+    async with migrated_engine.connect() as conn:
+        diff = await conn.run_sync(_schema_diff)
+    assert diff == []
+
+
+@pytest.mark.asyncio
+async def test_upgrade_stamps_legacy_create_all_database(tmp_path):
+    """Test that a database built by the old create_all hook is adopted, not recreated."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE category (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(100) NOT NULL, description VARCHAR(255))"))
+        await conn.execute(text("CREATE INDEX ix_category_id ON category (id)"))
+        await conn.execute(text("CREATE UNIQUE INDEX ix_category_name ON category (name)"))
+        await conn.execute(text("CREATE TABLE product (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(200) NOT NULL, description TEXT, category_id INTEGER NOT NULL REFERENCES category (id) ON DELETE CASCADE)"))
+        await conn.execute(text("CREATE INDEX ix_product_id ON product (id)"))
+        await conn.execute(text("CREATE UNIQUE INDEX ix_product_name ON product (name)"))
+        await conn.execute(text("CREATE INDEX ix_product_category_id ON product (category_id)"))
+        await conn.execute(text("INSERT INTO category (id, name) VALUES (1, 'Kept')"))
+
+    await migrate.upgrade(engine)
+
+    async with engine.connect() as conn:
+        names = (await conn.execute(text("SELECT name FROM category"))).scalars().all()
+        indexes = set(
+            (await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))).scalars()
+        )
+    await engine.dispose()
+
+    assert names == ["Kept"]
+    assert "ix_product_category_id_name_id" in indexes
+    assert not {"ix_category_id", "ix_product_id", "ix_product_category_id"} & indexes
+
+
+async def _query_plans(engine, run) -> list[str]:
+    """Run ``run(session)`` and return the EXPLAIN QUERY PLAN of every SELECT it issued."""
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as session:
+            await run(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            raw = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append(" | ".join(row[-1] for row in raw))
+    return plans
+
+
+@pytest.mark.asyncio
+async def test_product_list_queries_use_indexes(migrated_engine):
+    """Test that get_multi's list and count queries are index scans without temp sorts."""
+    async with AsyncSession(migrated_engine) as session:
+        session.add(Category(id=1, name="Electronics", path="/1/"))
+        session.add_all(Product(name=f"P{i}", category_id=1) for i in range(20))
+        await session.commit()
+
+    async def filtered(session):
+        await crud.product.get_multi(session, skip=0, limit=10, category_id=1)
+
+    # Trailing plans belong to the selectin load of Product.category.
+    count_plan, list_plan, *_ = await _query_plans(migrated_engine, filtered)
+    # Any (category_id, ...) composite covers the count; the list needs the name one.
+    assert "COVERING INDEX ix_product_category_id_" in count_plan
+    assert "ix_product_category_id_name_id" in list_plan
+    assert "TEMP B-TREE" not in list_plan
+
+    async def unfiltered(session):
+        await crud.product.get_multi(session, skip=0, limit=10)
+
+    _, list_plan, *_ = await _query_plans(migrated_engine, unfiltered)
+    assert "ix_product_name" in list_plan
+    assert "TEMP B-TREE" not in list_plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, sort, index",
+    [
+        ({"min_price": 5}, "price", "ix_product_price_id (price>?)"),
+        ({"min_price": 5, "max_price": 9}, "-price", "ix_product_price_id (price>? AND price<?)"),
+        ({}, "-price", "ix_product_price_id"),
+        ({"category_id": 1, "max_price": 9}, "price", "ix_product_category_id_price_id"),
+        ({"category_id": 1}, "-price", "ix_product_category_id_price_id (category_id=?)"),
+        ({"sku": "SKU-3"}, "name", "ix_product_sku (sku=?)"),
+        ({}, "-name", "ix_product_name"),
+        ({}, "-created_at", "ix_product_created_at_id"),
+        ({"category_id": 1}, "created_at", "ix_product_category_id_created_at_id (category_id=?)"),
+        ({"category_id": 1}, "-name", "ix_product_category_id_name_id (category_id=?)"),
+        ({}, "-id", "SCAN product"),
+        ({"in_stock": True}, "name", "ix_product_in_stock_name_id"),
+    ],
+)
+async def test_price_and_sku_queries_use_indexes(migrated_engine, filters, sort, index):
+    """Test that each filter and whitelisted sort combination is answered from an index."""
+    async with AsyncSession(migrated_engine) as session:
+        session.add(Category(id=1, name="Electronics", path="/1/"))
+        session.add_all(
+            Product(name=f"P{i}", category_id=1, price=i, sku=f"SKU-{i}") for i in range(20)
+        )
+        await session.commit()
+
+    async def run(session):
+        await crud.product.get_multi(session, skip=0, limit=10, sort=sort, **filters)
+
+    _, list_plan, *_ = await _query_plans(migrated_engine, run)
+    assert index in list_plan
+    assert "TEMP B-TREE" not in list_plan
+
+
+@pytest.mark.asyncio
+async def test_upgrade_backfills_product_trigrams(tmp_path):
+    """Test that products existing before revision 0009 become fuzzy-searchable."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'trigrams.db'}")
+    await migrate.upgrade(engine, "0008")
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO category (id, name, path, depth, product_count, subtree_product_count) VALUES (1, 'Phones', '/1/', 0, 1, 1)"))
+        await conn.execute(text("INSERT INTO product (name, category_id, created_at) VALUES ('iPhone 15', 1, '2026-01-01')"))
+    await migrate.upgrade(engine)
+
+    async with AsyncSession(engine) as session:
+        products, total, _ = await crud.product.fuzzy_search(session, search="iphnoe")
+    await engine.dispose()
+    assert total == 1
+    assert products[0].name == "iPhone 15"
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_reads_trigram_postings(migrated_engine):
+    """Test that fuzzy candidates come from trigram key ranges, not a product scan."""
+    async with AsyncSession(migrated_engine) as session:
+        session.add(Category(id=1, name="Phones", path="/1/"))
+        await session.commit()
+        for i in range(20):
+            await crud.product.create(
+                session, ProductCreate(name=f"Phone {i}", category_id=1)
+            )
+
+    async def run(session):
+        await crud.product.fuzzy_search(session, search="phoen", category_id=1)
+
+    count_plan, candidate_plan, page_plan, *_ = await _query_plans(migrated_engine, run)
+    assert "SEARCH product_trigram_count USING PRIMARY KEY (trigram=?)" in count_plan
+    assert "SEARCH product_trigram USING PRIMARY KEY (trigram=?)" in candidate_plan
+    # Candidates drive the join even with an indexable category filter.
+    assert "SEARCH product USING INTEGER PRIMARY KEY (rowid=?)" in candidate_plan
+    assert "ix_product_category_id" not in candidate_plan
+    assert "SEARCH product USING INTEGER PRIMARY KEY (rowid=?)" in page_plan
+
+
+@pytest.mark.asyncio
+async def test_stock_journal_queries_use_time_indexes(migrated_engine):
+    """Test that journal time ranges and as-of lookups are index range scans."""
+    since, until = datetime(2026, 3, 1), datetime(2026, 3, 2)
+
+    async def run(session):
+        await crud.stock.get_movements(session, since=since, until=until)
+        await crud.stock.get_movements(session, product_id=1, since=since, until=until)
+        await crud.stock.quantity_as_of(session, product_id=1, at=until)
+
+    global_plan, product_plan, snapshot_plan, tail_plan = await _query_plans(migrated_engine, run)
+    assert "ix_stock_movement_created_at (created_at>? AND created_at<?)" in global_plan
+    assert (
+        "ix_stock_movement_product_id_created_at (product_id=? AND created_at>? AND created_at<?)"
+        in product_plan
+    )
+    assert "TEMP B-TREE" not in global_plan + product_plan
+    assert "SEARCH stock_daily_snapshot USING PRIMARY KEY (product_id=? AND day<?)" in snapshot_plan
+    assert "ix_stock_movement_product_id_created_at (product_id=? AND created_at<?)" in tail_plan
+
+
+@pytest.mark.asyncio
+async def test_category_list_query_uses_name_index(migrated_engine):
+    """Test that listing categories walks the name index instead of sorting."""
+    async def run(session):
+        await crud.category.get_multi(session)
+
+    (plan,) = await _query_plans(migrated_engine, run)
+    assert "ix_category_name" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_head_revision_constant_matches_scripts():
+    """Test that migrate.HEAD_REVISION tracks the newest revision file."""
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(migrate.get_config())
+    assert script.get_heads() == [migrate.HEAD_REVISION]
+
+
+def test_cli_defers_heavy_imports():
+    """Parsing a command loads neither Alembic, uvicorn, NumPy nor the app."""
+    heavy = ("alembic", "uvicorn", "numpy", "app.main", "app.crud", "app.server")
+    code = (
+        "import sys; from app import cli; cli.build_parser().parse_args(['check']); "
+        f"print([m for m in {heavy!r} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.asyncio
+async def test_verify_accepts_migrated_database(migrated_engine):
+    await migrate.verify(migrated_engine)
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_unmigrated_database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'empty.db'}")
+    with pytest.raises(migrate.SchemaVersionError):
+        await migrate.verify(engine)
+    await migrate.upgrade(engine, "0001")
+    with pytest.raises(migrate.SchemaVersionError):
+        await migrate.verify(engine)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_prewarm_fills_pool(migrated_engine):
+    from app.db.session import prewarm
+
+    await prewarm(migrated_engine, 3)
+    assert migrated_engine.sync_engine.pool.checkedin() == 3
+
+
+@pytest.mark.asyncio
+async def test_subtree_listing_uses_path_index(migrated_engine):
+    """Test that subtree listings resolve categories through a path range scan."""
+    async with AsyncSession(migrated_engine) as session:
+        session.add(Category(id=1, name="Root", path="/1/"))
+        session.add(Category(id=2, name="Child", parent_id=1, path="/1/2/", depth=1))
+        await session.commit()
+
+    for sort in ["name", "-name", "price", "-price", "created_at", "-created_at"]:
+
+        async def run(session):
+            await crud.product.get_multi(
+                session, category_id=1, include_subcategories=True, sort=sort
+            )
+
+        _, count_plan, list_plan, *_ = await _query_plans(migrated_engine, run)
+        assert "ix_category_path (path>? AND path<?)" in count_plan
+        assert "COVERING INDEX ix_product_category_id_" in count_plan
+        # The page comes in order from the whole-catalog sort index.
+        assert "ix_category_path (path>? AND path<?)" in list_plan
+        assert f"INDEX ix_product_{sort.removeprefix('-')}" in list_plan, sort
+        assert "TEMP B-TREE" not in list_plan, sort
+
+
+@pytest.mark.asyncio
+async def test_search_facets_scan_covering_index(migrated_engine):
+    """Test that search facets aggregate from the covering composite index."""
+    async def run(session):
+        await crud.product.facet_counts(session, search="phone")
+
+    (plan,) = await _query_plans(migrated_engine, run)
+    assert "COVERING INDEX ix_product_category_id_name_id" in plan
+    assert "TEMP B-TREE FOR GROUP BY" not in plan
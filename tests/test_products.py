@@ -550,4 +550,268 @@ async def test_list_products_pagination_edge_cases(
     data = resp.json()
     assert len(data["items"]) == 0
     assert data["page"] == 10
-    assert data["total"] >= 3
\ No newline at end of file
+    assert data["total"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_products_by_category(
+    async_client: AsyncClient, sample_category, sample_category_2
+):
+    """Test deleting every product of a category in one request."""
+    for i in range(3):
+        await async_client.post(
+            "/api/v1/products",
+            json={"name": f"Bulk {i}", "category_id": sample_category["id"]},
+        )
+    await async_client.post(
+        "/api/v1/products",
+        json={"name": "Survivor", "category_id": sample_category_2["id"]},
+    )
+
+    resp = await async_client.delete(f"/api/v1/products?category_id={sample_category['id']}")
+    assert resp.status_code == 200
+    assert resp.json() == {"deleted": 3}
+
+    resp = await async_client.get("/api/v1/products")
+    assert [p["name"] for p in resp.json()["items"]] == ["Survivor"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_products_unknown_category(async_client: AsyncClient):
+    """Test bulk delete against a missing category returns 404."""
+    resp = await async_client.delete("/api/v1/products?category_id=99999")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_products_runs_as_job_when_large(
+    async_client: AsyncClient, sample_category, monkeypatch
+):
+    """Test large bulk deletes return 202 and finish in a chunked background job."""
+    from app.core.config import settings
+    from app.jobs import runner
+
+    monkeypatch.setattr(settings, "BULK_DELETE_SYNC_LIMIT", 2)
+    monkeypatch.setattr(settings, "JOB_CHUNK_SIZE", 2)
+    for i in range(5):
+        await async_client.post(
+            "/api/v1/products",
+            json={"name": f"Bulk {i}", "category_id": sample_category["id"]},
+        )
+
+    resp = await async_client.delete(f"/api/v1/products?category_id={sample_category['id']}")
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["kind"] == "delete_products"
+    assert job["total"] == 5
+    assert resp.headers["location"] == f"/api/v1/jobs/{job['id']}"
+
+    await runner.wait(job["id"])
+    resp = await async_client.get(f"/api/v1/jobs/{job['id']}")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "succeeded"
+    assert resp.json()["progress"] == 5
+    assert resp.json()["result"] == {"deleted": 5}
+
+    resp = await async_client.get(f"/api/v1/products?category_id={sample_category['id']}")
+    assert resp.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_move_products_by_ids(
+    async_client: AsyncClient, sample_category, sample_category_2
+):
+    """Test moving selected products to another category in one call."""
+    ids = []
+    for name in ("Cable A", "Cable B", "Charger"):
+        resp = await async_client.post(
+            "/api/v1/products", json={"name": name, "category_id": sample_category["id"]}
+        )
+        ids.append(resp.json()["id"])
+
+    resp = await async_client.post(
+        "/api/v1/products/move",
+        json={"target_category_id": sample_category_2["id"], "product_ids": ids[:2]},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"moved": 2}
+
+    resp = await async_client.get(f"/api/v1/products?category_id={sample_category_2['id']}")
+    assert sorted(p["name"] for p in resp.json()["items"]) == ["Cable A", "Cable B"]
+    assert all(p["category"]["id"] == sample_category_2["id"] for p in resp.json()["items"])
+
+
+@pytest.mark.asyncio
+async def test_move_products_by_filter(
+    async_client: AsyncClient, sample_category, sample_category_2
+):
+    """Test moving products selected by source category and name search."""
+    for name in ("iPhone 15", "iPhone 14", "Galaxy S24"):
+        await async_client.post(
+            "/api/v1/products", json={"name": name, "category_id": sample_category["id"]}
+        )
+
+    resp = await async_client.post(
+        "/api/v1/products/move",
+        json={
+            "target_category_id": sample_category_2["id"],
+            "source_category_id": sample_category["id"],
+            "search": "iphone",
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"moved": 2}
+
+    resp = await async_client.get(f"/api/v1/products?category_id={sample_category['id']}")
+    assert [p["name"] for p in resp.json()["items"]] == ["Galaxy S24"]
+
+
+@pytest.mark.asyncio
+async def test_move_products_validation(async_client: AsyncClient, sample_category):
+    """Test move requires a selector and an existing target category."""
+    resp = await async_client.post(
+        "/api/v1/products/move", json={"target_category_id": sample_category["id"]}
+    )
+    assert resp.status_code == 422
+
+    resp = await async_client.post(
+        "/api/v1/products/move",
+        json={"target_category_id": 99999, "source_category_id": sample_category["id"]},
+    )
+    assert resp.status_code == 400
+    assert "does not exist" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_list_products_with_facets(
+    async_client: AsyncClient, sample_category, sample_category_2
+):
+    """Test per-category facet counts with and without a search term."""
+    for name, category in (
+        ("iPhone 15", sample_category),
+        ("iPhone 14", sample_category),
+        ("Galaxy S24", sample_category),
+        ("iPhone Case", sample_category_2),
+    ):
+        await async_client.post(
+            "/api/v1/products", json={"name": name, "category_id": category["id"]}
+        )
+
+    resp = await async_client.get(
+        f"/api/v1/products?search=iphone&facets=true&category_id={sample_category_2['id']}"
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 1
+    assert data["facets"] == [
+        {"category_id": sample_category["id"], "name": "Electronics", "count": 2},
+        {"category_id": sample_category_2["id"], "name": "Apparel", "count": 1},
+    ]
+
+    resp = await async_client.get("/api/v1/products?facets=true")
+    assert resp.json()["facets"] == [
+        {"category_id": sample_category["id"], "name": "Electronics", "count": 3},
+        {"category_id": sample_category_2["id"], "name": "Apparel", "count": 1},
+    ]
+
+    resp = await async_client.get("/api/v1/products")
+    assert resp.json()["facets"] is None
+
+
+@pytest.mark.asyncio
+async def test_product_price_sku_and_attributes(async_client: AsyncClient, sample_category):
+    """Test typed attributes round-trip and SKUs are unique."""
+    payload = {
+        "name": "Kettle",
+        "category_id": sample_category["id"],
+        "price": "24.99",
+        "sku": "KT-100",
+        "brand": "Acme",
+        "color": "black",
+        "weight_grams": 1200,
+    }
+    resp = await async_client.post("/api/v1/products", json=payload)
+    assert resp.status_code == 201
+    data = resp.json()
+    assert data["price"] == "24.99"
+    assert {k: data[k] for k in ("sku", "brand", "color", "weight_grams")} == {
+        "sku": "KT-100", "brand": "Acme", "color": "black", "weight_grams": 1200
+    }
+
+    resp = await async_client.post(
+        "/api/v1/products",
+        json={"name": "Kettle 2", "category_id": sample_category["id"], "sku": "KT-100"},
+    )
+    assert resp.status_code == 400
+
+    resp = await async_client.post(
+        "/api/v1/products",
+        json={"name": "Free", "category_id": sample_category["id"], "price": "-1"},
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_list_products_price_filters_and_sort(
+    async_client: AsyncClient, sample_category, sample_category_2
+):
+    """Test min/max price, SKU lookup and price ordering."""
+    for name, price, category in [
+        ("Cheap", "5.00", sample_category),
+        ("Mid", "15.50", sample_category_2),
+        ("Pricey", "99.00", sample_category),
+        ("Unpriced", None, sample_category),
+    ]:
+        await async_client.post(
+            "/api/v1/products",
+            json={"name": name, "category_id": category["id"], "price": price, "sku": name.upper()},
+        )
+
+    resp = await async_client.get("/api/v1/products?min_price=10&sort=price")
+    assert [p["name"] for p in resp.json()["items"]] == ["Mid", "Pricey"]
+
+    resp = await async_client.get("/api/v1/products?max_price=50&sort=-price")
+    assert [p["name"] for p in resp.json()["items"]] == ["Mid", "Cheap"]
+
+    resp = await async_client.get(
+        f"/api/v1/products?category_id={sample_category['id']}&min_price=1&sort=-price"
+    )
+    assert [p["name"] for p in resp.json()["items"]] == ["Pricey", "Cheap"]
+
+    resp = await async_client.get("/api/v1/products?sku=MID")
+    assert [p["name"] for p in resp.json()["items"]] == ["Mid"]
+
+    resp = await async_client.get("/api/v1/products?sort=stock")
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_list_products_sort_options(async_client: AsyncClient, sample_category):
+    """Test whitelisted sorts, id tiebreaks and rejected combinations."""
+    ids = []
+    for name in ("B", "A", "C"):
+        resp = await async_client.post(
+            "/api/v1/products",
+            json={"name": name, "category_id": sample_category["id"], "price": "10.00"},
+        )
+        ids.append(resp.json()["id"])
+
+    async def names(sort: str, **params) -> list[str]:
+        resp = await async_client.get("/api/v1/products", params={"sort": sort, **params})
+        assert resp.status_code == 200
+        return [p["name"] for p in resp.json()["items"]]
+
+    assert await names("-name") == ["C", "B", "A"]
+    assert await names("id") == ["B", "A", "C"]
+    assert await names("-id") == ["C", "A", "B"]
+    assert await names("-created_at") == ["C", "A", "B"]
+    # Equal prices fall back to id, so pages never overlap or skip rows.
+    assert await names("price", page_size=2) + await names("price", page_size=2, page=2) == [
+        "B", "A", "C"
+    ]
+
+    resp = await async_client.get(
+        "/api/v1/products", params={"sort": "id", "category_id": sample_category["id"]}
+    )
+    assert resp.status_code == 400
+    assert "category filter" in resp.json()["detail"]
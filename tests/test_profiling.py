@@ -0,0 +1,115 @@
+# tests/test_profiling.py
+import asyncio
+import time
+
+import pytest
+
+from app.api.middleware import ProfilingMiddleware
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import WAITING, Profiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def _spin(seconds: float) -> None:
+    """On the CPU without releasing the GIL voluntarily."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def _work() -> None:
+    for _ in range(20):
+        _spin(0.005)
+        await asyncio.sleep(0.005)
+
+
+async def test_sampler_records_running_and_waiting_stacks():
+    profiler = Profiler()
+    running = asyncio.create_task(
+        profiler.profile_cpu(seconds=10, max_requests=1, interval=0.001)
+    )
+    await asyncio.sleep(0)
+    work = asyncio.create_task(_work())
+    profiler.cpu.tasks.add(work)
+    await work
+    profiler.cpu.tasks.discard(work)
+    profiler.cpu.request_done()
+    profile = await running
+
+    assert profiler.cpu is None
+    stacks = [line.rsplit(" ", 1)[0].split(";") for line in profile.collapsed().splitlines()]
+    assert all(stack[0].endswith("test_profiling.py:_work") for stack in stacks)
+    assert any(len(stack) == 2 and stack[1].endswith(":_spin") for stack in stacks)
+    assert any(stack[-1] == WAITING for stack in stacks)
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+
+
+async def test_admin_endpoints_need_the_token(async_client, monkeypatch):
+    response = await async_client.get("/api/v1/admin/profile/memory", headers=ADMIN)
+    assert response.status_code == 404
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    response = await async_client.get(
+        "/api/v1/admin/profile/memory", headers={"X-Admin-Token": "guess"}
+    )
+    assert response.status_code == 403
+
+
+async def test_cpu_profile_of_requests_with_header(app_with_overrides, async_client, admin):
+    app_with_overrides.add_middleware(
+        ProfilingMiddleware,
+        profiler=profiling.profiler,
+        prefix="/api/v1",
+        exclude="/api/v1/admin/",
+    )
+    profile = asyncio.create_task(
+        async_client.post(
+            "/api/v1/admin/profile/cpu",
+            params={"requests": 2, "header": "X-Profile", "interval_ms": 1},
+            headers=ADMIN,
+        )
+    )
+    while profiling.profiler.cpu is None:
+        await asyncio.sleep(0.01)
+
+    busy = await async_client.post("/api/v1/admin/profile/cpu", headers=ADMIN)
+    assert busy.status_code == 409
+    await async_client.get("/api/v1/products/")
+    for _ in range(2):
+        await async_client.get("/api/v1/products/", headers={"X-Profile": "1"})
+
+    response = await profile
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["X-Profile-Requests"] == "2"
+    # Counts are in sampling intervals, at least one per sample.
+    counts = [int(line.rsplit(" ", 1)[1]) for line in response.text.splitlines()]
+    assert sum(counts) >= int(response.headers["X-Profile-Samples"]) >= len(counts)
+
+
+async def test_memory_snapshots_show_growth(async_client, admin):
+    assert (await async_client.post("/api/v1/admin/profile/memory", headers=ADMIN)).status_code == 204
+    try:
+        first = (await async_client.get("/api/v1/admin/profile/memory", headers=ADMIN)).json()
+        assert not first["compared_to_previous"]
+
+        held = [bytearray(1_000) for _ in range(2_000)]
+        second = (await async_client.get("/api/v1/admin/profile/memory", headers=ADMIN)).json()
+        assert second["compared_to_previous"]
+        growth = next(
+            stat for stat in second["stats"] if "test_profiling.py" in stat["traceback"][-1]
+        )
+        assert growth["size_diff_bytes"] >= 2_000_000
+        assert growth["count_diff"] >= 2_000
+        del held
+    finally:
+        response = await async_client.delete("/api/v1/admin/profile/memory", headers=ADMIN)
+    assert response.status_code == 204
+    response = await async_client.get("/api/v1/admin/profile/memory", headers=ADMIN)
+    assert response.status_code == 409
@@ -0,0 +1,147 @@
+# tests/test_reports.py
+import csv
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app import crud
+from app.models.stock_movement import StockMovement
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+async def selling(async_client: AsyncClient, db_session):
+    """Three products in two categories, with 28 days of sales history."""
+    tools = (await async_client.post("/api/v1/categories", json={"name": "Tools"})).json()
+    garden = (await async_client.post("/api/v1/categories", json={"name": "Garden"})).json()
+    warehouse = (
+        await async_client.post("/api/v1/warehouses", json={"code": "BER", "name": "Berlin"})
+    ).json()
+    products = {}
+    for sku, category, lead_time in [
+        ("HAM-1", tools, None),
+        ("SAW-1", tools, 3),
+        ("RAK-1", garden, None),
+    ]:
+        resp = await async_client.post(
+            "/api/v1/products",
+            json={
+                "name": f"Product {sku}",
+                "category_id": category["id"],
+                "sku": sku,
+                "lead_time_days": lead_time,
+            },
+        )
+        products[sku] = resp.json()
+
+    await async_client.put(
+        f"/api/v1/warehouses/{warehouse['id']}/stock",
+        json={"levels": [{"sku": "HAM-1", "quantity": 20}, {"sku": "SAW-1", "quantity": 100}]},
+    )
+    # 56 hammers and 28 saws sold in the window; one sale before it.
+    sales = [("HAM-1", datetime(2026, 3, 2), -56), ("SAW-1", datetime(2026, 3, 20), -28)]
+    sales.append(("SAW-1", datetime(2026, 2, 1), -1000))
+    db_session.add_all(
+        StockMovement(
+            product_id=products[sku]["id"],
+            warehouse_id=warehouse["id"],
+            delta=delta,
+            reason="sale",
+            created_at=at,
+        )
+        for sku, at, delta in sales
+    )
+    await db_session.commit()
+    selling = await crud.stock.refresh_sales_velocity(
+        db_session, until=date(2026, 3, 29), window_days=28
+    )
+    assert selling == 2
+    return products, tools, garden
+
+
+@pytest.mark.asyncio
+async def test_replenishment_by_product(async_client: AsyncClient, selling):
+    products, tools, garden = selling
+    resp = await async_client.get("/api/v1/reports/replenishment")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = {row["sku"]: row for row in csv.DictReader(io.StringIO(resp.text))}
+    assert set(rows) == {"HAM-1", "SAW-1", "RAK-1"}
+
+    # 2 a day against 20 in stock: below the 14-day default lead time, so
+    # order up to 14 + 30 days of sales.
+    assert rows["HAM-1"] == {
+        "product_id": str(products["HAM-1"]["id"]),
+        "sku": "HAM-1",
+        "category_id": str(tools["id"]),
+        "available_quantity": "20",
+        "sales_velocity": "2.0",
+        "lead_time_days": "14",
+        "days_of_cover": "10.0",
+        "reorder_point": "28.0",
+        "reorder_quantity": "68",
+    }
+    # 100 days of cover: nothing to order.
+    assert rows["SAW-1"]["days_of_cover"] == "100.0"
+    assert rows["SAW-1"]["lead_time_days"] == "3"
+    assert rows["SAW-1"]["reorder_quantity"] == "0"
+    # Nothing sold, nothing in stock: infinite cover, nothing to order.
+    assert rows["RAK-1"]["days_of_cover"] == ""
+    assert rows["RAK-1"]["reorder_quantity"] == "0"
+
+    resp = await async_client.get(
+        "/api/v1/reports/replenishment", params={"format": "ndjson", "only_reorder": True}
+    )
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [(line["sku"], line["reorder_quantity"]) for line in lines] == [("HAM-1", 68)]
+
+
+@pytest.mark.asyncio
+async def test_replenishment_by_category(async_client: AsyncClient, selling):
+    _, tools, garden = selling
+    resp = await async_client.get(
+        "/api/v1/reports/replenishment", params={"level": "category", "format": "ndjson"}
+    )
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines == [
+        {
+            "category_id": tools["id"],
+            "products": 2,
+            "products_to_reorder": 1,
+            "available_quantity": 120,
+            "sales_velocity": 3.0,
+            "days_of_cover": 40.0,
+            "reorder_quantity": 68,
+        },
+        {
+            "category_id": garden["id"],
+            "products": 1,
+            "products_to_reorder": 0,
+            "available_quantity": 0,
+            "sales_velocity": 0.0,
+            "days_of_cover": None,
+            "reorder_quantity": 0,
+        },
+    ]
+
+    resp = await async_client.get(
+        "/api/v1/reports/replenishment", params={"level": "category", "only_reorder": True}
+    )
+    assert resp.text.splitlines()[1:] == [f"{tools['id']},2,1,120,3.0,40.0,68"]
+
+
+@pytest.mark.asyncio
+async def test_sales_velocity_window(db_session, selling):
+    products, _, _ = selling
+    # Move the window past every sale: velocities drop back to zero.
+    assert await crud.stock.refresh_sales_velocity(
+        db_session, until=date(2026, 6, 1), window_days=28
+    ) == 0
+    product = await crud.product.get(db_session, product_id=products["HAM-1"]["id"])
+    await db_session.refresh(product)
+    assert product.sales_velocity == 0.0
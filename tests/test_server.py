@@ -0,0 +1,45 @@
+# tests/test_server.py
+import pytest
+
+from app import server
+from app.core.config import Settings
+
+
+def test_workers_default_to_usable_cpus():
+    assert server.worker_count(0) == server.usable_cpus() >= 1
+    assert server.worker_count(3) == 3
+
+
+def test_fast_implementations_are_used_only_when_installed(monkeypatch):
+    monkeypatch.setattr(server, "_installed", lambda module: False)
+    assert server.resolve("auto", fast="uvloop", fallback="asyncio") == "asyncio"
+    assert server.resolve("asyncio", fast="uvloop", fallback="asyncio") == "asyncio"
+    with pytest.raises(ValueError, match="uvloop is not installed"):
+        server.resolve("uvloop", fast="uvloop", fallback="asyncio")
+
+    monkeypatch.setattr(server, "_installed", lambda module: True)
+    assert server.resolve("auto", fast="httptools", fallback="h11") == "httptools"
+
+
+def test_config_from_settings():
+    settings = Settings(
+        SERVER_WORKERS=2,
+        SERVER_BACKLOG=512,
+        SERVER_KEEPALIVE_SECONDS=75,
+        SERVER_GRACEFUL_SHUTDOWN_SECONDS=10,
+        SERVER_MAX_REQUESTS=1_000,
+        SERVER_MAX_REQUESTS_JITTER=100,
+    )
+    config = server.build_config(settings, port=9000)
+    assert (config.app, config.host, config.port, config.workers) == (
+        "app.main:app", "127.0.0.1", 9000, 2
+    )
+    assert (config.backlog, config.timeout_keep_alive, config.timeout_graceful_shutdown) == (
+        512, 75, 10
+    )
+    assert (config.limit_max_requests, config.limit_max_requests_jitter) == (1_000, 100)
+    assert not config.access_log
+
+    # No recycling at all, not recycling after 0 requests.
+    config = server.build_config(Settings(SERVER_MAX_REQUESTS=0), workers=1)
+    assert (config.workers, config.limit_max_requests) == (1, None)
@@ -0,0 +1,430 @@
+# tests/test_sharding.py
+import random
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import OperationalError
+
+from app import crud
+from app.api import deps
+from app.db.shards import ProductShards
+from app.models.archive import ProductArchive
+from app.models.product import Product
+from app.models.shard import ProductRegistry, ShardSequence, ShardWrite
+from app.schemas.product import ProductCreate
+from app.search import suggestions
+
+SHARDS = 3
+
+
+@pytest.fixture
+async def shards(tmp_path, app_with_overrides: FastAPI):
+    shards = ProductShards(
+        [f"sqlite+aiosqlite:///{tmp_path / f'products-{i}.db'}" for i in range(SHARDS)],
+        lambda url: {},
+    )
+    await shards.upgrade()
+    app_with_overrides.dependency_overrides[deps.get_product_shards] = lambda: shards
+    yield shards
+    await shards.dispose()
+
+
+async def _shard_ids(shards: ProductShards) -> list[list[int]]:
+    ids = []
+    for index in range(SHARDS):
+        async with shards.open(index) as shard:
+            result = await shard.session.execute(select(Product.id).order_by(Product.id))
+            ids.append(result.scalars().all())
+    return ids
+
+
+@pytest.fixture
+async def catalog(async_client: AsyncClient, shards):
+    """Categories Tools > Saws and Garden, 30 products spread over the shards."""
+    tools = (await async_client.post("/api/v1/categories", json={"name": "Tools"})).json()
+    saws = (
+        await async_client.post(
+            "/api/v1/categories", json={"name": "Saws", "parent_id": tools["id"]}
+        )
+    ).json()
+    garden = (await async_client.post("/api/v1/categories", json={"name": "Garden"})).json()
+    rng = random.Random(0)
+    products = []
+    for i in range(30):
+        category = (tools, saws, garden)[i % 3]
+        resp = await async_client.post(
+            "/api/v1/products",
+            json={
+                "name": f"{rng.choice(['Axe', 'Rake', 'Saw', 'Hoe'])} {rng.randint(1, 99)} #{i}",
+                "category_id": category["id"],
+                "price": rng.choice([None, rng.randint(1, 50)]),
+            },
+        )
+        assert resp.status_code == 201, resp.text
+        products.append(resp.json())
+    return products, tools, saws, garden
+
+
+@pytest.mark.asyncio
+async def test_products_are_placed_and_routed_by_shard(
+    async_client: AsyncClient, db_session, shards, catalog
+):
+    products, tools, saws, garden = catalog
+    placed = await _shard_ids(shards)
+    assert sum(len(ids) for ids in placed) == len(products)
+    for product in products:
+        shard = shards.for_category(product["category_id"])
+        assert product["id"] in placed[shard]
+        assert shards.for_product(product["id"]) == shard
+    # Nothing lands in the main database.
+    assert (await db_session.execute(select(func.count()).select_from(Product))).scalar_one() == 0
+
+    product = products[0]
+    resp = await async_client.get(f"/api/v1/products/{product['id']}")
+    assert resp.json()["category"]["name"] == "Tools"
+
+    # Moving to another category keeps the product in its shard.
+    resp = await async_client.put(
+        f"/api/v1/products/{product['id']}", json={"name": "Renamed", "category_id": garden["id"]}
+    )
+    assert resp.status_code == 200
+    assert (resp.json()["name"], resp.json()["category"]["name"]) == ("Renamed", "Garden")
+    resp = await async_client.get(f"/api/v1/categories/{garden['id']}")
+    assert resp.json()["product_count"] == 11
+
+    assert (await async_client.delete(f"/api/v1/products/{product['id']}")).status_code == 204
+    assert (await async_client.get(f"/api/v1/products/{product['id']}")).status_code == 404
+    assert product["id"] not in (await _shard_ids(shards))[shards.for_product(product["id"])]
+
+    # Every write still lands in the change log.
+    resp = await async_client.get("/api/v1/changes", params={"limit": 1000})
+    ops = [
+        change["op"]
+        for change in resp.json()["changes"]
+        if (change["entity"], change["entity_id"]) == ("product", product["id"])
+    ]
+    assert ops == ["create", "update", "delete"]
+
+
+async def _all_pages(async_client: AsyncClient, page_size: int, **params) -> tuple[list, int]:
+    items, page = [], 1
+    while True:
+        resp = await async_client.get(
+            "/api/v1/products", params={"page": page, "page_size": page_size, **params}
+        )
+        assert resp.status_code == 200, resp.text
+        data = resp.json()
+        items += data["items"]
+        if page >= data["total_pages"]:
+            return items, data["total"]
+        page += 1
+
+
+def _price(item: dict) -> float | None:
+    return None if item["price"] is None else float(item["price"])
+
+
+@pytest.mark.asyncio
+async def test_listings_merge_shards_in_order(async_client: AsyncClient, catalog):
+    products, tools, saws, garden = catalog
+
+    items, total = await _all_pages(async_client, 7)
+    assert total == len(products)
+    assert [item["id"] for item in items] == [
+        p["id"] for p in sorted(products, key=lambda p: (p["name"], p["id"]))
+    ]
+    assert all(item["category"]["id"] == item["category_id"] for item in items)
+
+    # Descending price: NULL prices last, as SQLite orders them.
+    items, _ = await _all_pages(async_client, 4, sort="-price")
+    priced = sorted(
+        (p for p in products if p["price"] is not None),
+        key=lambda p: (float(p["price"]), p["id"]),
+        reverse=True,
+    )
+    unpriced = sorted((p for p in products if p["price"] is None), key=lambda p: p["id"], reverse=True)
+    assert [item["id"] for item in items] == [p["id"] for p in priced + unpriced]
+
+    # A subtree spans shards; sparse fieldsets skip the category lookup.
+    items, total = await _all_pages(
+        async_client,
+        5,
+        category_id=tools["id"],
+        include_subcategories=True,
+        fields="id,name",
+    )
+    expected = sorted(
+        (p for p in products if p["category_id"] in (tools["id"], saws["id"])),
+        key=lambda p: (p["name"], p["id"]),
+    )
+    assert total == 20
+    assert items == [{"id": p["id"], "name": p["name"]} for p in expected]
+
+
+@pytest.mark.asyncio
+async def test_names_and_skus_are_unique_across_shards(
+    async_client: AsyncClient, db_session, shards, catalog
+):
+    products, tools, saws, garden = catalog
+    assert len({shards.for_category(c["id"]) for c in (tools, saws, garden)}) == SHARDS
+    resp = await async_client.post(
+        "/api/v1/products", json={"name": "Mitre Saw", "sku": "MS-1", "category_id": tools["id"]}
+    )
+    assert resp.status_code == 201
+    mitre = resp.json()
+
+    for product_in in (
+        {"name": "Mitre Saw", "category_id": garden["id"]},
+        {"name": "Mitre Saw 2", "sku": "MS-1", "category_id": saws["id"]},
+    ):
+        resp = await async_client.post("/api/v1/products", json=product_in)
+        assert resp.status_code == 400, product_in
+    garden_product = next(p for p in products if p["category_id"] == garden["id"])
+    resp = await async_client.put(
+        f"/api/v1/products/{garden_product['id']}", json={"name": "Mitre Saw"}
+    )
+    assert resp.status_code == 400
+    resp = await async_client.put(f"/api/v1/products/{garden_product['id']}", json={"sku": "MS-1"})
+    assert resp.status_code == 400
+
+    # Refused writes reached neither the shards nor the counts.
+    assert sum(len(ids) for ids in await _shard_ids(shards)) == len(products) + 1
+    resp = await async_client.get(f"/api/v1/categories/{garden['id']}")
+    assert resp.json()["product_count"] == 10
+    resp = await async_client.get(f"/api/v1/products/{garden_product['id']}")
+    assert resp.json()["name"] == garden_product["name"]
+
+    # A deleted product's name and SKU are free again.
+    await async_client.delete(f"/api/v1/products/{mitre['id']}")
+    resp = await async_client.post(
+        "/api/v1/products", json={"name": "Mitre Saw", "sku": "MS-1", "category_id": garden["id"]}
+    )
+    assert resp.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_writes_reach_an_unreachable_shard_later(
+    db_session, session_factory, shards, catalog, monkeypatch
+):
+    products, tools, saws, garden = catalog
+    index = shards.for_category(garden["id"])
+
+    async def unreachable(db, shard):
+        raise OperationalError("INSERT", {}, Exception("unable to open database file"))
+
+    monkeypatch.setattr(crud.shard, "apply", unreachable)
+    async with shards.open(index) as shard:
+        with pytest.raises(OperationalError):
+            await crud.product.create(
+                db_session, ProductCreate(name="Pruner", category_id=garden["id"]), shard=shard
+            )
+    monkeypatch.undo()
+
+    # The main database committed the product before the shard was tried.
+    registered = (
+        await db_session.execute(select(ProductRegistry).where(ProductRegistry.name == "Pruner"))
+    ).scalar_one()
+    category = await crud.category.get(db_session, category_id=garden["id"])
+    assert category.product_count == 11
+    assert registered.id not in (await _shard_ids(shards))[index]
+
+    # The next write to the shard applies it first, and each write only once.
+    async with shards.open(index) as shard:
+        await crud.product.create(
+            db_session, ProductCreate(name="Shears", category_id=garden["id"]), shard=shard
+        )
+    assert registered.id in (await _shard_ids(shards))[index]
+    await crud.shard.replay(session_factory, shards)
+    assert sum(len(ids) for ids in await _shard_ids(shards)) == len(products) + 2
+
+    # Applied writes are pruned as new ones are queued.
+    async with shards.open(index) as shard:
+        await crud.product.create(
+            db_session, ProductCreate(name="Trowel", category_id=garden["id"]), shard=shard
+        )
+    queued = await db_session.execute(
+        select(func.count()).select_from(ShardWrite).where(ShardWrite.shard == index)
+    )
+    assert queued.scalar_one() == 1
+
+
+@pytest.mark.asyncio
+async def test_products_from_before_the_registry_are_adopted(
+    async_client: AsyncClient, db_session, shards, catalog
+):
+    products, tools, saws, garden = catalog
+    await db_session.execute(delete(ProductRegistry))
+    await db_session.execute(delete(ShardSequence))
+    await db_session.commit()
+
+    resp = await async_client.post(
+        "/api/v1/products", json={"name": products[0]["name"], "category_id": garden["id"]}
+    )
+    assert resp.status_code == 400
+    resp = await async_client.post(
+        "/api/v1/products", json={"name": "Wheelbarrow", "category_id": garden["id"]}
+    )
+    assert resp.status_code == 201
+    assert resp.json()["id"] > max(p["id"] for p in products if p["category_id"] == garden["id"])
+    registered = await db_session.execute(select(func.count()).select_from(ProductRegistry))
+    assert registered.scalar_one() == len(products) + 1
+
+
+@pytest.mark.asyncio
+async def test_single_database_features_are_refused(async_client: AsyncClient, catalog):
+    products, tools, _, garden = catalog
+    for method, url, params in [
+        ("GET", f"/api/v1/products/{products[0]['id']}/stock", {}),
+        ("GET", "/api/v1/reports/replenishment", {}),
+        ("GET", "/api/v1/warehouses", {}),
+    ]:
+        resp = await async_client.request(method, url, params=params)
+        assert resp.status_code == 501, (method, url)
+
+
+async def _archived_ids(shards: ProductShards) -> list[int]:
+    ids = []
+    for index in range(SHARDS):
+        async with shards.open(index) as shard:
+            result = await shard.session.execute(select(ProductArchive.id))
+            ids += result.scalars().all()
+    return sorted(ids)
+
+
+@pytest.mark.asyncio
+async def test_category_delete_restore_and_purge_fan_out(
+    async_client: AsyncClient, db_session, shards, catalog
+):
+    products, tools, saws, garden = catalog
+    in_garden = sorted(p["id"] for p in products if p["category_id"] == garden["id"])
+
+    assert (await async_client.delete(f"/api/v1/categories/{garden['id']}")).status_code == 204
+    live = [id_ for ids in await _shard_ids(shards) for id_ in ids]
+    assert not set(in_garden) & set(live) and len(live) == 20
+    assert await _archived_ids(shards) == in_garden
+    resp = await async_client.get("/api/v1/products/archive", params={"page_size": 100})
+    assert resp.json()["total"] == 10
+    assert sorted(p["id"] for p in resp.json()["items"]) == in_garden
+    _, total = await _all_pages(async_client, 100)
+    assert total == 20
+
+    resp = await async_client.post("/api/v1/categories/archive/restore", json={"ids": [garden["id"]]})
+    assert resp.status_code == 200, resp.text
+    assert sorted(id_ for ids in await _shard_ids(shards) for id_ in ids) == sorted(
+        p["id"] for p in products
+    )
+    resp = await async_client.get(f"/api/v1/categories/{garden['id']}")
+    assert resp.json()["product_count"] == 10
+
+    await async_client.delete(f"/api/v1/categories/{garden['id']}")
+    resp = await async_client.post("/api/v1/categories/archive/purge", json={"ids": [garden["id"]]})
+    assert resp.json()["products_purged"] == 10
+    assert await _archived_ids(shards) == []
+    registered = await db_session.execute(select(func.count()).select_from(ProductRegistry))
+    assert registered.scalar_one() == 20
+
+    # Every product write reached the change log.
+    resp = await async_client.get("/api/v1/changes", params={"limit": 1000})
+    ops = [
+        change["op"]
+        for change in resp.json()["changes"]
+        if (change["entity"], change["entity_id"]) == ("product", in_garden[0])
+    ]
+    assert ops == ["create", "delete", "create", "delete"]
+
+
+@pytest.mark.asyncio
+async def test_merges_and_moves_fan_out(async_client: AsyncClient, shards, catalog):
+    products, tools, saws, garden = catalog
+
+    resp = await async_client.post(
+        f"/api/v1/categories/{saws['id']}/merge", json={"target_category_id": garden["id"]}
+    )
+    assert resp.json()["moved"] == 10
+    assert resp.json()["category"]["product_count"] == 20
+    _, total = await _all_pages(async_client, 100, category_id=garden["id"])
+    assert total == 20
+
+    axes = sorted(p["id"] for p in products if p["name"].startswith("Axe"))
+    resp = await async_client.post(
+        "/api/v1/products/move", json={"search": "axe", "target_category_id": tools["id"]}
+    )
+    moved = len([p for p in products if p["id"] in axes and p["category_id"] != tools["id"]])
+    assert resp.json()["moved"] == moved
+    items, _ = await _all_pages(async_client, 100, category_id=tools["id"])
+    assert set(axes) <= {p["id"] for p in items}
+    resp = await async_client.get(f"/api/v1/categories/{tools['id']}")
+    assert resp.json()["product_count"] == len(items)
+
+
+@pytest.mark.asyncio
+async def test_bulk_deletes_and_product_archive_fan_out(async_client: AsyncClient, shards, catalog):
+    products, tools, saws, garden = catalog
+    in_tools = sorted(p["id"] for p in products if p["category_id"] == tools["id"])
+
+    resp = await async_client.delete("/api/v1/products", params={"category_id": tools["id"]})
+    assert resp.json() == {"deleted": 10}
+    assert await _archived_ids(shards) == in_tools
+
+    resp = await async_client.post(
+        "/api/v1/products/archive/restore", json={"ids": in_tools[:2] + [10_000]}
+    )
+    assert resp.json()["restored"] == in_tools[:2]
+    resp = await async_client.get(f"/api/v1/products/{in_tools[0]}")
+    assert resp.status_code == 200 and resp.json()["available_quantity"] == 0
+    resp = await async_client.get(f"/api/v1/categories/{tools['id']}")
+    assert resp.json()["product_count"] == 2
+
+    # A live product took the name of an archived one.
+    archived = next(p for p in products if p["id"] == in_tools[2])
+    await async_client.put(f"/api/v1/products/{in_tools[0]}", json={"name": archived["name"]})
+    resp = await async_client.post("/api/v1/products/archive/restore", json={"ids": [archived["id"]]})
+    assert resp.status_code == 409
+
+    resp = await async_client.post("/api/v1/products/archive/purge", json={"ids": in_tools[2:]})
+    assert resp.json()["purged"] == 8
+    assert await _archived_ids(shards) == []
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_and_facets_read_every_shard(async_client: AsyncClient, catalog):
+    products, tools, saws, garden = catalog
+    saw_products = [p for p in products if p["name"].startswith("Saw")]
+
+    items, total = await _all_pages(async_client, 4, search="saw", fuzzy=True)
+    assert total == len(saw_products)
+    assert sorted(p["id"] for p in items) == sorted(p["id"] for p in saw_products)
+    assert all(p["category"] is not None for p in items)
+
+    resp = await async_client.get("/api/v1/products", params={"search": "saw", "facets": True})
+    counts = {facet["category_id"]: facet["count"] for facet in resp.json()["facets"]}
+    assert counts == dict(Counter(p["category_id"] for p in saw_products))
+
+
+@pytest.mark.asyncio
+async def test_suggestions_read_product_names_from_shards(
+    async_client: AsyncClient, db_session, shards, catalog
+):
+    products, tools, saws, garden = catalog
+    suggestions.shards = shards
+    try:
+        await suggestions.rebuild(db_session)
+        assert len(suggestions.index) == len(products) + 3
+
+        renamed, deleted = products[0], products[1]
+        await async_client.put(f"/api/v1/products/{renamed['id']}", json={"name": "Zither"})
+        await async_client.delete(f"/api/v1/products/{deleted['id']}")
+        await suggestions.catch_up(db_session)
+
+        resp = await async_client.get("/api/v1/products/suggest", params={"q": "zit"})
+        assert resp.json() == [{"kind": "product", "id": renamed["id"], "name": "Zither"}]
+        names = {s.name for s in suggestions.search(deleted["name"], 50)}
+        assert deleted["name"] not in names
+        assert len(suggestions.index) == len(products) + 2
+    finally:
+        suggestions.shards = None
+        suggestions.index.load([])
+        suggestions.cursor = 0
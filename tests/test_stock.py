@@ -0,0 +1,263 @@
+# tests/test_stock.py
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app import crud
+from app.db.base import utcnow
+from app.models.stock_movement import StockDailySnapshot, StockMovement
+from app.models.warehouse import StockLevel
+from app.schemas.warehouse import StockMovementCreate
+
+
+@pytest.fixture
+async def stocked(async_client: AsyncClient):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Tools"})).json()
+    products = {}
+    for sku in ["HAM-1", "SAW-1", "DRL-1"]:
+        resp = await async_client.post(
+            "/api/v1/products",
+            json={"name": f"Product {sku}", "category_id": category["id"], "sku": sku},
+        )
+        products[sku] = resp.json()
+    warehouses = []
+    for code in ["BER", "MUC"]:
+        resp = await async_client.post(
+            "/api/v1/warehouses", json={"code": code, "name": f"Warehouse {code}"}
+        )
+        assert resp.status_code == 201
+        warehouses.append(resp.json())
+    return products, warehouses
+
+
+async def _snapshot(async_client: AsyncClient, warehouse: dict, levels: dict[str, int]):
+    resp = await async_client.put(
+        f"/api/v1/warehouses/{warehouse['id']}/stock",
+        json={"levels": [{"sku": sku, "quantity": qty} for sku, qty in levels.items()]},
+    )
+    assert resp.status_code == 200
+    return resp.json()
+
+
+async def _available(async_client: AsyncClient, product: dict) -> int:
+    resp = await async_client.get(f"/api/v1/products/{product['id']}")
+    return resp.json()["available_quantity"]
+
+
+@pytest.mark.asyncio
+async def test_snapshots_roll_up_into_availability(async_client: AsyncClient, stocked):
+    products, (ber, muc) = stocked
+    assert await _available(async_client, products["HAM-1"]) == 0
+
+    result = await _snapshot(async_client, ber, {"HAM-1": 5, "SAW-1": 2, "NOPE-9": 1})
+    assert result == {"changed": 2, "unchanged": 0, "unknown_skus": ["NOPE-9"]}
+    await _snapshot(async_client, muc, {"HAM-1": 3})
+    assert await _available(async_client, products["HAM-1"]) == 8
+    assert await _available(async_client, products["SAW-1"]) == 2
+
+    resp = await async_client.get(f"/api/v1/products/{products['HAM-1']['id']}/stock")
+    assert [(level["warehouse_id"], level["quantity"]) for level in resp.json()] == [
+        (ber["id"], 5),
+        (muc["id"], 3),
+    ]
+
+    # A full snapshot: SAW-1 is left out, so Berlin no longer has any.
+    result = await _snapshot(async_client, ber, {"HAM-1": 5, "DRL-1": 0})
+    assert result == {"changed": 1, "unchanged": 2, "unknown_skus": []}
+    assert await _available(async_client, products["SAW-1"]) == 0
+    assert await _available(async_client, products["HAM-1"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_list_products_in_stock_filter(async_client: AsyncClient, stocked):
+    products, (ber, _) = stocked
+    await _snapshot(async_client, ber, {"HAM-1": 1, "DRL-1": 4})
+
+    resp = await async_client.get("/api/v1/products", params={"in_stock": True})
+    assert [item["sku"] for item in resp.json()["items"]] == ["DRL-1", "HAM-1"]
+    resp = await async_client.get("/api/v1/products", params={"in_stock": False})
+    assert [item["sku"] for item in resp.json()["items"]] == ["SAW-1"]
+
+
+@pytest.mark.asyncio
+async def test_stock_validation_and_cleanup(async_client: AsyncClient, db_session, stocked):
+    products, (ber, _) = stocked
+    resp = await async_client.put("/api/v1/warehouses/999/stock", json={"levels": []})
+    assert resp.status_code == 404
+    resp = await async_client.put(
+        f"/api/v1/warehouses/{ber['id']}/stock", json={"levels": [{"sku": "HAM-1", "quantity": -1}]}
+    )
+    assert resp.status_code == 422
+    resp = await async_client.post("/api/v1/warehouses", json={"code": "BER", "name": "Again"})
+    assert resp.status_code == 400
+    assert (await async_client.get("/api/v1/products/999/stock")).status_code == 404
+
+    await _snapshot(async_client, ber, {"HAM-1": 1, "SAW-1": 1})
+    await async_client.delete(f"/api/v1/products/{products['HAM-1']['id']}")
+    rows = (await db_session.execute(select(StockLevel.product_id))).scalars().all()
+    assert rows == [products["SAW-1"]["id"]]
+
+
+@pytest.mark.asyncio
+async def test_movements_update_levels_in_one_transaction(
+    async_client: AsyncClient, db_session, stocked
+):
+    products, (ber, muc) = stocked
+    ham = products["HAM-1"]["id"]
+    resp = await async_client.post(
+        "/api/v1/stock/movements",
+        json={
+            "movements": [
+                {"product_id": ham, "warehouse_id": ber["id"], "delta": 10, "reason": "receipt"},
+                {"product_id": ham, "warehouse_id": muc["id"], "delta": 4, "reason": "receipt"},
+                {
+                    "product_id": ham,
+                    "warehouse_id": ber["id"],
+                    "delta": -3,
+                    "reason": "sale",
+                    "reference": "order-1",
+                },
+            ]
+        },
+    )
+    assert resp.status_code == 201
+    assert resp.json() == {"recorded": 3}
+    assert await _available(async_client, products["HAM-1"]) == 11
+
+    # Overselling fails the whole batch, receipt included.
+    resp = await async_client.post(
+        "/api/v1/stock/movements",
+        json={
+            "movements": [
+                {"product_id": ham, "warehouse_id": muc["id"], "delta": 1, "reason": "receipt"},
+                {"product_id": ham, "warehouse_id": muc["id"], "delta": -9, "reason": "sale"},
+            ]
+        },
+    )
+    assert resp.status_code == 400
+    assert await _available(async_client, products["HAM-1"]) == 11
+
+    resp = await async_client.post(
+        "/api/v1/stock/movements",
+        json={
+            "movements": [
+                {"product_id": 999, "warehouse_id": ber["id"], "delta": 1, "reason": "receipt"}
+            ]
+        },
+    )
+    assert resp.status_code == 400
+    resp = await async_client.post(
+        "/api/v1/stock/movements",
+        json={
+            "movements": [
+                {"product_id": ham, "warehouse_id": ber["id"], "delta": 1, "reason": "sale"}
+            ]
+        },
+    )
+    assert resp.status_code == 422
+
+    # Snapshots are journalled too: Berlin goes from 7 to 2.
+    await _snapshot(async_client, ber, {"HAM-1": 2})
+    resp = await async_client.get("/api/v1/stock/movements", params={"product_id": ham})
+    movements = resp.json()
+    assert [(m["reason"], m["delta"]) for m in movements] == [
+        ("receipt", 10),
+        ("receipt", 4),
+        ("sale", -3),
+        ("snapshot", -5),
+    ]
+    assert movements[2]["reference"] == "order-1"
+    assert sum(m["delta"] for m in movements) == await _available(async_client, products["HAM-1"])
+
+
+@pytest.mark.asyncio
+async def test_compaction_and_stock_as_of(async_client: AsyncClient, db_session, stocked):
+    products, (ber, _) = stocked
+    ham = products["HAM-1"]["id"]
+    day = date(2026, 3, 1)
+    history = [
+        (datetime(2026, 3, 1, 9), 10),
+        (datetime(2026, 3, 1, 17), -4),
+        (datetime(2026, 3, 3, 12), 5),
+        (datetime(2026, 3, 4, 8), -2),
+    ]
+    db_session.add_all(
+        StockMovement(
+            product_id=ham, warehouse_id=ber["id"], delta=delta, reason="adjustment", created_at=at
+        )
+        for at, delta in history
+    )
+    await db_session.commit()
+
+    # Only days before the 4th are compacted; the 2nd had no movements.
+    assert await crud.stock.compact(db_session, until=date(2026, 3, 4)) == 3
+    snapshots = (
+        await db_session.execute(
+            select(StockDailySnapshot.day, StockDailySnapshot.quantity).order_by(
+                StockDailySnapshot.day
+            )
+        )
+    ).all()
+    assert snapshots == [(day, 6), (date(2026, 3, 3), 11)]
+    assert await crud.stock.compact(db_session, until=date(2026, 3, 4)) == 0
+
+    for at in [
+        datetime(2026, 2, 28),
+        datetime(2026, 3, 1, 12),
+        datetime(2026, 3, 2, 12),
+        datetime(2026, 3, 3, 12),
+        datetime(2026, 3, 4, 9),
+    ]:
+        expected = sum(delta for when, delta in history if when <= at)
+        resp = await async_client.get(
+            "/api/v1/stock/as-of", params={"product_id": ham, "at": at.isoformat()}
+        )
+        assert resp.json()["quantity"] == expected, at
+
+    resp = await async_client.get(
+        "/api/v1/stock/movements",
+        params={"since": "2026-03-01T12:00:00", "until": "2026-03-04T00:00:00+00:00"},
+    )
+    assert [m["delta"] for m in resp.json()] == [-4, 5]
+
+
+@pytest.mark.asyncio
+async def test_compaction_leaves_unsettled_days(db_session, stocked):
+    products, (ber, _) = stocked
+    ham = products["HAM-1"]["id"]
+    today = utcnow().date()
+    # Stamped before midnight, committed after a run on the following day.
+    late = datetime.combine(today - timedelta(days=1), time(23, 59, 59))
+    db_session.add_all(
+        StockMovement(
+            product_id=ham, warehouse_id=ber["id"], delta=delta, reason="adjustment", created_at=at
+        )
+        for at, delta in [(late - timedelta(days=1), 3), (late, 2)]
+    )
+    await db_session.commit()
+
+    assert await crud.stock.compact(db_session, until=today + timedelta(days=1)) == 1
+    snapshots = (
+        await db_session.execute(select(StockDailySnapshot.day, StockDailySnapshot.quantity))
+    ).all()
+    assert snapshots == [(today - timedelta(days=2), 3)]
+    assert await crud.stock.quantity_as_of(db_session, product_id=ham, at=late) == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_levels_add_up(db_session, stocked):
+    products, (ber, _) = stocked
+    ham = products["HAM-1"]["id"]
+    receipt = StockMovementCreate(product_id=ham, warehouse_id=ber["id"], delta=3, reason="receipt")
+    await crud.stock.record_movements(db_session, [receipt])
+
+    # A second writer that read the level before the first one created it.
+    await crud.stock._write_levels(db_session, {(ham, ber["id"]): (0, 5)})
+    await db_session.commit()
+    level = (
+        await db_session.execute(select(StockLevel.quantity).where(StockLevel.product_id == ham))
+    ).scalar_one()
+    assert level == 8
+    assert (await crud.product.get(db_session, ham)).available_quantity == 8
@@ -0,0 +1,160 @@
+# tests/test_suggest.py
+import asyncio
+import subprocess
+import sys
+
+import pytest
+from httpx import AsyncClient
+
+from app.search import suggestions
+from app.search import suggest
+from app.search.suggest import PrefixIndex, Suggestion, SuggestionService
+
+
+def test_prefix_index_lookup_order_and_limit():
+    index = PrefixIndex(max_names=100)
+    index.load(
+        [
+            ("product", 1, "Pixel 8"),
+            ("product", 2, "pixel"),
+            ("category", 3, "Pixel Phones"),
+            ("product", 4, "Galaxy"),
+        ]
+    )
+    assert index.search("PIX", 10) == [
+        Suggestion("product", 2, "pixel"),
+        Suggestion("product", 1, "Pixel 8"),
+        Suggestion("category", 3, "Pixel Phones"),
+    ]
+    assert len(index.search("pix", 2)) == 2
+    assert index.search("z", 10) == []
+    assert index.search("  ", 10) == []
+
+
+def test_prefix_index_incremental_updates():
+    index = PrefixIndex(max_names=2)
+    index.put("product", 1, "Kettle")
+    index.put("product", 1, "Teapot")
+    assert index.search("ket", 10) == []
+    assert index.search("tea", 10) == [Suggestion("product", 1, "Teapot")]
+
+    index.put("category", 1, "Tea")
+    assert [s.kind for s in index.search("tea", 10)] == ["category", "product"]
+    # Full: new names are skipped, renames still apply.
+    index.put("product", 2, "Teacup")
+    assert len(index) == 2
+    index.put("category", 1, "Kitchen")
+    assert index.search("kit", 10) == [Suggestion("category", 1, "Kitchen")]
+
+    index.discard("product", 1)
+    index.discard("product", 99)
+    assert index.search("tea", 10) == []
+    assert len(index) == 1
+
+
+def test_prefix_index_compaction_keeps_contents():
+    index = PrefixIndex(max_names=100)
+    index.load([("product", i, f"Item {i}") for i in range(1, 6)] + [("category", 1, "items")])
+    index.put("product", 2, "Item 22")
+    index.put("product", 2, "Widget")
+    index.discard("product", 3)
+    index.put("product", 7, "Item 0")
+    index.put("category", 8, "Idle")
+    index.discard("category", 8)
+    expected = index.search("i", 10)
+    assert [s.name for s in expected] == ["Item 0", "Item 1", "Item 4", "Item 5", "items"]
+    assert len(index) == 6
+
+    index.install(index.compacted())
+    assert index.search("i", 10) == expected
+    assert index.search("widget", 10) == [Suggestion("product", 2, "Widget")]
+    assert len(index) == 6
+    assert not index._overlay and not index._dead
+
+
+@pytest.fixture
+async def synced(db_session):
+    await suggestions.rebuild(db_session)
+    yield suggestions
+    suggestions.index.load([])
+    suggestions.cursor = 0
+
+
+@pytest.mark.asyncio
+async def test_index_follows_crud_writes(
+    async_client: AsyncClient, db_session, synced, monkeypatch
+):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Kitchen"})).json()
+    ids = [
+        (
+            await async_client.post(
+                "/api/v1/products", json={"name": name, "category_id": category["id"]}
+            )
+        ).json()["id"]
+        for name in ("Kettle", "Knife", "Kettle Pro")
+    ]
+    await async_client.put(f"/api/v1/products/{ids[1]}", json={"name": "Cleaver"})
+    await async_client.delete(f"/api/v1/products/{ids[2]}")
+    assert await synced.catch_up(db_session) == 6
+
+    resp = await async_client.get("/api/v1/products/suggest?q=k")
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {"kind": "product", "id": ids[0], "name": "Kettle"},
+        {"kind": "category", "id": category["id"], "name": "Kitchen"},
+    ]
+
+    # Set-based deletes are picked up from the change log as well, and
+    # merged into the sorted run once enough changes are pending.
+    monkeypatch.setattr(suggest, "COMPACT_MIN_CHANGES", 0)
+    await async_client.delete(f"/api/v1/products?category_id={category['id']}")
+    await synced.catch_up(db_session)
+    assert synced.search("kettle", 10) == []
+    assert synced.search("cle", 10) == []
+    assert not synced.index._overlay
+    assert [s.name for s in synced.search("kit", 10)] == ["Kitchen"]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_loads_existing_rows(async_client: AsyncClient, db_session):
+    category = (await async_client.post("/api/v1/categories", json={"name": "Garden"})).json()
+    await async_client.post("/api/v1/products", json={"name": "Gnome", "category_id": category["id"]})
+    try:
+        await suggestions.rebuild(db_session)
+        assert [s.name for s in suggestions.search("g", 10)] == ["Garden", "Gnome"]
+        assert suggestions.cursor > 0
+    finally:
+        suggestions.index.load([])
+        suggestions.cursor = 0
+
+
+@pytest.mark.asyncio
+async def test_start_builds_the_index_in_the_background(
+    async_client: AsyncClient, session_factory
+):
+    await async_client.post("/api/v1/categories", json={"name": "Garden"})
+    service = SuggestionService()
+    service.start(session_factory)
+    try:
+        assert service.search("g", 10) == []
+        for _ in range(100):
+            if service.cursor:
+                break
+            await asyncio.sleep(0.01)
+        assert [s.name for s in service.search("g", 10)] == ["Garden"]
+    finally:
+        await service.stop()
+
+
+def test_app_import_defers_the_suggestion_index():
+    code = "import sys, app.main; print('app.search' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+@pytest.mark.asyncio
+async def test_suggest_route_not_shadowed(async_client: AsyncClient):
+    resp = await async_client.get("/api/v1/products/suggest?q=")
+    assert resp.status_code == 422